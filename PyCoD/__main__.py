@@ -0,0 +1,27 @@
+# <pep8 compliant>
+
+import sys
+
+from . import convert
+from . import parse
+
+# Sub command name -> main(argv) function
+COMMANDS = {
+	'convert': convert.main,
+	'parse': parse.main,
+}
+
+
+def main(argv=None):
+	if argv is None:
+		argv = sys.argv[1:]
+
+	if not argv or argv[0] not in COMMANDS:
+		print("usage: python -m PyCoD {%s} ..." % ",".join(COMMANDS))
+		return 2
+
+	return COMMANDS[argv[0]](argv[1:])
+
+
+if __name__ == '__main__':
+	sys.exit(main())
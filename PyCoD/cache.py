@@ -0,0 +1,303 @@
+# <pep8 compliant>
+
+'''
+Persistent on-disk cache of parsed models & anims
+
+Each entry is an uncompressed .npz file holding the loaded data as NumPy
+ arrays plus a small JSON header. Entries are keyed by the file's path
+ and the way it was loaded, and are only used if the file's size, mtime
+ (or failing that, its content hash) still match the ones it was parsed
+ from. Once the cache grows past max_size the least recently used
+ entries are evicted.
+
+The cache is disabled until configure() is called, or the
+ PYCOD_CACHE_DIR environment variable is set (PYCOD_CACHE_SIZE can be
+ used to set the size limit in MiB). Model.LoadFile_* & Anim.LoadFile_*
+ then use it automatically.
+'''
+
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+# Bump this whenever the layout of the cached data changes
+FORMAT_VERSION = 1
+
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+# Entry mtimes are only as precise as the file system (2s on FAT), so a
+#  batch also keeps the entries used this long before it started
+__BATCH_MARGIN_NS__ = 2 * 1000 * 1000 * 1000
+
+__HASH_CHUNK_SIZE__ = 1 << 20
+
+__cache__ = None
+
+
+class CacheKey(object):
+	'''
+	Identity of a file at the time it was loaded
+	'''
+	__slots__ = ('path', 'name', 'size', 'mtime_ns', 'digest')
+
+	def __init__(self, path, kind):
+		self.path = os.path.realpath(path)
+		stat = os.stat(self.path)
+		self.size = stat.st_size
+		self.mtime_ns = stat.st_mtime_ns
+		self.digest = None
+
+		ident = "%d\0%s\0%s" % (FORMAT_VERSION, kind, self.path)
+		self.name = hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+	def content_digest(self):
+		'''
+		Returns (& remembers) the hash of the file's contents
+		'''
+		if self.digest is None:
+			hasher = hashlib.blake2b(digest_size=20)
+			with open(self.path, "rb") as file:
+				for chunk in iter(lambda: file.read(__HASH_CHUNK_SIZE__), b""):
+					hasher.update(chunk)
+			self.digest = hasher.hexdigest()
+		return self.digest
+
+
+class ParseCache(object):
+	'''
+	A directory of cached parse results
+	max_size is the total size (in bytes) of the entries kept on disk, or
+	 None for no limit
+	While a batch is running (see begin_batch()) entries written or used
+	 since it started are never evicted
+	'''
+	__slots__ = ('directory', 'max_size', 'keep_since',
+				 'hits', 'misses', 'evictions')
+
+	def __init__(self, directory, max_size=DEFAULT_MAX_SIZE, keep_since=None):
+		self.directory = directory
+		self.max_size = max_size
+		self.keep_since = keep_since
+
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def __entry_path__(self, key):
+		return os.path.join(self.directory, key.name + ".npz")
+
+	def stats(self):
+		'''
+		Returns the hit / miss / eviction counters & the size of the cache
+		'''
+		entries = self.__entries__()
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'evictions': self.evictions,
+			'entries': len(entries),
+			'size': sum(size for _, size, _ in entries),
+		}
+
+	def load(self, path, kind):
+		'''
+		Look up the cached data for path (as loaded in the given kind of way)
+		Returns (key, header, arrays) - header & arrays are None on a miss
+		 and key is what should be passed to store() once the file is parsed
+		'''
+		key = CacheKey(path, kind)
+		entry_path = self.__entry_path__(key)
+
+		header = arrays = None
+		try:
+			with np.load(entry_path, allow_pickle=False) as data:
+				header = json.loads(str(data['__header__']))
+				arrays = {name: data[name] for name in data.files
+						  if name != '__header__'}
+			size, mtime_ns = header['size'], header['mtime_ns']
+			digest, cached = header['digest'], header['data']
+		except FileNotFoundError:
+			header = None
+		except Exception:
+			# A truncated or otherwise corrupt entry (BadZipFile, EOFError,
+			#  a broken header...) is just a miss - remove it so it gets
+			#  replaced once the file is parsed again
+			header = None
+			self.__remove__(entry_path)
+
+		if header is not None and size == key.size:
+			if mtime_ns == key.mtime_ns:
+				self.hits += 1
+				self.__touch__(entry_path)
+				return key, cached, arrays
+
+			# The file was touched - it only needs to be parsed again if
+			#  its contents actually changed
+			if digest == key.content_digest():
+				self.hits += 1
+				try:
+					self.__write__(key, cached, arrays)
+				except OSError:
+					pass
+				return key, cached, arrays
+
+		self.misses += 1
+		return key, None, None
+
+	def store(self, key, header, arrays):
+		'''
+		Store the parsed data for the file identified by key
+		header is a JSON serializable dict, arrays is a dict of NumPy arrays
+		Failing to write the entry isn't an error, the file just won't be
+		 cached
+		'''
+		try:
+			os.makedirs(self.directory, exist_ok=True)
+			self.__write__(key, header, arrays)
+			self.__evict__(keep=self.__entry_path__(key))
+		except OSError as e:
+			print("[ pv_blender_cod ]\tCouldn't cache '%s': %s" % (key.path, e))
+
+	def begin_batch(self, keep_since=None):
+		'''
+		Start a batch - the entries written or used from now on (or from
+		 keep_since, a time.time_ns() timestamp) are kept until end_batch()
+		 even if that takes the cache past max_size, so files parsed ahead
+		 of time are still there when they're loaded
+		Returns keep_since (for passing on to other processes)
+		'''
+		if keep_since is None:
+			keep_since = time.time_ns()
+		self.keep_since = keep_since
+		return keep_since
+
+	def end_batch(self):
+		'''
+		End the current batch & evict whatever no longer fits
+		'''
+		self.keep_since = None
+		self.__evict__()
+
+	def clear(self):
+		'''
+		Delete every entry in the cache
+		'''
+		for entry_path, _, _ in self.__entries__():
+			self.__remove__(entry_path)
+
+	@staticmethod
+	def __remove__(entry_path):
+		try:
+			os.remove(entry_path)
+		except OSError:
+			pass
+
+	def __write__(self, key, header, arrays):
+		header = {
+			'path': key.path,
+			'size': key.size,
+			'mtime_ns': key.mtime_ns,
+			'digest': key.content_digest(),
+			'data': header,
+		}
+
+		# Write to a temp file first so a half written entry is never read
+		entry_path = self.__entry_path__(key)
+		temp_path = "%s.%d.tmp" % (entry_path, os.getpid())
+		try:
+			with open(temp_path, "wb") as file:
+				np.savez(file, __header__=np.array(json.dumps(header)),
+						 **arrays)
+			os.replace(temp_path, entry_path)
+		finally:
+			if os.path.exists(temp_path):
+				os.remove(temp_path)
+
+	@staticmethod
+	def __touch__(entry_path):
+		# The mtime of an entry is its last use - used for LRU eviction
+		try:
+			os.utime(entry_path)
+		except OSError:
+			pass
+
+	def __entries__(self):
+		'''
+		Returns (path, size, last use) for each entry in the cache
+		'''
+		entries = []
+		try:
+			names = os.listdir(self.directory)
+		except OSError:
+			return entries
+
+		for name in names:
+			if not name.endswith(".npz"):
+				continue
+			entry_path = os.path.join(self.directory, name)
+			try:
+				stat = os.stat(entry_path)
+			except OSError:
+				continue
+			entries.append((entry_path, stat.st_size, stat.st_mtime_ns))
+		return entries
+
+	def __evict__(self, keep=None):
+		'''
+		Delete the least recently used entries until the cache fits in
+		 max_size (keep is only deleted if it doesn't fit on its own)
+		'''
+		if self.max_size is None:
+			return
+
+		entries = self.__entries__()
+		total = sum(size for _, size, _ in entries)
+		if self.keep_since is not None:
+			keep_since = self.keep_since - __BATCH_MARGIN_NS__
+			entries = [entry for entry in entries if entry[2] < keep_since]
+
+		entries.sort(key=lambda entry: (entry[0] == keep, entry[2]))
+		for entry_path, size, _ in entries:
+			if total <= self.max_size:
+				break
+			try:
+				os.remove(entry_path)
+			except OSError:
+				continue
+			total -= size
+			self.evictions += 1
+
+
+def configure(directory, max_size=DEFAULT_MAX_SIZE, keep_since=None):
+	'''
+	Enable the parse cache, storing its entries in directory
+	max_size None means no size limit, keep_since starts a batch (see
+	 ParseCache.begin_batch())
+	Returns the ParseCache
+	'''
+	global __cache__
+	__cache__ = ParseCache(directory, max_size, keep_since)
+	return __cache__
+
+
+def disable():
+	'''
+	Disable the parse cache (the entries on disk are kept)
+	'''
+	global __cache__
+	__cache__ = None
+
+
+def get():
+	'''
+	Returns the active ParseCache, or None if caching is disabled
+	'''
+	return __cache__
+
+
+if os.environ.get('PYCOD_CACHE_DIR'):
+	configure(os.environ['PYCOD_CACHE_DIR'],
+			  int(os.environ.get('PYCOD_CACHE_SIZE', DEFAULT_MAX_SIZE >> 20)) << 20)
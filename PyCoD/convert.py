@@ -0,0 +1,167 @@
+# <pep8 compliant>
+
+'''
+Headless batch conversion between the *_export & *_bin formats
+
+	python -m PyCoD convert [-j N] [-o DIR] [--version V] PATTERN [PATTERN ...]
+
+Every file matching the given glob patterns is converted to the other
+ format (xmodel_export <-> xmodel_bin, xanim_export <-> xanim_bin)
+'''
+
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .xmodel import Model
+from .xanim import Anim
+
+# Source extension -> target extension
+CONVERSIONS = {
+	'.xmodel_export': '.xmodel_bin',
+	'.xmodel_bin': '.xmodel_export',
+	'.xanim_export': '.xanim_bin',
+	'.xanim_bin': '.xanim_export',
+}
+
+
+def find_files(patterns):
+	'''
+	Returns the convertible files matching the given glob patterns
+	 (each file is only listed once)
+	'''
+	paths = []
+	seen = set()
+	for pattern in patterns:
+		matches = glob.glob(pattern, recursive=True)
+		if not matches and os.path.isfile(pattern):
+			matches = [pattern]
+
+		for path in sorted(matches):
+			if not os.path.isfile(path):
+				continue
+			if os.path.splitext(path)[1].lower() not in CONVERSIONS:
+				print("Skipping unsupported file '%s'" % path)
+				continue
+
+			key = os.path.realpath(path)
+			if key not in seen:
+				seen.add(key)
+				paths.append(path)
+	return paths
+
+
+def target_path(path, output_dir=None):
+	'''
+	Returns the path of the converted file for path
+	'''
+	root, ext = os.path.splitext(path)
+	target = root + CONVERSIONS[ext.lower()]
+	if output_dir:
+		target = os.path.join(output_dir, os.path.basename(target))
+	return target
+
+
+def convert_file(path, target, version=None):
+	'''
+	Convert a single file & return the time it took in seconds
+	If version is None, the version of the source file is kept
+	'''
+	start = time.perf_counter()
+
+	ext = os.path.splitext(path)[1].lower()
+	if ext == '.xmodel_export':
+		Model.FromFile_Raw(path, use_arrays=True).WriteFile_Bin(
+			target, version)
+	elif ext == '.xmodel_bin':
+		Model.FromFile_Bin(path, use_arrays=True).WriteFile_Raw(
+			target, version)
+	elif ext == '.xanim_export':
+		Anim.FromFile_Raw(path, use_arrays=True).WriteFile_Bin(
+			target, version)
+	elif ext == '.xanim_bin':
+		Anim.FromFile_Bin(path, use_arrays=True).WriteFile_Raw(
+			target, version)
+	else:
+		raise ValueError("Unsupported file type '%s'" % ext)
+
+	return time.perf_counter() - start
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		prog="python -m PyCoD convert",
+		description="Convert between xmodel_export <-> xmodel_bin and "
+					"xanim_export <-> xanim_bin")
+	parser.add_argument(
+		'patterns', metavar='PATTERN', nargs='+',
+		help="files or glob patterns (** is supported) to convert")
+	parser.add_argument(
+		'-j', '--jobs', type=int, default=1,
+		help="number of files to convert in parallel "
+			 "(0 uses every CPU, default: 1)")
+	parser.add_argument(
+		'-o', '--output-dir', default=None,
+		help="directory for the converted files "
+			 "(default: next to each source file)")
+	parser.add_argument(
+		'--version', type=int, default=None,
+		help="version of the converted files "
+			 "(default: the version of each source file)")
+	args = parser.parse_args(argv)
+
+	paths = find_files(args.patterns)
+	if not paths:
+		print("No files to convert")
+		return 1
+
+	# Largest files first, so one big file doesn't hold up the pool at the
+	#  end of the run
+	paths.sort(key=os.path.getsize, reverse=True)
+
+	if args.output_dir:
+		os.makedirs(args.output_dir, exist_ok=True)
+
+	jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+	jobs = min(jobs, len(paths))
+
+	failed = 0
+	start = time.perf_counter()
+
+	def report(path, target, result):
+		nonlocal failed
+		if isinstance(result, Exception):
+			failed += 1
+			print("  FAILED  %s: %s" % (path, result))
+		else:
+			print("%8.3fs  %s -> %s" % (result, path, target))
+
+	if jobs == 1:
+		for path in paths:
+			target = target_path(path, args.output_dir)
+			try:
+				result = convert_file(path, target, args.version)
+			except Exception as e:
+				result = e
+			report(path, target, result)
+	else:
+		with ProcessPoolExecutor(max_workers=jobs) as pool:
+			futures = {}
+			for path in paths:
+				target = target_path(path, args.output_dir)
+				future = pool.submit(convert_file, path, target, args.version)
+				futures[future] = (path, target)
+
+			for future in as_completed(futures):
+				path, target = futures[future]
+				try:
+					result = future.result()
+				except Exception as e:
+					result = e
+				report(path, target, result)
+
+	print("Converted %d / %d files in %.3fs (%d jobs)" % (
+		len(paths) - failed, len(paths), time.perf_counter() - start, jobs))
+	return 1 if failed else 0
@@ -0,0 +1,125 @@
+# <pep8 compliant>
+
+'''
+Parse a batch of models in parallel & store the results in the parse cache
+
+	python -m PyCoD parse --cache-dir DIR [-j N] [--no-split] FILE [FILE ...]
+
+Each file is loaded exactly the way the Blender importer loads it (as
+ MeshArrays), so the importer only has to pick the parsed arrays up from
+ the cache afterwards instead of parsing every file on Blender's main
+ thread. Used by the addon for multi-file imports.
+'''
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .xmodel import Model
+from . import cache
+
+
+def parse_file(path, split_meshes=True):
+	'''
+	Parse a single model into the parse cache & return the time it took
+	'''
+	start = time.perf_counter()
+
+	model = Model()
+	if os.path.splitext(path)[1].lower() == '.xmodel_bin':
+		model.LoadFile_Bin(path, split_meshes=split_meshes, use_arrays=True)
+	else:
+		model.LoadFile_Raw(path, split_meshes=split_meshes, use_arrays=True)
+
+	return time.perf_counter() - start
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(
+		prog="python -m PyCoD parse",
+		description="Parse xmodel_export / xmodel_bin files in parallel "
+					"and store the results in the parse cache")
+	parser.add_argument(
+		'paths', metavar='FILE', nargs='+',
+		help="the files to parse")
+	parser.add_argument(
+		'--cache-dir', required=True,
+		help="the parse cache directory")
+	parser.add_argument(
+		'--cache-size', type=int, default=cache.DEFAULT_MAX_SIZE >> 20,
+		help="size limit of the parse cache in MiB, 0 for no limit "
+			 "(default: %(default)d)")
+	parser.add_argument(
+		'--keep-since', type=int, default=None,
+		help="don't evict entries used since this time.time_ns() timestamp "
+			 "(default: when the parse started) - the files being parsed "
+			 "are always kept")
+	parser.add_argument(
+		'-j', '--jobs', type=int, default=0,
+		help="number of files to parse in parallel "
+			 "(0 uses every CPU, default: 0)")
+	parser.add_argument(
+		'--no-split', dest='split_meshes', action='store_false',
+		help="load each model as a single mesh")
+	args = parser.parse_args(argv)
+
+	paths = [path for path in args.paths if os.path.isfile(path)]
+	if not paths:
+		print("No files to parse")
+		return 1
+
+	# Largest files first, so one big file doesn't hold up the pool at the
+	#  end of the run
+	paths.sort(key=os.path.getsize, reverse=True)
+
+	# Keep every entry of this batch, even past the size limit - evicting
+	#  one before it's read back would just waste the work of parsing it
+	keep_since = args.keep_since
+	if keep_since is None:
+		keep_since = time.time_ns()
+	max_size = (args.cache_size << 20) or None
+	cache_args = (args.cache_dir, max_size, keep_since)
+	cache.configure(*cache_args)
+
+	jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+	jobs = min(jobs, len(paths))
+
+	failed = 0
+	start = time.perf_counter()
+
+	def report(path, result):
+		nonlocal failed
+		if isinstance(result, Exception):
+			failed += 1
+			print("  FAILED  %s: %s" % (path, result))
+		else:
+			print("%8.3fs  %s" % (result, path))
+
+	if jobs == 1:
+		for path in paths:
+			try:
+				result = parse_file(path, args.split_meshes)
+			except Exception as e:
+				result = e
+			report(path, result)
+	else:
+		# Each worker needs the cache configured - it isn't inherited when
+		#  the workers are spawned rather than forked
+		with ProcessPoolExecutor(max_workers=jobs,
+								 initializer=cache.configure,
+								 initargs=cache_args) as pool:
+			futures = {pool.submit(parse_file, path, args.split_meshes): path
+					   for path in paths}
+
+			for future in as_completed(futures):
+				path = futures[future]
+				try:
+					result = future.result()
+				except Exception as e:
+					result = e
+				report(path, result)
+
+	print("Parsed %d / %d files in %.3fs (%d jobs)" % (
+		len(paths) - failed, len(paths), time.perf_counter() - start, jobs))
+	return 1 if failed else 0
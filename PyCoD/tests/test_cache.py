@@ -0,0 +1,157 @@
+# <pep8 compliant>
+
+'''
+Tests for the parse cache
+
+	python -m unittest PyCoD/tests/test_cache.py
+'''
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from PyCoD import cache
+from PyCoD.xanim import Anim, AnimArrays, Frame, FramePart
+
+
+def write_anim(path, frames):
+	'''
+	Write a small 2 part xanim_export file
+	frames is a list of the part indices present in each frame
+	'''
+	lines = [
+		"ANIMATION",
+		"VERSION 3",
+		"",
+		"NUMPARTS 2",
+		'PART 0 "tag_origin"',
+		'PART 1 "j_mainroot"',
+		"",
+		"FRAMERATE 30",
+		"NUMFRAMES %d" % len(frames),
+	]
+	for frame, part_indices in enumerate(frames):
+		lines.append("FRAME %d" % frame)
+		for part_index in part_indices:
+			lines += [
+				"PART %d" % part_index,
+				"OFFSET %f 0.000000 0.000000" % frame,
+				"SCALE 1.000000 1.000000 1.000000",
+				"X 1.000000 0.000000 0.000000",
+				"Y 0.000000 1.000000 0.000000",
+				"Z 0.000000 0.000000 1.000000",
+				"",
+			]
+	lines += ["NUMKEYS 0", ""]
+
+	with open(path, "w") as file:
+		file.write("\n".join(lines))
+
+
+class ParseCacheTest(unittest.TestCase):
+	def setUp(self):
+		self.directory = tempfile.mkdtemp()
+		self.cache_dir = os.path.join(self.directory, "cache")
+		self.parse_cache = cache.configure(self.cache_dir)
+
+	def tearDown(self):
+		cache.disable()
+		shutil.rmtree(self.directory)
+
+	def load_anim(self, path):
+		anim = Anim()
+		anim.LoadFile_Raw(path)
+		return anim
+
+	def test_anim_round_trip(self):
+		path = os.path.join(self.directory, "anim.xanim_export")
+		write_anim(path, [(0, 1), (0, 1)])
+
+		first = self.load_anim(path)
+		second = self.load_anim(path)
+
+		self.assertEqual(self.parse_cache.hits, 1)
+		self.assertEqual(len(second.frames), 2)
+		self.assertEqual(second.frames[1].parts[1].offset,
+						 first.frames[1].parts[1].offset)
+
+	def test_anim_missing_part(self):
+		# Frame 1 has no data for part 1
+		path = os.path.join(self.directory, "anim.xanim_export")
+		write_anim(path, [(0, 1), (0,)])
+
+		for _ in range(2):
+			anim = self.load_anim(path)
+			self.assertEqual(len(anim.frames), 2)
+			self.assertEqual(len(anim.frames[0].parts), 2)
+
+		# It loads the same as it does with the cache off, it's just never
+		#  cached
+		self.assertEqual(self.parse_cache.hits, 0)
+		self.assertEqual(self.parse_cache.stats()['entries'], 0)
+
+	def test_from_frames_missing_data(self):
+		# What the bin loader leaves behind for a part with no data
+		frame = Frame(0)
+		frame.parts = [FramePart((0, 0, 0), [(1, 0, 0), (0, 1, 0), (0, 0, 1)]),
+					   FramePart()]
+		with self.assertRaises(ValueError):
+			AnimArrays.from_frames([frame], 2)
+
+		frame.parts = frame.parts[:1] + [None]
+		with self.assertRaises(ValueError):
+			AnimArrays.from_frames([frame], 2)
+
+	def test_corrupt_entry(self):
+		path = os.path.join(self.directory, "anim.xanim_export")
+		write_anim(path, [(0, 1), (0, 1)])
+		self.load_anim(path)
+
+		entry_path, size, _ = self.parse_cache.__entries__()[0]
+		for truncate_to in (size // 2, 40, 0):
+			with open(entry_path, "r+b") as file:
+				file.truncate(truncate_to)
+
+			# The bad entry is a miss & gets replaced by a good one
+			anim = self.load_anim(path)
+			self.assertEqual(len(anim.frames), 2)
+			self.assertEqual(self.parse_cache.hits, 0)
+
+			anim = self.load_anim(path)
+			self.assertEqual(len(anim.frames), 2)
+			self.assertEqual(self.parse_cache.hits, 1)
+			self.parse_cache.hits = 0
+
+	def test_batch_keeps_entries(self):
+		paths = [os.path.join(self.directory, "anim%d.xanim_export" % i)
+				 for i in range(3)]
+		for path in paths:
+			write_anim(path, [(0, 1), (0, 1)])
+
+		# Too small for even one entry - only a batch keeps them around
+		self.parse_cache.max_size = 1
+		self.parse_cache.begin_batch()
+		for path in paths:
+			self.load_anim(path)
+		self.assertEqual(self.parse_cache.stats()['entries'], 3)
+
+		for path in paths:
+			self.load_anim(path)
+		self.assertEqual(self.parse_cache.hits, 3)
+
+		self.parse_cache.end_batch()
+		self.assertEqual(self.parse_cache.stats()['entries'], 0)
+
+	def test_no_size_limit(self):
+		self.parse_cache.max_size = None
+		for i in range(3):
+			path = os.path.join(self.directory, "anim%d.xanim_export" % i)
+			write_anim(path, [(0, 1), (0, 1)])
+			self.load_anim(path)
+		self.assertEqual(self.parse_cache.stats()['entries'], 3)
+		self.assertEqual(self.parse_cache.evictions, 0)
+
+
+if __name__ == '__main__':
+	unittest.main()
@@ -1,9 +1,13 @@
 # <pep8 compliant>
 
+from itertools import chain
 from time import strftime
 import os
+from io import StringIO
+import numpy as np
 
 from .xbin import XBinIO, validate_version
+from . import cache
 
 # Can be int or float
 #  Changes the internal type for frames indices
@@ -205,6 +209,167 @@ class Frame(object):
 		return lines_read
 
 
+class AnimArrays(object):
+	'''
+	Structure-of-arrays form of Anim.frames
+	Instead of one Frame per frame and one FramePart per part of every
+	 frame, the frame data is stored in NumPy arrays:
+		frame_numbers	- (frame_count,) the frame number of each frame
+		offsets			- (frame_count, part_count, 3) float64
+		rotations		- (frame_count, part_count, 3, 3) float64 - the
+						  X, Y & Z rows of each part's matrix
+		scales			- (frame_count, part_count, 3) float64
+	'''
+	__slots__ = ('frame_numbers', 'offsets', 'rotations', 'scales')
+
+	def __init__(self, frame_count=0, part_count=0):
+		self.frame_numbers = np.zeros(frame_count, np.float64)
+		self.offsets = np.zeros((frame_count, part_count, 3), np.float64)
+		self.rotations = np.zeros((frame_count, part_count, 3, 3), np.float64)
+		self.rotations[:, :] = np.identity(3)
+		self.scales = np.ones((frame_count, part_count, 3), np.float64)
+
+	def __len__(self):
+		return len(self.frame_numbers)
+
+	@property
+	def frame_count(self):
+		return len(self.frame_numbers)
+
+	@property
+	def part_count(self):
+		return self.offsets.shape[1]
+
+	@staticmethod
+	def from_frames(frames, part_count):
+		'''
+		Convert a list of Frame objects into an AnimArrays
+		Raises ValueError if a frame is missing a part (or part data)
+		'''
+		flatten = chain.from_iterable
+		parts = [part for frame in frames for part in frame.parts]
+		shape = (len(frames), part_count)
+
+		if any(len(frame.parts) != part_count for frame in frames):
+			raise ValueError("Frames don't all have %d parts" % part_count)
+		for part in parts:
+			if (part is None or part.offset is None or part.scale is None
+					or part.matrix is None or len(part.matrix) != 3
+					or any(row is None or len(row) != 3
+						   for row in part.matrix)):
+				raise ValueError("Frame part is missing its data")
+
+		arrays = AnimArrays()
+		arrays.frame_numbers = np.array([frame.frame for frame in frames])
+		if not frames:
+			arrays.frame_numbers = arrays.frame_numbers.astype(np.float64)
+		arrays.offsets = np.fromiter(
+			flatten(part.offset for part in parts), np.float64,
+			len(parts) * 3).reshape(shape + (3,))
+		arrays.rotations = np.fromiter(
+			flatten(flatten(part.matrix) for part in parts), np.float64,
+			len(parts) * 9).reshape(shape + (3, 3))
+		arrays.scales = np.fromiter(
+			flatten(part.scale for part in parts), np.float64,
+			len(parts) * 3).reshape(shape + (3,))
+		return arrays
+
+	def to_frames(self):
+		'''
+		Returns a list of Frame objects for the frames in this AnimArrays
+		'''
+		def rows(values):
+			return list(map(tuple, values.reshape(-1, 3).tolist()))
+
+		rotations = rows(self.rotations)
+		matrices = [rotations[i:i + 3] for i in range(0, len(rotations), 3)]
+		parts = list(map(FramePart, rows(self.offsets), matrices,
+						 rows(self.scales)))
+
+		part_count = self.part_count
+		frames = list(map(Frame, self.frame_numbers.tolist()))
+		for i, frame in enumerate(frames):
+			frame.parts = parts[i * part_count:(i + 1) * part_count]
+		return frames
+
+
+def __parse_frame_section__(section, part_count):
+	'''
+	Tokenize & convert a whole frame section (from FRAMERATE up to the
+	 notetracks) in bulk rather than line by line
+	Returns (framerate, AnimArrays) or None if the section isn't laid
+	 out the usual way
+	'''
+	tokens = section.replace(",", " ").split()
+	if tokens[:1] != ["FRAMERATE"] or tokens[2:3] != ["NUMFRAMES"]:
+		return None
+
+	try:
+		framerate = float(tokens[1])
+		frame_count = int(tokens[3])
+	except ValueError:
+		return None
+
+	tokens = tokens[4:]
+	if frame_count == 0 or len(tokens) % frame_count:
+		return None
+
+	# Every part is PART i OFFSET x y z (SCALE x y z) X x y z Y x y z Z x y z
+	#  so the tokens can be viewed as a (frames, parts, tokens) table
+	part_size = (len(tokens) // frame_count - 2) // max(part_count, 1)
+	if part_size == 22:
+		keywords = ((0, "PART"), (2, "OFFSET"), (6, "SCALE"),
+					(10, "X"), (14, "Y"), (18, "Z"))
+	elif part_size == 18:
+		keywords = ((0, "PART"), (2, "OFFSET"),
+					(6, "X"), (10, "Y"), (14, "Z"))
+	else:
+		return None
+	if len(tokens) != frame_count * (2 + part_count * part_size):
+		return None
+
+	frames = np.array(tokens, dtype=object).reshape(frame_count, -1)
+	parts = frames[:, 2:].reshape(frame_count, part_count, part_size)
+	if not (frames[:, 0] == "FRAME").all():
+		return None
+	for column, keyword in keywords:
+		if not (parts[:, :, column] == keyword).all():
+			return None
+
+	try:
+		if not (parts[:, :, 1].astype(np.int64) == np.arange(part_count)).all():
+			return None
+
+		arrays = AnimArrays()
+		arrays.frame_numbers = frames[:, 1].astype(
+			np.int64 if FRAME_TYPE is int else np.float64)
+		arrays.offsets = parts[:, :, 3:6].astype(np.float64)
+		matrix = keywords[-3][0] + 1
+		arrays.rotations = parts[:, :, matrix:].reshape(
+			frame_count, part_count, 3, 4)[:, :, :, 1:].astype(np.float64)
+		if part_size == 22:
+			arrays.scales = parts[:, :, 7:10].astype(np.float64)
+		else:
+			arrays.scales = np.ones((frame_count, part_count, 3), np.float64)
+	except ValueError:
+		return None
+
+	return framerate, arrays
+
+
+class AnimInfo(object):
+	'''
+	Header level summary of an anim, as returned by Anim.probe()
+	'''
+	__slots__ = ('version', 'part_names', 'framerate', 'frame_count')
+
+	def __init__(self, anim, frame_count):
+		self.version = anim.version
+		self.part_names = [part.name for part in anim.parts]
+		self.framerate = anim.framerate
+		self.frame_count = frame_count
+
+
 class Anim(XBinIO, object):
 	__slots__ = ('framerate', 'parts', 'frames', 'notes')
 
@@ -292,13 +457,74 @@ class Anim(XBinIO, object):
 
 		return lines_read
 
+	def __iter_frames__(self, file):
+		'''
+		Generator version of __load_frames__ - each Frame is yielded as soon
+		 as it has been loaded, instead of being stored in self.frames
+		'''
+		frame_count = 0
+		frames_read = 0
+		for line in file:
+			line_split = line.split()
+			if not line_split:
+				continue
+
+			if line_split[0] == "FRAMERATE":
+				self.framerate = float(line_split[1])
+			elif line_split[0] == "NUMFRAMES":
+				frame_count = int(line_split[1])
+				if frame_count == 0:
+					return
+			elif line_split[0] == "FRAME":
+				frame = Frame(FRAME_TYPE(line_split[1]))
+				frame._load_parts_(file, len(self.parts))
+				yield frame
+
+				frames_read += 1
+				if frames_read == frame_count:
+					return
+
 	def __load_frame__(self, file, frame_index, frame_number):
 		frame = Frame(frame_number)
 		lines_read = frame._load_parts_(file, len(self.parts))
 		self.frames[frame_index] = frame
 		return lines_read
 
-	def __load_notes__(self, file, use_notetrack_file=True):
+	def __array_frames__(self):
+		'''
+		Returns self.frames as an AnimArrays (used by the writers)
+		'''
+		if isinstance(self.frames, AnimArrays):
+			return self.frames
+		return AnimArrays.from_frames(self.frames, len(self.parts))
+
+	def __object_frames__(self):
+		'''
+		Returns self.frames as a list of Frame objects
+		'''
+		if isinstance(self.frames, AnimArrays):
+			return self.frames.to_frames()
+		return self.frames
+
+	def __frame_numbers__(self):
+		if isinstance(self.frames, AnimArrays):
+			return self.frames.frame_numbers.tolist()
+		return [frame.frame for frame in self.frames]
+
+	def __load_frame_arrays__(self, section):
+		'''
+		Load the frame section (FRAMERATE, NUMFRAMES & every FRAME) into
+		 an AnimArrays, falling back to __load_frames__ if it can't be
+		 loaded in bulk
+		'''
+		result = __parse_frame_section__(section, len(self.parts))
+		if result is None:
+			self.__load_frames__(StringIO(section))
+			self.frames = AnimArrays.from_frames(self.frames, len(self.parts))
+		else:
+			self.framerate, self.frames = result
+
+	def __load_notes__(self, file, use_notetrack_file=True, path=None):
 		lines_read = 0
 		note_count = 0
 		note_index = 0
@@ -340,11 +566,11 @@ class Anim(XBinIO, object):
 						return path
 				return None
 
-			filepath = os.path.realpath(file.name)
+			filepath = os.path.realpath(file.name if path is None else path)
 			notetrack_filepath = find_notetrack_file(filepath)
 			if notetrack_filepath is not None:
 				nt = NoteTrack.FromFile_Raw(notetrack_filepath)
-				first_frame = min([f.frame for f in self.frames])
+				first_frame = min(self.__frame_numbers__())
 				frame_count = len(self.frames)
 				if nt.frame_count != frame_count or (
 						nt.first_frame != first_frame):
@@ -359,13 +585,74 @@ class Anim(XBinIO, object):
 
 		return lines_read
 
-	def LoadFile_Raw( self, path, use_notetrack_file = False ):
+	def LoadFile_Raw(
+			self, path, use_notetrack_file = False,
+			use_arrays = False
+		):
+		'''
+		use_arrays - load the frames as an AnimArrays instead of Frame objects
+		If the parse cache is enabled (see cache.py) the cached copy of the
+		 file is used instead of parsing it again whenever possible
+		 (not when the notes are loaded from a separate NT_EXPORT file)
+		'''
+		entry = None
+		if not use_notetrack_file:
+			entry, loaded = self.__load_cached__(
+				path, 'xanim_export', use_arrays)
+			if loaded:
+				return
+
+		self.__load_raw__(path, use_notetrack_file, use_arrays)
+		self.__store_cached__(entry)
+
+	def __load_raw__( self, path, use_notetrack_file, use_arrays ):
 		with open( path, "r" ) as file:
 			# file automatically keeps track of what line its on across calls
 			self.__load_header__(file)
 			self.__load_part_info__(file)
-			self.__load_frames__(file)
-			self.__load_notes__(file, use_notetrack_file)
+			if not use_arrays:
+				self.__load_frames__(file)
+				self.__load_notes__(file, use_notetrack_file)
+				return
+
+			# Read the rest in one go - the frames are tokenized in bulk
+			text = file.read()
+
+		end = min(pos for pos in (text.find("NOTETRACKS"),
+								  text.find("NUMKEYS"), len(text))
+				  if pos != -1)
+		self.__load_frame_arrays__(text[:end])
+		self.__load_notes__(StringIO(text[end:]), use_notetrack_file, path)
+
+	def iter_frames( self, path, is_compressed = True ):
+		'''
+		Load an xanim_bin / xanim_export file (the format is picked from the
+		 file extension) one frame at a time
+		This is a generator - it first yields (parts, framerate) and then
+		 each Frame in the file. The frames are never stored in self.frames
+		self.notes is available once the generator is exhausted
+		NOTE: Only embedded notetracks are loaded (no NT_EXPORT files)
+		'''
+		if os.path.splitext(path)[-1].lower() == '.xanim_bin':
+			data = XBinIO.__read_buffer__(path, is_compressed)
+			yield from self.__xbin_loadfile_internal__(
+				data, 'ANIM', stream=True)
+			return
+
+		with open( path, "r" ) as file:
+			self.__load_header__(file)
+			self.__load_part_info__(file)
+
+			# The framerate is part of the frame section, so the first frame
+			#  has to be loaded before it's known
+			frames = self.__iter_frames__(file)
+			first_frame = next(frames, None)
+			yield self.parts, self.framerate
+			if first_frame is not None:
+				yield first_frame
+				yield from frames
+
+			self.__load_notes__(file, use_notetrack_file=False)
 
 	# Write an XANIM_EXPORT file
 	# if embed_notes is False, a NT_EXPORT file will be created
@@ -376,9 +663,10 @@ class Anim(XBinIO, object):
 		):
 		first_frame = 0
 		last_frame = 0
-		if self.frames:
-			first_frame = min( frame.frame for frame in self.frames )
-			last_frame = max( frame.frame for frame in self.frames ) + 1
+		frame_numbers = self.__frame_numbers__()
+		if frame_numbers:
+			first_frame = min( frame_numbers )
+			last_frame = max( frame_numbers ) + 1
 
 		if last_frame - first_frame != len(self.frames):
 			fmt = ("The keyed frame count and number of frames do not match"
@@ -403,18 +691,30 @@ class Anim(XBinIO, object):
 
 			file.write("FRAMERATE %s\n" % __clean_float2str__(self.framerate))
 			file.write("NUMFRAMES %d\n" % len(self.frames))
-			for frame in self.frames:
-				file.write("FRAME %s\n" % __clean_float2str__(frame.frame))
-				for part_index, part in enumerate(frame.parts):
-					file.write("PART %d\n" % part_index)
-					# TODO: Investigate precision options?
-					offset = (part.offset[0], part.offset[1], part.offset[2])
-					scale = (part.scale[0], part.scale[1], part.scale[2])
-					file.write("OFFSET %f %f %f\n" % offset)
-					file.write("SCALE %f %f %f\n" % scale)
-					file.write("X %f %f %f\n" % __clamp_multi__(part.matrix[0]))
-					file.write("Y %f %f %f\n" % __clamp_multi__(part.matrix[1]))
-					file.write("Z %f %f %f\n\n" % __clamp_multi__(part.matrix[2]))
+
+			# Each frame is written with a single format call - the part
+			#  indices are baked into the template
+			# TODO: Investigate precision options?
+			frames = self.__array_frames__()
+			part_template = (
+				"OFFSET {:f} {:f} {:f}\n"
+				"SCALE {:f} {:f} {:f}\n"
+				"X {:f} {:f} {:f}\n"
+				"Y {:f} {:f} {:f}\n"
+				"Z {:f} {:f} {:f}\n\n"
+			)
+			frame_template = "FRAME {}\n" + "".join(
+				"PART %d\n%s" % (part_index, part_template)
+				for part_index in range(frames.part_count))
+
+			values = np.concatenate((
+				frames.offsets, frames.scales,
+				np.clip(frames.rotations, -1.0, 1.0).reshape(
+					len(frames), frames.part_count, 9)
+			), axis=2).reshape(len(frames), -1)
+			for frame, row in zip(frame_numbers, values.tolist()):
+				file.write(frame_template.format(
+					__clean_float2str__(frame), *row))
 
 			# NOTE: Despite having the same version number
 			#   BO1 supports the NUMKEYS style embedded notetracks
@@ -459,23 +759,120 @@ class Anim(XBinIO, object):
 			# file.write("\n")
 
 	@staticmethod
-	def FromFile_Raw(filepath):
+	def FromFile_Raw(filepath, use_arrays=False):
 		'''
 		Load from an XANIM_EXPORT file and return the resulting Anim()
 		'''
 		anim = Anim()
-		anim.LoadFile_Raw(filepath)
+		anim.LoadFile_Raw(filepath, use_arrays=use_arrays)
 		return anim
 
 	def LoadFile_Bin(
 			self, path,
-			is_compressed=True, dump=False
+			is_compressed=True, dump=False,
+			use_arrays=False
 		):
-		with open( path, "rb" ) as file:
-			if is_compressed:
-				file = XBinIO.__decompress_internal__(file, dump)
+		'''
+		use_arrays - load the frames as an AnimArrays instead of Frame objects
+		'''
+		entry = None
+		if not dump:
+			entry, loaded = self.__load_cached__(
+				path, 'xanim_bin%d' % is_compressed, use_arrays)
+			if loaded:
+				return
+
+		data = XBinIO.__read_buffer__(path, is_compressed, dump)
+		self.frames = []
+		self.__xbin_loadfile_internal__(data, 'ANIM', use_arrays)
+		self.__store_cached__(entry)
 
-			self.__xbin_loadfile_internal__(file, 'ANIM')
+	def __load_cached__(self, path, kind, use_arrays):
+		'''
+		Load the anim from the parse cache
+		Returns (entry, loaded) - if loaded is False the file has to be
+		 parsed, entry is passed to __store_cached__ afterwards
+		'''
+		parse_cache = cache.get()
+		if parse_cache is None:
+			return None, False
+
+		kind = "%s:%d" % (kind, use_arrays)
+		key, header, arrays = parse_cache.load(path, kind)
+		entry = (parse_cache, key)
+		if header is None:
+			return entry, False
+
+		self.version = header['version']
+		self.framerate = header['framerate']
+		self.parts = [PartInfo(name) for name in header['parts']]
+		self.notes = [Note(frame, string) for frame, string in header['notes']]
+
+		frames = AnimArrays()
+		for attr, value in arrays.items():
+			setattr(frames, attr, value)
+		self.frames = frames if use_arrays else frames.to_frames()
+
+		return entry, True
+
+	def __store_cached__(self, entry):
+		'''
+		Store a freshly parsed anim in the parse cache
+		'''
+		if entry is None:
+			return
+
+		# Frames that don't all have every part can't be cached - they
+		#  stay as Frame objects & the file is simply parsed again next time
+		try:
+			frames = self.__array_frames__()
+		except ValueError:
+			return
+
+		header = {
+			'version': self.version,
+			'framerate': self.framerate,
+			'parts': [part.name for part in self.parts],
+			'notes': [(note.frame, note.string) for note in self.notes],
+		}
+		parse_cache, key = entry
+		parse_cache.store(key, header, {
+			attr: getattr(frames, attr) for attr in AnimArrays.__slots__
+		})
+
+	def __probe_raw__(self, path):
+		frame_count = 0
+		with open(path, "r") as file:
+			self.__load_header__(file)
+			self.__load_part_info__(file)
+			for line in file:
+				line_split = line.split()
+				if not line_split:
+					continue
+
+				if line_split[0] == "FRAMERATE":
+					self.framerate = float(line_split[1])
+				elif line_split[0] == "NUMFRAMES":
+					frame_count = int(line_split[1])
+					break
+
+		return frame_count
+
+	@staticmethod
+	def probe(path, is_compressed=True):
+		'''
+		Read only the header, part & framerate info of an xanim_bin /
+		 xanim_export file (the format is picked from the file extension)
+		 and return the resulting AnimInfo()
+		'''
+		anim = Anim()
+		if os.path.splitext(path)[-1].lower() == '.xanim_bin':
+			data = XBinIO.__read_buffer__(path, is_compressed)
+			frame_count = anim.__xbin_loadfile_internal__(
+				data, 'ANIM', probe=True)
+		else:
+			frame_count = anim.__probe_raw__(path)
+		return AnimInfo(anim, frame_count)
 
 	def WriteFile_Bin(self, path, version=3, header_message=""):
 		# If there is no current version, fallback to the argument
@@ -487,10 +884,13 @@ class Anim(XBinIO, object):
 		)
 
 	@staticmethod
-	def FromFile_Bin(filepath, is_compressed=True, dump=False):
+	def FromFile_Bin(
+			filepath, is_compressed=True, dump=False,
+			use_arrays=False
+		):
 		'''
 		Load from a XANIM_BIN file and return the resulting Anim()
 		'''
 		anim = Anim()
-		anim.LoadFile_Bin( filepath, is_compressed, dump )
+		anim.LoadFile_Bin( filepath, is_compressed, dump, use_arrays )
 		return anim
@@ -1,8 +1,11 @@
 # <pep8 compliant>
 
 import os, struct, re
+from array import array
 from io import BytesIO
 
+import numpy as np
+
 from . import _lz4 as lz4
 
 LOG_BLOCKS = False
@@ -102,198 +105,180 @@ def __str_packable__( string ):
 	return str( string ).encode( 'utf-8' )
 
 
-class XBlock(object):
+# Precompiled block layouts used by the buffer decoder
+#  (these match the blocks written by the XBlock.Write* functions)
+_XBIN_INT16 = struct.Struct('h')
+_XBIN_UINT16 = struct.Struct('H')
+_XBIN_INT32 = struct.Struct('i')
+_XBIN_FLOAT = struct.Struct('f')
+_XBIN_VEC2 = struct.Struct('ff')
+_XBIN_VEC3 = struct.Struct('fff')
+_XBIN_VEC4 = struct.Struct('ffff')
+_XBIN_SHORT_VEC3 = struct.Struct('hhh')
+_XBIN_WEIGHT = struct.Struct('=hf')
+_XBIN_BONE_INFO = struct.Struct('ii')
+_XBIN_TRI = struct.Struct('BB')
+_XBIN_TRI16 = struct.Struct('HH')
+_XBIN_COLOR = struct.Struct('BBBB')
+
+# Structured layouts used by the bulk vertex / face section writers
+#  (these match the blocks written by the individual XBlock.Write* functions)
+_XBIN_VERT16_DTYPE = np.dtype([
+	('index_hash', '<u2'), ('index', '<u2'),
+	('offset_hash', '<u2'), ('offset_pad', '<u2'), ('offset', '<f4', 3),
+	('weight_count_hash', '<u2'), ('weight_count', '<i2')
+])
+_XBIN_VERT32_DTYPE = np.dtype([
+	('index_hash', '<u2'), ('index_pad', '<u2'), ('index', '<u4'),
+	('offset_hash', '<u2'), ('offset_pad', '<u2'), ('offset', '<f4', 3),
+	('weight_count_hash', '<u2'), ('weight_count', '<i2')
+])
+_XBIN_WEIGHT_DTYPE = np.dtype([
+	('hash', '<u2'), ('bone', '<i2'), ('value', '<f4')
+])
+_XBIN_TRI_DTYPE = np.dtype([
+	('hash', '<u2'), ('mesh_id', 'u1'), ('material_id', 'u1')
+])
+_XBIN_TRI16_DTYPE = np.dtype([
+	('hash', '<u2'), ('pad', '<u2'), ('mesh_id', '<u2'), ('material_id', '<u2')
+])
+_XBIN_CORNER_FIELDS = [
+	('normal_hash', '<u2'), ('normal', '<i2', 3),
+	('color_hash', '<u2'), ('color_pad', '<u2'), ('color', 'u1', 4),
+	('uv_hash', '<u2'), ('uv_layers', '<i2'), ('uv', '<f4', 2)
+]
+_XBIN_CORNER16_DTYPE = np.dtype(
+	[('index_hash', '<u2'), ('index', '<u2')] + _XBIN_CORNER_FIELDS)
+_XBIN_CORNER32_DTYPE = np.dtype(
+	[('index_hash', '<u2'), ('index_pad', '<u2'), ('index', '<u4')] +
+	_XBIN_CORNER_FIELDS)
+_XBIN_FRAME_PART_DTYPE = np.dtype([
+	('index_hash', '<u2'), ('index', '<i2'),
+	('offset_hash', '<u2'), ('offset_pad', '<u2'), ('offset', '<f4', 3),
+	('x_hash', '<u2'), ('x', '<i2', 3),
+	('y_hash', '<u2'), ('y', '<i2', 3),
+	('z_hash', '<u2'), ('z', '<i2', 3)
+])
+
+
+def __clamp_floats_to_shorts__( values ):
 	'''
-	This is a namespace-like class that contains all of the block read/write
-	functions for the xbins
+	Array version of __clamp_float_to_short__
 	'''
-	# #### #
-	# Read #
-	# #### #
-
-	# Changed to reading in chunks as opposed to 
-	# reading one byte at a time - pv
-	@staticmethod
-	def LoadString( file ):
-		chunks = []
-		while True:
-			chunk = file.read( 64 )
-			if not chunk:
-				# End of file reached unexpectedly
-				break
-			
-			# Find the null terminator in the current chunk
-			if b'\x00' in chunk:
-				# Split at the terminator and keep the first part
-				terminator_pos = chunk.find( b'\x00' )
-				chunks.append( chunk[ :terminator_pos ] )
-				
-				# We read past the terminator, so we need to seek back
-				# The amount to rewind is the chunk size minus the part we kept, minus 1 for the null byte
-				rewind = len( chunk ) - terminator_pos - 1
-				file.seek( file.tell() - rewind )
-				break
-			else:
-				# No terminator yet, append the whole chunk
-				chunks.append( chunk )
-				
-		return b''.join(chunks).decode('utf-8')
-
-	@staticmethod
-	def LoadString_Aligned(file):
-		start = file.tell()
-		string = XBlock.LoadString(file)
-		file.seek(start + padded(file.tell() - start))
-		return string
-
-	@staticmethod
-	def LoadInt16Block(file):
-		data = file.read(2)
-		return struct.unpack('h', data)[0]
-
-	@staticmethod
-	def LoadUInt16Block(file):
-		data = file.read(2)
-		return struct.unpack('H', data)[0]
-
-	@staticmethod
-	def LoadInt32Block(file):
-		file.seek(file.tell() + 2)
-		data = file.read(4)
-		return struct.unpack('i', data)[0]
+	values = np.trunc( np.asarray( values, np.float64 ) * 32767 )
+	return np.clip( values, -32768, 32767 ).astype( np.int16 )
 
-	@staticmethod
-	def LoadCommentBlock(file):
-		start = file.tell() - 2
-		file.seek(start + 4)
-		string = XBlock.LoadString(file)
-		file.seek(start + padded(file.tell() - start))
-		return string
-
-	@staticmethod
-	def LoadBoneBlock(file):
-		start = file.tell() - 2
-		file.seek(start + 4)
-		data = file.read(8)
-		result = struct.unpack('ii', data)
-		result = (result[0], result[1], XBlock.LoadString(file))
-		file.seek(start + padded(file.tell() - start))
-		return result
-
-	@staticmethod
-	def LoadFloatBlock(file):
-		start = file.tell() - 2
-		file.seek(start + 4)
-		data = file.read(4)
-		result = struct.unpack('f', data)[0]
-		file.seek(start + padded(file.tell() - start))
-		return result
-
-	@staticmethod
-	def LoadVec2Block(file):
-		start = file.tell() - 2
-		file.seek(start + 4)
-		data = file.read(8)
-		result = struct.unpack('ff', data)
-		file.seek(start + padded(file.tell() - start))
-		return result
-
-	@staticmethod
-	def LoadVec3Block(file):
-		start = file.tell() - 2
-		file.seek(start + 4)
-		data = file.read(12)
-		result = struct.unpack('fff', data)
-		file.seek(start + padded(file.tell() - start))
-		return result
-
-	@staticmethod
-	def LoadShortVec3Block(file):
-		data = file.read(6)
-		x, y, z = struct.unpack('hhh', data)
-		return (x / 32767.0, y / 32767.0, z / 32767.0)
-
-	@staticmethod
-	def LoadVec4Block(file):
-		start = file.tell() - 2
-		file.seek(start + 4)
-		data = file.read(16)
-		result = struct.unpack('ffff', data)
-		file.seek(start + padded(file.tell() - start))
-		return result
 
-	@staticmethod
-	def LoadVertexWeightBlock(file):
-		data = file.read(6)
-		result = struct.unpack('=hf', data)
-		return result
+def __floats_to_bytes__( values ):
+	'''
+	Array version of the int( c * 255 ) conversion used by WriteColorBlock
+	'''
+	values = np.trunc( np.asarray( values, np.float64 ) * 255 )
+	if values.size and ( values.min() < 0 or values.max() > 255 ):
+		raise ValueError( "Color values must be in the range [0, 1]" )
+	return values.astype( np.uint8 )
 
-	@staticmethod
-	def LoadTriangleBlock(file):
-		data = file.read(2)
-		result = struct.unpack('BB', data)
-		return result
 
-	@staticmethod
-	def LoadTriangle16Block(file):
-		file.seek(file.tell() + 2)  # Skip padding
-		data = file.read(4)
-		result = struct.unpack('HH', data)
-		return result
+def __face_dtype__( vert32 = False, tri16 = False ):
+	'''
+	Returns the structured layout of a single face
+	 (TRI + 3 * (vertex index, normal, color & single layer UV blocks))
+	'''
+	return np.dtype( [
+		( 'tri', _XBIN_TRI16_DTYPE if tri16 else _XBIN_TRI_DTYPE ),
+		( 'corners', _XBIN_CORNER32_DTYPE if vert32 else _XBIN_CORNER16_DTYPE, 3 )
+	] )
 
-	@staticmethod
-	def LoadColorBlock(file):
-		file.seek(file.tell() + 2)  # Skip padding
-		data = file.read(4)
-		r, g, b, a = struct.unpack('BBBB', data)
-		return (r / 255.0, g / 255.0, b / 255.0, a / 255.0)
 
-	@staticmethod
-	def LoadUVBlock(file):
-		data = file.read(2)
-		layer_count = struct.unpack('h', data)[0]
-		data = file.read(8 * layer_count)
-		result = struct.unpack( f"{layer_count * 2}f", data )
-		# Technically there is support for additional UV layers
-		#  but we're only using the first one at the moment
-		return result[ :2 ]
+def __face_layout__( vert32 = False ):
+	'''
+	Returns (dtype, fields) for a face as written by WriteFile_Bin
+	fields contains (record offset, expected uint16) pairs for every block
+	 hash (and the UV layer count) in the face
+	'''
+	dtype = __face_dtype__( vert32 )
+	corner_dtype = dtype[ 'corners' ].base
+	expected = (
+		( 'index_hash', 0xB097 if vert32 else 0x8F03 ),
+		( 'normal_hash', 0x89EC ),
+		( 'color_hash', 0x6DD8 ),
+		( 'uv_hash', 0x1AD4 ),
+		( 'uv_layers', 1 )
+	)
+
+	fields = [ ( 0, 0x562F ) ]
+	for corner in range( 3 ):
+		base = dtype.fields[ 'corners' ][ 1 ] + corner * corner_dtype.itemsize
+		for name, value in expected:
+			fields.append( ( base + corner_dtype.fields[ name ][ 1 ], value ) )
+
+	return dtype, fields
+
+
+def __frame_dtype__( part_count ):
+	'''
+	Returns the structured layout of a single anim frame
+	 (frame block + part_count * (part index, offset & matrix blocks))
+	'''
+	return np.dtype( [
+		( 'hash', '<u2' ), ( 'pad', '<u2' ), ( 'frame', '<i4' ),
+		( 'parts', _XBIN_FRAME_PART_DTYPE, ( part_count, ) )
+	] )
 
-	@staticmethod
-	def LoadObjectBlock(file):
-		start = file.tell() - 2
-		data = file.read(2)
-		result = struct.unpack('h', data) + (XBlock.LoadString(file),)
-		file.seek(start + padded(file.tell() - start))
-		return result
 
-	@staticmethod
-	def LoadMaterialBlock(file):
-		start = file.tell() - 2
-		data = file.read(2)
-		name = XBlock.LoadString_Aligned(file)
-		_type = XBlock.LoadString_Aligned(file)
-		imgs = deserialize_image_string(XBlock.LoadString_Aligned(file))
-		result = struct.unpack('h', data) + (name, _type, imgs)
-		file.seek(start + padded(file.tell() - start))
-		return result
+def __frame_layout__( part_count ):
+	'''
+	Returns (dtype, fields) for a frame as written by WriteFile_Bin
+	fields contains (record offset, expected uint16) pairs for every block
+	 hash in the frame
+	'''
+	dtype = __frame_dtype__( part_count )
+	expected = (
+		( 'index_hash', 0x745A ),
+		( 'offset_hash', 0x9383 ),
+		( 'x_hash', 0xDCFD ),
+		( 'y_hash', 0xCCDC ),
+		( 'z_hash', 0xFCBF )
+	)
+
+	fields = [ ( 0, 0xC723 ) ]
+	base = dtype.fields[ 'parts' ][ 1 ]
+	for part in range( part_count ):
+		for name, value in expected:
+			fields.append( (
+				base + part * _XBIN_FRAME_PART_DTYPE.itemsize +
+				_XBIN_FRAME_PART_DTYPE.fields[ name ][ 1 ],
+				value
+			) )
+
+	return dtype, fields
+
+
+def __match_fixed_stride__( data, offset, count, stride, fields ):
+	'''
+	Returns True if there are count back to back records of stride bytes
+	 at offset, which all contain the expected uint16 values in fields
+	'''
+	if offset + count * stride > len( data ):
+		return False
+	if count == 0:
+		return True
+
+	for field_offset, value in fields:
+		values = np.ndarray(
+			( count, ), '<u2', data, offset + field_offset, ( stride, )
+		)
+		if not ( values == value ).all():
+			return False
 
-	@staticmethod
-	def LoadNoteFrameBlock(file):
-		start = file.tell() - 2
-		file.seek(start + 4)
-		data = file.read(4)
-		result = struct.unpack('i', data) + (XBlock.LoadString(file),)
-		file.seek(start + padded(file.tell() - start))
-		return result
+	return True
 
-	@staticmethod
-	def SkipExtraData(file):
-		# TODO: Figure out what the "extra data" is
-		# Currently we just skip over the extra data block. It appears to
-		# always be 2 bytes of padding followed by 16 bytes of data.
-		# It only seems to appear in xanim_bin files...
-		file.seek(file.tell() + 18)
 
+class XBlock(object):
+	'''
+	This is a namespace-like class that contains all of the block write
+	functions for the xbins (they're read by XBinIO's buffer decoder)
+	'''
 	# ############### #
 	# Write Functions #
 	# ############### #
@@ -490,6 +475,116 @@ class XBlock(object):
 			)
 		)
 
+	@staticmethod
+	def WriteVertexSection( file, mesh, vert32 = False ):
+		'''
+		Write the vertex index, offset, weight count & weight blocks for
+		 every vertex in the given MeshArrays in one go
+		'''
+		vert_count = mesh.vert_count
+		weight_counts = mesh.weight_counts()
+
+		verts = np.zeros( vert_count,
+						  _XBIN_VERT32_DTYPE if vert32 else _XBIN_VERT16_DTYPE )
+		verts[ 'index_hash' ] = 0xB097 if vert32 else 0x8F03
+		verts[ 'index' ] = np.arange( vert_count )
+		verts[ 'offset_hash' ] = 0x9383
+		verts[ 'offset' ] = mesh.positions
+		verts[ 'weight_count_hash' ] = 0xEA46
+		verts[ 'weight_count' ] = weight_counts
+
+		weights = np.zeros( len( mesh.weight_bones ), _XBIN_WEIGHT_DTYPE )
+		weights[ 'hash' ] = 0xF1AB
+		weights[ 'bone' ] = mesh.weight_bones
+		weights[ 'value' ] = mesh.weight_values
+
+		# Interleave each vertex with its weights - every block is a
+		#  multiple of 4 bytes, so the records are placed as 32 bit words
+		vert_words = verts.dtype.itemsize // 4
+		weight_words = weights.dtype.itemsize // 4
+		section = np.empty( vert_count * vert_words +
+							len( weights ) * weight_words, '<u4' )
+
+		vert_starts = ( np.arange( vert_count ) * vert_words +
+						mesh.weight_offsets[ :-1 ] * weight_words )
+		section[ vert_starts[ :, None ] + np.arange( vert_words ) ] = \
+			verts.view( '<u4' ).reshape( -1, vert_words )
+
+		# Weight k of vertex v follows all of the previous verts & weights
+		weight_starts = (
+			( mesh.weight_vertices() + 1 ) * vert_words +
+			np.arange( len( weights ) ) * weight_words
+		)
+		section[ weight_starts[ :, None ] + np.arange( weight_words ) ] = \
+			weights.view( '<u4' ).reshape( -1, weight_words )
+
+		file.write( section.tobytes() )
+
+	@staticmethod
+	def WriteFaceSection( file, mesh, vert32 = False ):
+		'''
+		Write the tri info & face vertex (index, normal, color & uv) blocks
+		 for every face in the given MeshArrays in one go
+		'''
+		face_count = mesh.face_count
+		if face_count == 0:
+			return
+
+		# Faces that use a mesh / material index above 255 need a TRI16
+		#  block, each run of faces with the same tri block is written as
+		#  a single array
+		is_tri16 = ( mesh.mesh_ids > 255 ) | ( mesh.material_ids > 255 )
+		run_bounds = np.flatnonzero( np.diff( is_tri16 ) ) + 1
+		run_starts = [ 0 ] + run_bounds.tolist()
+		run_ends = run_bounds.tolist() + [ face_count ]
+
+		for start, end in zip( run_starts, run_ends ):
+			tri16 = bool( is_tri16[ start ] )
+			faces = np.zeros( end - start, __face_dtype__( vert32, tri16 ) )
+
+			tris = faces[ 'tri' ]
+			tris[ 'hash' ] = 0x6711 if tri16 else 0x562F
+			tris[ 'mesh_id' ] = mesh.mesh_ids[ start:end ]
+			tris[ 'material_id' ] = mesh.material_ids[ start:end ]
+
+			corners = faces[ 'corners' ]
+			corners[ 'index_hash' ] = 0xB097 if vert32 else 0x8F03
+			corners[ 'index' ] = mesh.indices[ start:end ]
+			corners[ 'normal_hash' ] = 0x89EC
+			corners[ 'normal' ] = __clamp_floats_to_shorts__(
+				mesh.normals[ start:end ] )
+			corners[ 'color_hash' ] = 0x6DD8
+			corners[ 'color' ] = __floats_to_bytes__( mesh.colors[ start:end ] )
+			corners[ 'uv_hash' ] = 0x1AD4
+			corners[ 'uv_layers' ] = 1
+			corners[ 'uv' ] = mesh.uvs[ start:end ]
+
+			file.write( faces.tobytes() )
+
+	@staticmethod
+	def WriteFrameSection( file, frames ):
+		'''
+		Write the frame, part index, offset & matrix blocks for every frame
+		 in the given AnimArrays in one go
+		'''
+		records = np.zeros( len( frames ), __frame_dtype__( frames.part_count ) )
+		records[ 'hash' ] = 0xC723
+		records[ 'frame' ] = np.trunc( frames.frame_numbers )
+
+		parts = records[ 'parts' ]
+		parts[ 'index_hash' ] = 0x745A
+		parts[ 'index' ] = np.arange( frames.part_count )
+		parts[ 'offset_hash' ] = 0x9383
+		parts[ 'offset' ] = frames.offsets
+		rotations = __clamp_floats_to_shorts__( frames.rotations )
+		for axis, name, block_hash in ( ( 0, 'x', 0xDCFD ),
+										( 1, 'y', 0xCCDC ),
+										( 2, 'z', 0xFCBF ) ):
+			parts[ name + '_hash' ] = block_hash
+			parts[ name ] = rotations[ :, :, axis ]
+
+		file.write( records.tobytes() )
+
 	@staticmethod
 	def WriteMaterialInfoBlock(
 		file,
@@ -556,7 +651,7 @@ class XBlock(object):
 						   0x1675, int(note.frame), string)
 		end = file.tell() + len(data)
 		file.write(data)
-		file.write(bytearray(0) * padding(end))
+		file.write(bytearray(padding(end)))
 
 
 class XBinIO(object):
@@ -568,6 +663,23 @@ class XBinIO(object):
 
 	@staticmethod
 	def __decompress_internal__( file, dump = False ):
+		return BytesIO( XBinIO.__decompress_buffer__( file, dump ) )
+
+	@staticmethod
+	def __read_buffer__( path, is_compressed = True, dump = False ):
+		'''
+		Read the given *_bin file and return its (decompressed) contents
+		'''
+		with open( path, "rb" ) as file:
+			if is_compressed:
+				return XBinIO.__decompress_buffer__( file, dump )
+			return file.read()
+
+	@staticmethod
+	def __decompress_buffer__( file, dump = False ):
+		'''
+		Decompress the given *_bin file handle and return the raw bytes
+		'''
 		filepath = os.path.realpath(file.name)
 		bin_magic = file.read(5)
 
@@ -587,7 +699,7 @@ class XBinIO(object):
 			with open( f"{dump_name}.dump", "wb" ) as dump_file:
 				dump_file.write( data )
 
-		return BytesIO( data )
+		return data
 
 	@staticmethod
 	def __compress_internal__( in_file:BytesIO, out_file_path ):
@@ -608,88 +720,161 @@ class XBinIO(object):
 			out_file.write( struct.pack( 'I', uncompressed_size ) )
 			out_file.write( compressed_data )
 
-	def __xbin_loadfile_internal__(self, file, expected_type):
+	def __xbin_loadfile_internal__(self, data, expected_type,
+								   use_arrays=False, probe=False,
+								   stream=False):
 		'''
 		Load an x*_bin file
-		file is a handle to the file
+		data is the (decompressed) file contents, or a handle to the file
 		target_type = 'ANIM' or 'MODEL'
+		use_arrays - load the vertex & face data into an XModel.MeshArrays
+		 instead of Vertex / Face objects, or the frames into an
+		 XAnim.AnimArrays instead of Frame objects
+		probe - only count the vertex / face / frame data instead of
+		 loading it. Returns (vert_count, face_count) for models and
+		 frame_count for anims
+		stream - (anims only) return a generator that yields
+		 (parts, framerate) followed by each Frame as soon as it has been
+		 decoded. The frames aren't stored in self.frames
+
+		The blocks are decoded straight from a single memoryview over the
+		buffer - each block handler receives the offset of its block hash
+		and returns the offset of the next block
 		'''
 
 		from . import xmodel as XModel
 		from . import xanim as XAnim
 
+		if hasattr(data, 'read'):
+			data = data.read()
+
+		view = memoryview(data)
+		size = len(data)
+
 		class LoadState(object):
 			__slots__ = ('active_thing', 'active_tri',
-						 'active_frame', 'asset_type')
+						 'active_frame', 'asset_type', 'cosmetic_count',
+						 'vert_count', 'face_count', 'frame_count',
+						 'frame_arrays')
 
 			def __init__(self):
 				self.active_thing = None
 				self.active_tri = None
 				self.active_frame = None
 				self.asset_type = None
+				self.cosmetic_count = 0
+				self.vert_count = 0
+				self.face_count = 0
+				self.frame_count = 0
+				self.frame_arrays = None
 
 		state = LoadState()
 		dummy_mesh = XModel.Mesh("$default")
 
-		cosmetic_count = 0
+		# Loaded frames are collected here - when streaming, the frames are
+		#  handed out & removed as soon as the next one starts
+		frames = self.frames if expected_type == 'ANIM' and not stream else []
+
+		unpack_hash = _XBIN_UINT16.unpack_from
+		unpack_int16 = _XBIN_INT16.unpack_from
+		unpack_uint16 = _XBIN_UINT16.unpack_from
+		unpack_int32 = _XBIN_INT32.unpack_from
+		unpack_float = _XBIN_FLOAT.unpack_from
+		unpack_vec2 = _XBIN_VEC2.unpack_from
+		unpack_vec3 = _XBIN_VEC3.unpack_from
+		unpack_vec4 = _XBIN_VEC4.unpack_from
+		unpack_short_vec3 = _XBIN_SHORT_VEC3.unpack_from
+		unpack_weight = _XBIN_WEIGHT.unpack_from
+
+		def LoadString(offset):
+			'''
+			Returns the null terminated string at offset along with the
+			offset of the first byte after its terminator
+			'''
+			end = data.find(b'\x00', offset)
+			if end == -1:
+				# End of file reached unexpectedly
+				return str(view[offset:], 'utf-8'), size
+			return str(view[offset:end], 'utf-8'), end + 1
+
+		def LoadString_Aligned(offset):
+			string, end = LoadString(offset)
+			return string, offset + padded(end - offset)
+
+		def LoadShortVec3(offset):
+			x, y, z = unpack_short_vec3(view, offset)
+			return (x / 32767.0, y / 32767.0, z / 32767.0)
 
-		def InitModel(file):
-			XBlock.LoadInt16Block(file)
+		def SkipInt16Block(offset):
+			return offset + 4
+
+		def LoadCommentBlock(offset):
+			_, end = LoadString(offset + 4)
+			return offset + padded(end - offset)
+
+		def InitModel(offset):
 			state.asset_type = 'MODEL'
 			if expected_type != state.asset_type:
 				raise TypeError( f"Found {state.asset_type} asset. Expected {expected_type}" )
+			return offset + 4
 
-		def InitAnim(file):
-			XBlock.LoadInt16Block(file)
+		def InitAnim(offset):
 			state.asset_type = 'ANIM'
 			if expected_type != state.asset_type:
 				raise TypeError( f"Found {state.asset_type} asset. Expected {expected_type}" )
+			return offset + 4
 
-		def LoadVersion(file):
-			self.version = XBlock.LoadInt16Block(file)
+		def LoadVersion(offset):
+			self.version = unpack_int16(view, offset + 2)[0]
+			return offset + 4
 
-		def LoadBoneCount(file):
-			self.bones = [None] * XBlock.LoadInt16Block(file)
+		def LoadBoneCount(offset):
+			self.bones = [None] * unpack_int16(view, offset + 2)[0]
+			return offset + 4
 
-		def LoadCosmeticCount(file):
-			cosmetic_count = XBlock.LoadInt32Block(file)
+		def LoadCosmeticCount(offset):
+			state.cosmetic_count = unpack_int32(view, offset + 4)[0]
+			return offset + 8
 
-		def LoadSBoneCount(file):
+		def LoadSBoneCount(offset):
 			raise NotImplementedError("Siege models are not supported yet")
 
-		def LoadBoneInfo(file):
-			index, parent, name = XBlock.LoadBoneBlock(file)
-			cosmetic = (index >= (len(self.bones) - cosmetic_count))
+		def LoadBoneInfo(offset):
+			index, parent = _XBIN_BONE_INFO.unpack_from(view, offset + 4)
+			name, end = LoadString(offset + 12)
+			cosmetic = (index >= (len(self.bones) - state.cosmetic_count))
 			self.bones[index] = XModel.Bone(name, parent, cosmetic)
+			return offset + padded(end - offset)
 
-		def LoadBoneIndex(file):
-			index = XBlock.LoadInt16Block(file)
+		def LoadBoneIndex(offset):
+			index = unpack_int16(view, offset + 2)[0]
 			bone = self.bones[index]
 			bone.matrix = []
 			state.active_thing = bone
+			return offset + 4
 
-		def LoadOffset(file):
-			data = XBlock.LoadVec3Block(file)
-			state.active_thing.offset = data
-			return data
+		def LoadOffset(offset):
+			state.active_thing.offset = unpack_vec3(view, offset + 4)
+			return offset + 16
 
-		def LoadBoneScale(file):
-			data = XBlock.LoadVec3Block(file)
-			state.active_thing.scale = data
+		def LoadBoneScale(offset):
+			state.active_thing.scale = unpack_vec3(view, offset + 4)
+			return offset + 16
 
-		def LoadBoneMatrix(file):
-			data = XBlock.LoadShortVec3Block(file)
-			state.active_thing.matrix.append(data)
-			return data
+		def LoadBoneMatrix(offset):
+			state.active_thing.matrix.append(LoadShortVec3(offset + 2))
+			return offset + 8
 
-		def LoadVertexCount(file):
-			dummy_mesh.verts = [None] * XBlock.LoadUInt16Block(file)
+		def LoadVertexCount(offset):
+			dummy_mesh.verts = [None] * unpack_uint16(view, offset + 2)[0]
+			return offset + 4
 
-		def LoadVertex32Count(file):
-			dummy_mesh.verts = [None] * XBlock.LoadInt32Block(file)
+		def LoadVertex32Count(offset):
+			dummy_mesh.verts = [None] * unpack_int32(view, offset + 4)[0]
+			return offset + 8
 
-		def LoadVertexIndex(file):
-			index = XBlock.LoadUInt16Block(file)
+		def LoadVertexIndex(offset):
+			index = unpack_uint16(view, offset + 2)[0]
 			if state.active_tri is None:
 				vertex = XModel.Vertex()
 				dummy_mesh.verts[index] = vertex
@@ -698,9 +883,10 @@ class XBinIO(object):
 				face_vert = XModel.FaceVertex(index)
 				state.active_tri.indices.append(face_vert)
 				state.active_thing = face_vert
+			return offset + 4
 
-		def LoadVertex32Index(file):
-			index = XBlock.LoadInt32Block(file)
+		def LoadVertex32Index(offset):
+			index = unpack_int32(view, offset + 4)[0]
 			if state.active_tri is None:
 				vertex = XModel.Vertex()
 				dummy_mesh.verts[index] = vertex
@@ -709,121 +895,240 @@ class XBinIO(object):
 				face_vert = XModel.FaceVertex(index)
 				state.active_tri.indices.append(face_vert)
 				state.active_thing = face_vert
+			return offset + 8
 
-		def LoadVertexWeightCount(file):
-			# state.active_thing.weights = [None] * XBlock.LoadInt16Block(file)
-			XBlock.LoadInt16Block(file)
+		def LoadVertexWeightCount(offset):
 			state.active_thing.weights = []
-
-		def LoadVertexWeight(file):
-			state.active_thing.weights.append(
-				XBlock.LoadVertexWeightBlock(file))
-
-		def LoadTriCount(file):
-			XBlock.LoadInt32Block(file)
+			return offset + 4
+
+		def LoadVertexWeight(offset):
+			state.active_thing.weights.append(unpack_weight(view, offset + 2))
+			return offset + 8
+
+		def MatchFixedFaces(offset, face_count):
+			'''
+			If all face_count faces at offset use the fixed layout written
+			 by WriteFile_Bin, returns them as structured records (one
+			 np.frombuffer over the whole section) - otherwise None
+			'''
+			vert32 = (offset + 6 <= size and
+					  unpack_hash(view, offset + 4)[0] == 0xB097)
+			dtype, fields = __face_layout__(vert32)
+			if not __match_fixed_stride__(data, offset, face_count,
+										  dtype.itemsize, fields):
+				return None
+			return np.frombuffer(data, dtype, face_count, offset)
+
+		def FaceRecordArrays(faces):
+			'''
+			Convert face records from MatchFixedFaces into a MeshArrays
+			 (with the same values as the per-block handlers produce)
+			'''
+			mesh = XModel.MeshArrays("$default")
+			corners = faces['corners']
+			mesh.mesh_ids = faces['tri']['mesh_id'].astype(np.int32)
+			mesh.material_ids = faces['tri']['material_id'].astype(np.int32)
+			mesh.indices = corners['index'].astype(np.int32)
+			mesh.normals = corners['normal'] / 32767.0
+			mesh.colors = corners['color'] / 255.0
+			mesh.uvs = corners['uv'].astype(np.float32)
+			return mesh
+
+		def LoadTriCount(offset):
 			dummy_mesh.faces = []
-
-		def LoadTriInfo(file):
-			object_index, material_index = XBlock.LoadTriangleBlock(file)
+			offset += 8
+			faces = MatchFixedFaces(offset, unpack_int32(view, offset - 4)[0])
+			if faces is None:
+				return offset
+
+			dummy_mesh.faces = FaceRecordArrays(faces).to_faces()
+			if dummy_mesh.faces:
+				state.active_tri = dummy_mesh.faces[-1]
+			return offset + faces.nbytes
+
+		def LoadTriInfo(offset):
+			object_index, material_index = _XBIN_TRI.unpack_from(view, offset + 2)
 			tri = XModel.Face(object_index, material_index)
 			tri.indices = []
 			dummy_mesh.faces.append(tri)
 			state.active_tri = tri
+			return offset + 4
 
-		def LoadTri16Info(file):
-			object_index, material_index = XBlock.LoadTriangle16Block(file)
+		def LoadTri16Info(offset):
+			object_index, material_index = _XBIN_TRI16.unpack_from(view, offset + 4)
 			tri = XModel.Face(object_index, material_index)
 			tri.indices = []
 			dummy_mesh.faces.append(tri)
 			state.active_tri = tri
+			return offset + 8
+
+		def LoadTriVertNormal(offset):
+			x, y, z = unpack_short_vec3(view, offset + 2)
+			state.active_thing.normal = (x / 32767.0, y / 32767.0, z / 32767.0)
+			return offset + 8
+
+		def LoadTriVertColor(offset):
+			r, g, b, a = _XBIN_COLOR.unpack_from(view, offset + 4)
+			state.active_thing.color = (r / 255.0, g / 255.0, b / 255.0, a / 255.0)
+			return offset + 8
+
+		def LoadTriVertUV(offset):
+			layer_count = unpack_int16(view, offset + 2)[0]
+			# Technically there is support for additional UV layers
+			#  but we're only using the first one at the moment
+			if layer_count > 0:
+				state.active_thing.uv = unpack_vec2(view, offset + 4)
+			else:
+				state.active_thing.uv = ()
+			return offset + 4 + 8 * layer_count
 
-		def LoadTriVertNormal(file):
-			state.active_thing.normal = XBlock.LoadShortVec3Block(file)
-
-		def LoadTriVertColor(file):
-			state.active_thing.color = XBlock.LoadColorBlock(file)
-
-		def LoadTriVertUV(file):
-			state.active_thing.uv = XBlock.LoadUVBlock(file)
-
-		def LoadObjectCount(file):
-			self.meshes = [None] * XBlock.LoadInt16Block(file)
+		def LoadObjectCount(offset):
+			self.meshes = [None] * unpack_int16(view, offset + 2)[0]
+			return offset + 4
 
-		def LoadObjectInfo(file):
-			index, name = XBlock.LoadObjectBlock(file)
+		def LoadObjectInfo(offset):
+			index = unpack_int16(view, offset + 2)[0]
+			name, end = LoadString(offset + 4)
 			self.meshes[index] = XModel.Mesh(name)
-
-		def LoadMaterialCount(file):
-			self.materials = [None] * XBlock.LoadInt16Block(file)
-
-		def LoadMaterialInfo(file):
-			index, name, _type, images = XBlock.LoadMaterialBlock(file)
-			material = XModel.Material(name, _type, images)
+			return offset + padded(end - offset)
+
+		def LoadMaterialCount(offset):
+			self.materials = [None] * unpack_int16(view, offset + 2)[0]
+			return offset + 4
+
+		def LoadMaterialInfo(offset):
+			index = unpack_int16(view, offset + 2)[0]
+			name, end = LoadString_Aligned(offset + 4)
+			_type, end = LoadString_Aligned(end)
+			images, end = LoadString_Aligned(end)
+			material = XModel.Material(name, _type,
+									   deserialize_image_string(images))
 			self.materials[index] = material
 			state.active_thing = material
+			return offset + padded(end - offset)
 
-		def LoadMaterialTransparency(file):
-			state.active_thing.transparency = XBlock.LoadVec4Block(file)
+		def LoadMaterialTransparency(offset):
+			state.active_thing.transparency = unpack_vec4(view, offset + 4)
+			return offset + 20
 
-		def LoadMaterialAmbientColor(file):
-			state.active_thing.color_ambient = XBlock.LoadVec4Block(file)
+		def LoadMaterialAmbientColor(offset):
+			state.active_thing.color_ambient = unpack_vec4(view, offset + 4)
+			return offset + 20
 
-		def LoadMaterialIncandescence(file):
-			state.active_thing.incandescence = XBlock.LoadVec4Block(file)
+		def LoadMaterialIncandescence(offset):
+			state.active_thing.incandescence = unpack_vec4(view, offset + 4)
+			return offset + 20
 
-		def LoadMaterialCoeffs(file):
-			state.active_thing.coeffs = XBlock.LoadVec2Block(file)
+		def LoadMaterialCoeffs(offset):
+			state.active_thing.coeffs = unpack_vec2(view, offset + 4)
+			return offset + 12
 
-		def LoadMaterialGlow(file):
-			state.active_thing.glow = XBlock.LoadVec2Block(file)
+		def LoadMaterialGlow(offset):
+			state.active_thing.glow = unpack_vec2(view, offset + 4)
+			return offset + 12
 
-		def LoadMaterialRefractive(file):
-			state.active_thing.refractive = XBlock.LoadVec2Block(file)
+		def LoadMaterialRefractive(offset):
+			state.active_thing.refractive = unpack_vec2(view, offset + 4)
+			return offset + 12
 
-		def LoadMaterialSpecularColor(file):
-			state.active_thing.color_specular = XBlock.LoadVec4Block(file)
+		def LoadMaterialSpecularColor(offset):
+			state.active_thing.color_specular = unpack_vec4(view, offset + 4)
+			return offset + 20
 
-		def LoadMaterialReflectiveColor(file):
-			state.active_thing.color_reflective = XBlock.LoadVec4Block(file)
+		def LoadMaterialReflectiveColor(offset):
+			state.active_thing.color_reflective = unpack_vec4(view, offset + 4)
+			return offset + 20
 
-		def LoadMaterialReflective(file):
-			state.active_thing.reflective = XBlock.LoadVec2Block(file)
+		def LoadMaterialReflective(offset):
+			state.active_thing.reflective = unpack_vec2(view, offset + 4)
+			return offset + 12
 
-		def LoadMaterialBlinn(file):
-			state.active_thing.blinn = XBlock.LoadVec2Block(file)
+		def LoadMaterialBlinn(offset):
+			state.active_thing.blinn = unpack_vec2(view, offset + 4)
+			return offset + 12
 
-		def LoadMaterialPhong(file):
-			state.active_thing.phong = XBlock.LoadFloatBlock(file)
+		def LoadMaterialPhong(offset):
+			state.active_thing.phong = unpack_float(view, offset + 4)[0]
+			return offset + 8
 
 		# Animation
-		def LoadPartCount(file):
-			self.parts = [None] * XBlock.LoadInt16Block(file)
+		def LoadPartCount(offset):
+			self.parts = [None] * unpack_int16(view, offset + 2)[0]
+			return offset + 4
 
-		def LoadPartInfo(file):
-			index, name = XBlock.LoadObjectBlock(file)
+		def LoadPartInfo(offset):
+			index = unpack_int16(view, offset + 2)[0]
+			name, end = LoadString(offset + 4)
 			self.parts[index] = XAnim.PartInfo(name)
+			return offset + padded(end - offset)
 
-		def LoadPartIndex(file):
-			index = XBlock.LoadInt16Block(file)
+		def LoadPartIndex(offset):
+			index = unpack_int16(view, offset + 2)[0]
 			frame_part = XAnim.FramePart(matrix=[])
 			state.active_frame.parts[index] = frame_part
 			state.active_thing = frame_part
-			return index
-
-		def LoadFramerate(file):
-			self.framerate = XBlock.LoadInt16Block(file)
-
-		def LoadFrameCount(file):
-			XBlock.LoadInt32Block(file)
+			return offset + 4
+
+		def LoadFramerate(offset):
+			self.framerate = unpack_int16(view, offset + 2)[0]
+			return offset + 4
+
+		def MatchFixedFrames(offset, frame_count):
+			'''
+			If all frame_count frames at offset use the fixed layout written
+			 by WriteFile_Bin, returns them as structured records - otherwise
+			 None
+			'''
+			part_count = len(self.parts)
+			dtype, fields = __frame_layout__(part_count)
+			if not __match_fixed_stride__(data, offset, frame_count,
+										  dtype.itemsize, fields):
+				return None
+			records = np.frombuffer(data, dtype, frame_count, offset)
+			if not (records['parts']['index'] == np.arange(part_count)).all():
+				return None
+			return records
+
+		def FrameRecordArrays(records):
+			'''
+			Convert frame records from MatchFixedFrames into an AnimArrays
+			 (with the same values as the per-block handlers produce)
+			'''
+			parts = records['parts']
+			frame_count, part_count = parts.shape
+			arrays = XAnim.AnimArrays(frame_count, part_count)
+			arrays.frame_numbers = records['frame'].astype(np.int64)
+			arrays.offsets = parts['offset'].astype(np.float64)
+			arrays.rotations = np.stack(
+				(parts['x'], parts['y'], parts['z']), axis=2) / 32767.0
+			return arrays
+
+		def LoadFrameCount(offset):
+			offset += 8
+			if stream:
+				return offset
+
+			# Frames written by the standard writer have a fixed size so
+			#  they can all be decoded at once
+			records = MatchFixedFrames(offset, unpack_int32(view, offset - 4)[0])
+			if records is None:
+				return offset
+
+			arrays = FrameRecordArrays(records)
+			if use_arrays:
+				state.frame_arrays = arrays
+			else:
+				frames.extend(arrays.to_frames())
+			return offset + records.nbytes
 
-		def LoadFrameIndex(file):
-			frame = XAnim.Frame(XBlock.LoadInt32Block(file))
+		def LoadFrameIndex(offset):
+			frame = XAnim.Frame(unpack_int32(view, offset + 4)[0])
 			frame.parts = [None] * len(self.parts)
 			state.active_frame = frame
-			self.frames.append(frame)
-			return frame.frame
+			frames.append(frame)
+			return offset + 8
 
-		def LoadNotetracksBegin(file):
+		def LoadNotetracksBegin(offset):
 			# Activate a dummy frame, as notetracks sometimes contain part
 			# indices.
 			# If the active_frame isn't reset, the bone data for
@@ -831,14 +1136,23 @@ class XBinIO(object):
 			dummy_frame = XAnim.Frame(-1)
 			dummy_frame.parts = [None] * len(self.parts)
 			state.active_frame = dummy_frame
-			XBlock.LoadInt16Block(file)
+			return offset + 4
 
-		def LoadNoteFrame(file):
-			frame, string = XBlock.LoadNoteFrameBlock(file)
+		def LoadNoteFrame(offset):
+			frame = unpack_int32(view, offset + 4)[0]
+			string, end = LoadString(offset + 8)
 			self.notes.append(XAnim.Note(frame, string))
+			return offset + padded(end - offset)
+
+		def SkipExtraData(offset):
+			# TODO: Figure out what the "extra data" is
+			# Currently we just skip over the extra data block. It appears to
+			# always be 2 bytes of padding followed by 16 bytes of data.
+			# It only seems to appear in xanim_bin files...
+			return offset + 20
 
 		hashmap = {
-			0xC355: ("Comment block", XBlock.LoadCommentBlock),
+			0xC355: ("Comment block", LoadCommentBlock),
 			0x46C8: ("Model identification block", InitModel),
 			0x7AAC: ("Animation block", InitAnim),
 			0x24D1: ("Version block", LoadVersion),
@@ -894,9 +1208,9 @@ class XBinIO(object):
 			0xC723: ("Frame block", LoadFrameIndex),
 
 			0xC7F3: ("Notetrack section block", LoadNotetracksBegin),
-			0x9016: ("NumTracks block", XBlock.LoadInt16Block),
-			0x7A6C: ("NumKeys block", XBlock.LoadInt16Block),
-			0x4643: ("Notetrack block", XBlock.LoadInt16Block),
+			0x9016: ("NumTracks block", SkipInt16Block),
+			0x7A6C: ("NumKeys block", SkipInt16Block),
+			0x4643: ("Notetrack block", SkipInt16Block),
 			0x1675: ("Note frame block", LoadNoteFrame),
 
 			# Misc (Unimplemented)
@@ -907,33 +1221,259 @@ class XBinIO(object):
 			0xA65B: ("NUMIKPITCHLAYERS", None),
 			0x1D7D: ("IKPITCHLAYER", None),
 			0xA58B: ("ROTATION", None),
-			0x6EEE: ("EXTRA", XBlock.SkipExtraData)
+			0x6EEE: ("EXTRA", SkipExtraData)
+		}
+
+		# Array based vertex & face handlers
+		# Every vertex / face vertex gets its default values up front, the
+		#  blocks that follow then overwrite the slots of the last entry
+		vert_order = array('i')
+		positions = array('f')
+		weight_counts = array('i')
+		weight_bones = array('i')
+		weight_values = array('d')
+		face_info = array('i')
+		face_indices = array('i')
+		normals = array('d')
+		colors = array('d')
+		uvs = array('f')
+
+		def AddArrayVertex(index):
+			if state.active_tri is None:
+				vert_order.append(index)
+				positions.extend((0.0, 0.0, 0.0))
+				weight_counts.append(0)
+			else:
+				face_indices.append(index)
+				normals.extend((0.0, 0.0, 0.0))
+				colors.extend((1.0, 1.0, 1.0, 1.0))
+				uvs.extend((0.0, 0.0))
+			# Offset / color blocks that follow belong to this vertex
+			#  (rather than a bone or material)
+			state.active_thing = None
+
+		def SkipVertexCount(offset):
+			return offset + 4
+
+		def SkipVertex32Count(offset):
+			return offset + 8
+
+		def LoadArrayVertexIndex(offset):
+			AddArrayVertex(unpack_uint16(view, offset + 2)[0])
+			return offset + 4
+
+		def LoadArrayVertex32Index(offset):
+			AddArrayVertex(unpack_int32(view, offset + 4)[0])
+			return offset + 8
+
+		def LoadArrayOffset(offset):
+			if state.active_thing is not None:
+				return LoadOffset(offset)
+			i = len(positions) - 3
+			positions[i], positions[i + 1], positions[i + 2] = \
+				unpack_vec3(view, offset + 4)
+			return offset + 16
+
+		def LoadArrayVertexWeight(offset):
+			bone, value = unpack_weight(view, offset + 2)
+			weight_bones.append(bone)
+			weight_values.append(value)
+			weight_counts[-1] += 1
+			return offset + 8
+
+		def LoadArrayTriCount(offset):
+			offset += 8
+			faces = MatchFixedFaces(offset, unpack_int32(view, offset - 4)[0])
+			if faces is None:
+				return offset
+
+			mesh = FaceRecordArrays(faces)
+			face_info.frombytes(np.stack(
+				(mesh.mesh_ids, mesh.material_ids), axis=1).tobytes())
+			face_indices.frombytes(mesh.indices.tobytes())
+			normals.frombytes(mesh.normals.tobytes())
+			colors.frombytes(mesh.colors.tobytes())
+			uvs.frombytes(mesh.uvs.tobytes())
+			state.active_tri = True
+			return offset + faces.nbytes
+
+		def LoadArrayTriInfo(offset):
+			face_info.extend(_XBIN_TRI.unpack_from(view, offset + 2))
+			state.active_tri = True
+			return offset + 4
+
+		def LoadArrayTri16Info(offset):
+			face_info.extend(_XBIN_TRI16.unpack_from(view, offset + 4))
+			state.active_tri = True
+			return offset + 8
+
+		def LoadArrayTriVertNormal(offset):
+			x, y, z = unpack_short_vec3(view, offset + 2)
+			i = len(normals) - 3
+			normals[i] = x / 32767.0
+			normals[i + 1] = y / 32767.0
+			normals[i + 2] = z / 32767.0
+			return offset + 8
+
+		def LoadArrayTriVertColor(offset):
+			if state.active_thing is not None:
+				return LoadTriVertColor(offset)
+			r, g, b, a = _XBIN_COLOR.unpack_from(view, offset + 4)
+			i = len(colors) - 4
+			colors[i] = r / 255.0
+			colors[i + 1] = g / 255.0
+			colors[i + 2] = b / 255.0
+			colors[i + 3] = a / 255.0
+			return offset + 8
+
+		def LoadArrayTriVertUV(offset):
+			layer_count = unpack_int16(view, offset + 2)[0]
+			if layer_count > 0:
+				i = len(uvs) - 2
+				uvs[i], uvs[i + 1] = unpack_vec2(view, offset + 4)
+			return offset + 4 + 8 * layer_count
+
+		# Probe handlers - the vertex & face data is counted & skipped over
+		#  and loading stops as soon as the frame count is known
+		skip_sizes = {
+			0x8F03: 4, 0xB097: 8, 0x9383: 16, 0xEA46: 4, 0xF1AB: 8,
+			0x562F: 4, 0x6711: 8, 0x89EC: 8, 0x6DD8: 8
+		}
+		get_skip_size = skip_sizes.get
+
+		def SkipDataBlocks(offset):
+			'''
+			Skip over the run of vertex / face blocks starting at offset
+			'''
+			while offset < size:
+				block_hash = unpack_hash(view, offset)[0]
+				block_size = get_skip_size(block_hash)
+				if block_size is None:
+					if block_hash != 0x1AD4:
+						break
+					block_size = 4 + 8 * unpack_int16(view, offset + 2)[0]
+				offset += block_size
+			return offset
+
+		def ProbeVertexCount(offset):
+			state.vert_count = unpack_uint16(view, offset + 2)[0]
+			return SkipDataBlocks(offset + 4)
+
+		def ProbeVertex32Count(offset):
+			state.vert_count = unpack_int32(view, offset + 4)[0]
+			return SkipDataBlocks(offset + 8)
+
+		def ProbeTriCount(offset):
+			state.face_count = unpack_int32(view, offset + 4)[0]
+			offset += 8
+			# Faces written by the standard writer have a fixed size
+			#  so they can all be jumped over at once
+			faces = MatchFixedFaces(offset, state.face_count)
+			if faces is not None:
+				return offset + faces.nbytes
+			return SkipDataBlocks(offset)
+
+		def ProbeFrameCount(offset):
+			state.frame_count = unpack_int32(view, offset + 4)[0]
+			return size
+
+		def Unimplemented(offset):
+			block_hash = unpack_hash(view, offset)[0]
+			raise NotImplementedError( f"Unimplemented Block '{hashmap[block_hash][0]}' at {offset:#x}" )
+
+		# Flatten the hashmap down to just the block handlers for the hot loop
+		handlers = {
+			block_hash: Unimplemented if block[1] is None else block[1]
+			for block_hash, block in hashmap.items()
 		}
+		if use_arrays:
+			handlers.update({
+				0x950D: SkipVertexCount,
+				0x2AEC: SkipVertex32Count,
+				0x8F03: LoadArrayVertexIndex,
+				0xB097: LoadArrayVertex32Index,
+				0x9383: LoadArrayOffset,
+				0xEA46: SkipInt16Block,
+				0xF1AB: LoadArrayVertexWeight,
+				0xBE92: LoadArrayTriCount,
+				0x562F: LoadArrayTriInfo,
+				0x6711: LoadArrayTri16Info,
+				0x89EC: LoadArrayTriVertNormal,
+				0x6DD8: LoadArrayTriVertColor,
+				0x1AD4: LoadArrayTriVertUV,
+			})
+		if probe:
+			handlers.update({
+				0x950D: ProbeVertexCount,
+				0x2AEC: ProbeVertex32Count,
+				0xBE92: ProbeTriCount,
+				0xB917: ProbeFrameCount,
+			})
+		get_handler = handlers.get
+
+		def StreamFrames():
+			header_sent = False
+			offset = 0
+			while offset < size:
+				handler = get_handler(unpack_hash(view, offset)[0])
+				if handler is None:
+					block_hash = unpack_hash(view, offset)[0]
+					raise ValueError( f"Unknown Block Hash {block_hash:#06x} at {offset:#x}" )
+				offset = handler(offset)
+
+				if frames:
+					if not header_sent:
+						header_sent = True
+						yield self.parts, self.framerate
+					# The last frame may still be loading
+					if len(frames) > 1:
+						yield frames.pop(0)
+
+			if not header_sent:
+				yield self.parts, self.framerate
+			while frames:
+				yield frames.pop(0)
+
+		if stream:
+			return StreamFrames()
 
 		# Read all blocks
-		data = file.read(2)
-		while data:
-			block_hash = struct.unpack('H', data)[0]
-			if block_hash in hashmap:
-				offset = file.tell()
-				data = hashmap[block_hash]
-				if data[1] is None:
-					raise NotImplementedError( f"Unimplemented Block '{data[0]}' at 0x{offset}" )
-				else:
-					if LOG_BLOCKS:
-						print( f"Loading Block: '{data[0]}' at 0x{offset}" )
-					val = data[1](file)
-					if LOG_BLOCKS:
-						print( f"\tData: {repr(val)}" )
-
-				# Read the next block hash
-				data = file.read(2)
+		offset = 0
+		while offset < size:
+			handler = get_handler(unpack_hash(view, offset)[0])
+			if handler is None:
+				block_hash = unpack_hash(view, offset)[0]
+				raise ValueError( f"Unknown Block Hash {block_hash:#06x} at {offset:#x}" )
+
+			if LOG_BLOCKS:
+				block_hash = unpack_hash(view, offset)[0]
+				print( f"Loading Block: '{hashmap[block_hash][0]}' at {offset:#x}" )
+				end = handler(offset)
+				print( f"\tData: {view[offset:end].hex()}" )
+				offset = end
 			else:
-				offset = file.tell() - 2
-				raise ValueError( f"Unknown Block Hash 0x{block_hash} at 0x{offset}" )
+				offset = handler(offset)
+
+		if probe:
+			if state.asset_type == 'MODEL':
+				return state.vert_count, state.face_count
+			return state.frame_count
+
+		if state.asset_type == 'ANIM' and use_arrays:
+			if state.frame_arrays is None:
+				state.frame_arrays = XAnim.AnimArrays.from_frames(
+					frames, len(self.parts))
+			self.frames = state.frame_arrays
 
 		# Return the dummy mesh for splitting if we imported a model
 		if state.asset_type == 'MODEL':
+			if use_arrays:
+				mesh = XModel.MeshArrays("$default")
+				mesh.__set_verts__(vert_order, positions, weight_counts,
+								   weight_bones, weight_values)
+				mesh.__set_faces__(face_info, face_indices,
+								   normals, colors, uvs)
+				return mesh
 			return dummy_mesh
 
 	def __xbin_writefile_model_internal__(
@@ -941,6 +1481,8 @@ class XBinIO(object):
 			extended_features = True,
 			header_message = ""
 		):
+		from . import xmodel as XModel
+
 		model = self
 
 		file = BytesIO()
@@ -969,48 +1511,25 @@ class XBinIO(object):
 			XBlock.WriteMetaVec3Block(file, 0x1C56, bone.scale)  # needed?
 			XBlock.WriteMatrixBlock(file, bone.matrix)
 
-		# Used to offset the vertex indices for each mesh
-		vert_offsets = [0]
-		for mesh in model.meshes:
-			prev_index = len( vert_offsets ) - 1
-			vert_offsets.append( vert_offsets[ prev_index ] + len( mesh.verts ) )
-
-		vert_count = vert_offsets[ len( vert_offsets ) - 1 ]
+		# All of the meshes are written as a single set of vertex & face
+		#  sections
+		meshes = model.__array_meshes__()
+		merged = XModel.MeshArrays.concatenate(meshes)
 
-		if version == 7 and vert_count > 0xFFFF:
-			WriteVertexCountBlock = XBlock.WriteVertex32Count
-			WriteVertexIndexBlock = XBlock.WriteVertex32Index
+		vert32 = version == 7 and merged.vert_count > 0xFFFF
+		if vert32:
+			XBlock.WriteVertex32Count(file, merged.vert_count)
 		else:
-			WriteVertexCountBlock = XBlock.WriteVertex16Count
-			WriteVertexIndexBlock = XBlock.WriteVertex16Index
-
-		WriteVertexCountBlock(file, vert_count)
-		for mesh_index, mesh in enumerate(model.meshes):
-			vert_offset = vert_offsets[mesh_index]
-			for vert_index, vert in enumerate(mesh.verts):
-				WriteVertexIndexBlock(file, vert_index + vert_offset)
-				XBlock.WriteOffsetBlock(file, vert.offset)
-				XBlock.WriteMetaInt16Block(file, 0xEA46, len(vert.weights))
-				for weight in vert.weights:
-					XBlock.WriteVertexWeightBlock(file, weight)
+			XBlock.WriteVertex16Count(file, merged.vert_count)
+		XBlock.WriteVertexSection(file, merged, vert32)
 
 		# Faces
-		face_count = sum( len( mesh.faces ) for mesh in model.meshes )
-		XBlock.WriteMetaInt32Block(file, 0xBE92, face_count)
-		for mesh_index, mesh in enumerate(model.meshes):
-			vert_offset = vert_offsets[mesh_index]
-			for face in mesh.faces:
-				XBlock.WriteFaceInfoBlock(file, face)
-				for i in range(3):
-					ind = face.indices[i]
-					WriteVertexIndexBlock(file, ind.vertex + vert_offset)
-					XBlock.WriteFaceVertexNormalBlock(file, ind.normal)
-					XBlock.WriteColorBlock(file, ind.color)
-					XBlock.WriteFaceVertexUVBlock(file, 1, ind.uv)
+		XBlock.WriteMetaInt32Block(file, 0xBE92, merged.face_count)
+		XBlock.WriteFaceSection(file, merged, vert32)
 
 		# Objects
-		XBlock.WriteMetaInt16Block(file, 0x62AF, len(model.meshes))
-		for mesh_index, mesh in enumerate(model.meshes):
+		XBlock.WriteMetaInt16Block(file, 0x62AF, len(meshes))
+		for mesh_index, mesh in enumerate(meshes):
 			XBlock.WriteMetaObjectInfo(file, 0x87D4, mesh_index, mesh.name)
 
 		# Materials
@@ -1056,13 +1575,7 @@ class XBinIO(object):
 
 		XBlock.WriteFramerate(file, anim.framerate)
 		XBlock.WriteFrameCount(file, len(anim.frames))
-
-		for frame in anim.frames:
-			XBlock.WriteFrameIndex(file, frame.frame)
-			for part_index, part in enumerate(frame.parts):
-				XBlock.WritePartIndex(file, part_index)
-				XBlock.WriteOffsetBlock(file, part.offset)
-				XBlock.WriteMatrixBlock(file, part.matrix)
+		XBlock.WriteFrameSection(file, anim.__array_frames__())
 
 		XBlock.WriteMetaInt16Block(file, 0x7A6C, len(anim.notes))
 		if anim.notes:
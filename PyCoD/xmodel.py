@@ -1,13 +1,16 @@
 # <pep8 compliant>
 
-from itertools import repeat
-from math import sqrt
+from array import array
+from itertools import chain, repeat
 from time import strftime
-from mathutils import Vector
 
+import os
 import re
+from io import StringIO
+import numpy as np
 
 from .xbin import XBinIO, validate_version
+from . import cache
 
 def clamp_float( value ):
 	return max( min( value, 1.0 ), -1.0 )
@@ -27,26 +30,75 @@ def __clamp_multi__( value ):
 ROUNDING_THRESHOLD = 0.00001526
 
 def __process_normal__( normal_tuple ):
-	"""Processes a normal for writing to an ASCII file"""
-	vec = Vector( normal_tuple )
-
-	# Handle true zero-vectors as to prevent division by zero.
-	if vec.length < 1e-6:
-		return (0.0, 0.0, 1.0)
-
-	# Normalize the vector to length 1.
-	vec.normalize()
+	"""
+	Processes a normal for writing to an ASCII file
+	Returns an (x, y, z) tuple, see __process_normals__
+	"""
+	return tuple( __process_normals__( normal_tuple )[ 0 ].tolist() )
+
+def __length_sq_f32__( vecs ):
+	"""
+	Squared lengths of an (n, 3) float32 array the way mathutils'
+	 Vector.normalize() gets them - each component is squared & summed
+	 as a double (z first)
+	"""
+	v64 = vecs.astype( np.float64 )
+	length_sq = v64[ :, 2 ] * v64[ :, 2 ] + v64[ :, 1 ] * v64[ :, 1 ]
+	length_sq += v64[ :, 0 ] * v64[ :, 0 ]
+	return length_sq
+
+def __normalize_f32__( vecs ):
+	"""
+	Normalize an (n, 3) float32 array the way mathutils' Vector.normalize()
+	 does - the single precision components are scaled by 1 / length
+	 (zero length vectors become zero)
+	"""
+	length_sq = __length_sq_f32__( vecs )
+
+	valid = length_sq > 1.0e-35
+	scale = np.zeros( len( vecs ), np.float32 )
+	scale[ valid ] = np.float32( 1.0 ) / np.sqrt( length_sq[ valid ] ).astype( np.float32 )
+	vecs = vecs * scale[ :, None ]
+	vecs[ ~valid ] = 0.0
+	return vecs
+
+def __process_normals__( normals ):
+	"""
+	Processes an (n, 3) array of normals for writing to an ASCII file
+	Every normal is normalized, components too small for APE are flushed
+	 to zero & it's normalized again - zero length normals become (0, 0, 1)
+	This works in single precision to give the same numbers as the
+	 mathutils.Vector based version this replaced
+	"""
+	vecs = np.asarray( normals, np.float64 ).reshape( -1, 3 ).astype( np.float32 )
+
+	# Same precision as __normalize_f32__, so both agree on every vector
+	length = np.sqrt( __length_sq_f32__( vecs ) )
+
+	vecs = __normalize_f32__( vecs )
 
 	# Flush components that are too small for APE to see.
-	x, y, z = vec.x, vec.y, vec.z
-	if abs( x ) < ROUNDING_THRESHOLD: x = 0.0
-	if abs( y ) < ROUNDING_THRESHOLD: y = 0.0
-	if abs( z ) < ROUNDING_THRESHOLD: z = 0.0
-
-	vec = Vector( (x, y, z) )
-	vec.normalize()
-
-	return vec
+	vecs[ np.abs( vecs.astype( np.float64 ) ) < ROUNDING_THRESHOLD ] = 0.0
+	vecs = __normalize_f32__( vecs )
+
+	# Handle true zero-vectors
+	vecs[ length < 1e-6 ] = ( 0.0, 0.0, 1.0 )
+
+	return vecs
+
+def __write_rows__( file, template, columns, chunk_size = 0x4000 ):
+	"""
+	Write template formatted with every row of columns (a list of equal
+	 length arrays) to file, building chunk_size rows at a time into one
+	 big string instead of writing each line separately
+	"""
+	row_count = len( columns[ 0 ] ) if columns else 0
+	for start in range( 0, row_count, chunk_size ):
+		end = start + chunk_size
+		file.write( "".join( map(
+			template.format,
+			*[ column[ start:end ].tolist() for column in columns ]
+		) ) )
 
 def deserialize_image_string( ref_string ):
 	if not ref_string:
@@ -173,17 +225,17 @@ class FaceVertex(object):
 
 	def save(self, file, version, index_offset, vert_tok_suffix=""):
 		vert_id = self.vertex + index_offset
-		nrml_vec = __process_normal__( self.normal )
+		nrml_x, nrml_y, nrml_z = __process_normal__( self.normal )
 		if version == 5:
 			file.write(
 				f"VERT {vert_id} "
-				f"{nrml_vec.x:.6f} {nrml_vec.y:.6f} {nrml_vec.z:.6f} "
+				f"{nrml_x:.6f} {nrml_y:.6f} {nrml_z:.6f} "
 				f"{self.uv[ 0 ]} {self.uv[ 1 ]}\n"
 			)
 		else:
 			file.write(
 				f"VERT{vert_tok_suffix} {vert_id}\n"
-				f"NORMAL {nrml_vec.x:.6f} {nrml_vec.y:.6f} {nrml_vec.z:.6f}\n"
+				f"NORMAL {nrml_x:.6f} {nrml_y:.6f} {nrml_z:.6f}\n"
 				f"COLOR {self.color[ 0 ]} {self.color[ 1 ]} {self.color[ 2 ]} {self.color[ 3 ]}\n"
 				f"UV 1 {self.uv[ 0 ]:.6f} {self.uv[ 1 ]:.6f}\n\n"
 			)
@@ -353,6 +405,172 @@ class Material(object):
 			)
 
 
+def __split_raw_sections__(text):
+	'''
+	Split everything after the bones of an xmodel_export file into its
+	 vertex, face & object / material sections
+	'''
+	def find(token, pos):
+		pos = text.find(token, pos)
+		return len(text) if pos == -1 else pos
+
+	vert_start = find("NUMVERTS", 0)
+	face_start = find("NUMFACES", vert_start)
+	end = min(find("NUMOBJECTS", face_start),
+			  find("NUMMATERIALS", face_start))
+	return text[vert_start:face_start], text[face_start:end], text[end:]
+
+
+def __section_count__(section):
+	'''
+	Returns the count from the header line of a vertex / face section
+	'''
+	if not section:
+		return 0
+	return int(section.split(None, 2)[1].rstrip(","))
+
+
+def __raw_chunks__(text, token, chunk_size=1 << 22):
+	'''
+	Split a section into chunks of roughly chunk_size characters so only
+	 one chunk is tokenized at a time - each chunk (apart from the first)
+	 starts with a line beginning with token
+	'''
+	token = "\n" + token
+	start = 0
+	while start < len(text):
+		end = text.find(token, start + chunk_size)
+		if end == -1:
+			end = len(text)
+		yield text[start:end]
+		start = end
+
+
+def __parse_vert_chunk__(chunk):
+	# Each vertex is VERT i OFFSET x y z BONES n + n * (BONE b w) - so the
+	#  weight counts decide where every vertex starts in the token list
+	counts = np.array(re.findall(r"BONES[\s,]+(\d+)", chunk), np.int64)
+	tokens = chunk.replace(",", " ").split()
+
+	sizes = 8 + 3 * counts
+	starts = np.zeros(len(counts), np.int64)
+	np.cumsum(sizes[:-1], out=starts[1:])
+	if sizes.sum() != len(tokens):
+		return None
+
+	tokens = np.array(tokens, dtype=object)
+	verts = tokens[starts[:, None] + np.arange(8)]
+	if not (((verts[:, 0] == "VERT") | (verts[:, 0] == "VERT32")).all()
+			and (verts[:, 2] == "OFFSET").all()
+			and (verts[:, 6] == "BONES").all()):
+		return None
+
+	# Weight k of vertex v starts at starts[v] + 8 + 3k
+	weight_starts = np.arange(counts.sum()) * 3
+	weight_starts += np.repeat(starts + 8 - 3 * (np.cumsum(counts) - counts),
+							   counts)
+	weights = tokens[weight_starts[:, None] + np.arange(3)]
+	if not (weights[:, 0] == "BONE").all():
+		return None
+
+	return (verts[:, 1].astype(np.int32), verts[:, 3:6].astype(np.float64),
+			counts.astype(np.int32), weights[:, 1].astype(np.int32),
+			weights[:, 2].astype(np.float64))
+
+
+def __parse_vert_section__(section):
+	'''
+	Tokenize & convert a whole vertex section (including its NUMVERTS line)
+	 in bulk rather than line by line
+	Returns (vert_order, positions, weight_counts, weight_bones,
+	 weight_values) or None if the section isn't laid out the usual way
+	'''
+	header, _, body = section.partition("\n")
+	try:
+		vert_count = __section_count__(header)
+		chunks = [__parse_vert_chunk__(chunk)
+				  for chunk in __raw_chunks__(body, "VERT")]
+	except (IndexError, ValueError):
+		return None
+
+	if not chunks or None in chunks:
+		return None
+
+	verts = [np.concatenate(column) for column in zip(*chunks)]
+	vert_order = verts[0]
+	if (len(vert_order) != vert_count or vert_order.min() < 0 or
+			vert_order.max() >= vert_count):
+		return None
+	return verts
+
+
+def __parse_face_chunk__(chunk, version):
+	tokens = chunk.replace(",", " ").split()
+
+	# Every face is TRI m mat 0 0 followed by 3 corners, which are
+	#  VERT i NORMAL x y z COLOR r g b a UV 1 u v - or VERT i x y z u v
+	#  for version 5 - so the tokens can be viewed as a (faces, tokens) table
+	if version == 5:
+		corner_size = 7
+		keywords = ((0, {"VERT", "VERT32"}),)
+	else:
+		corner_size = 15
+		keywords = ((0, {"VERT", "VERT32"}), (2, {"NORMAL"}),
+					(6, {"COLOR"}), (11, {"UV"}), (12, {"1"}))
+
+	face_size = 5 + 3 * corner_size
+	if len(tokens) % face_size:
+		return None
+
+	# Check the keywords column by column before converting anything
+	if not set(tokens[0::face_size]) <= {"TRI", "TRI16"}:
+		return None
+	for corner in range(5, face_size, corner_size):
+		for column, keyword in keywords:
+			if not set(tokens[corner + column::face_size]) <= keyword:
+				return None
+
+	faces = np.array(tokens, dtype=object).reshape(-1, face_size)
+	corners = faces[:, 5:].reshape(-1, 3, corner_size)
+	if version == 5:
+		normals = corners[:, :, 2:5]
+		colors = None
+		uvs = corners[:, :, 5:7]
+	else:
+		normals = corners[:, :, 3:6]
+		colors = corners[:, :, 7:11].astype(np.float64)
+		uvs = corners[:, :, 13:15]
+
+	return (faces[:, 1:3].astype(np.int32),
+			corners[:, :, 1].astype(np.int32),
+			normals.astype(np.float64), colors, uvs.astype(np.float64))
+
+
+def __parse_face_section__(section, version):
+	'''
+	Tokenize & convert a whole face section (including its NUMFACES line)
+	 in bulk rather than line by line
+	Returns (face_info, indices, normals, colors, uvs) - colors is None for
+	 version 5 - or None if the section isn't laid out the usual way
+	'''
+	header, _, body = section.partition("\n")
+	try:
+		face_count = __section_count__(header)
+		chunks = [__parse_face_chunk__(chunk, version)
+				  for chunk in __raw_chunks__(body, "TRI")]
+	except (IndexError, ValueError):
+		return None
+
+	if not chunks or None in chunks:
+		return None
+
+	faces = [None if column[0] is None else np.concatenate(column)
+			 for column in zip(*chunks)]
+	if len(faces[0]) != face_count:
+		return None
+	return faces
+
+
 class Mesh(object):
 	__slots__ = ('name', 'verts', 'faces', 'bone_groups',
 				 'material_groups', '__vert_tok')
@@ -431,6 +649,627 @@ class Mesh(object):
 
 		return lines_read
 
+	def __load_vert_section__(self, section, model):
+		'''
+		Load the vertex section (the NUMVERTS line & all of its verts) in
+		 bulk, falling back to __load_verts__ if it can't be
+		'''
+		verts = __parse_vert_section__(section)
+		if verts is None:
+			self.__load_verts__(StringIO(section), model)
+			return
+
+		self.__vert_tok = ('VERT32' if section.startswith('NUMVERTS32')
+						   else 'VERT')
+		self.bone_groups = [[] for i in repeat(None, len(model.bones))]
+
+		arrays = MeshArrays(self.name)
+		arrays.__set_verts__(*verts, dtype=np.float64)
+		self.verts = arrays.to_verts()
+
+	def __load_face_section__(self, section, version):
+		'''
+		Load the face section (the NUMFACES line & all of its faces) in
+		 bulk, falling back to __load_faces__ if it can't be
+		'''
+		faces = __parse_face_section__(section, version)
+		if faces is None:
+			self.__load_faces__(StringIO(section), version)
+			return
+
+		self.material_groups = []
+
+		arrays = MeshArrays(self.name)
+		arrays.__set_faces__(*faces, dtype=np.float64)
+		self.faces = arrays.to_faces()
+
+		# Version 5 has no vertex colors
+		if version == 5:
+			for face in self.faces:
+				for vert in face.indices:
+					vert.color = None
+
+
+def process_weights(
+		weight_offsets, weight_bones, weight_values,
+		max_influences = 0, min_weight = 0.0,
+		norm = None, normalize_all = False
+	):
+	'''
+	Clean up the CSR vertex weights of any number of verts in one go
+	(weight_offsets, weight_bones, weight_values are laid out the same way
+	 as they are in MeshArrays)
+		max_influences	- only keep the N largest weights of each vert
+						  (0 for no limit) - limited verts are left sorted
+						  from largest to smallest weight
+		min_weight		- remove weights below this (each vert always
+						  keeps its largest weight)
+		norm			- 'l1' or 'l2' to renormalize the weights of every
+						  vert that lost weights (or None)
+		normalize_all	- renormalize every vert instead
+	Returns (weight_offsets, weight_bones, weight_values, changed) where
+	 changed is the number of verts whose weights were altered
+	'''
+	offsets = np.asarray(weight_offsets, np.int64)
+	bones = np.asarray(weight_bones)
+	values = np.asarray(weight_values, np.float64)
+
+	vert_count = len(offsets) - 1
+	counts = np.diff(offsets)
+	verts = np.repeat(np.arange(vert_count), counts)
+	changed = np.zeros(vert_count, bool)
+
+	# Rank of each weight within its vert, from largest to smallest
+	#  (the sort is stable, so equal weights keep their order)
+	order = np.lexsort((-values, verts))
+	rank = np.empty(len(values), np.int64)
+	rank[order] = np.arange(len(values)) - np.repeat(offsets[:-1], counts)
+
+	keep = np.ones(len(values), bool)
+	if min_weight > 0.0:
+		keep &= (values >= min_weight) | (rank == 0)
+	kept = np.bincount(verts[keep], minlength=vert_count)
+	changed |= kept != counts
+
+	if max_influences > 0:
+		# Only the verts with too many weights are limited (& sorted)
+		# The weights removed by min_weight are the smallest ones, so the
+		#  rank among the kept weights is the same
+		over = kept > max_influences
+		keep &= ~over[verts] | (rank < max_influences)
+		changed |= over
+
+		# Place the weights of the limited verts in sorted order
+		position = np.arange(len(values)) - np.repeat(offsets[:-1], counts)
+		position = np.where(over[verts], rank, position)
+		order = np.lexsort((position, verts))
+	else:
+		order = np.arange(len(values))
+
+	order = order[keep[order]]
+	bones = bones[order]
+	values = values[order]
+	verts = verts[order]
+	counts = np.bincount(verts, minlength=vert_count)
+
+	if norm is not None:
+		rescale = np.ones(vert_count, bool) if normalize_all else changed
+		if norm == 'l1':
+			length = np.bincount(verts, weights=np.abs(values),
+								 minlength=vert_count)
+		elif norm == 'l2':
+			length = np.power(np.bincount(verts, weights=values * values,
+										  minlength=vert_count), 0.5)
+		else:
+			raise ValueError("Invalid norm: %r - must be 'l1' or 'l2'" % norm)
+
+		rescale &= length > 0.0
+		rows = rescale[verts]
+		values[rows] = values[rows] / length[verts[rows]]
+		changed |= rescale & (length != 1.0)
+
+	offsets = np.zeros(vert_count + 1, np.int32)
+	np.cumsum(counts, out=offsets[1:])
+	return offsets, bones, values, int(np.count_nonzero(changed))
+
+
+class MeshArrays(object):
+	'''
+	Structure-of-arrays form of a Mesh
+	Instead of one Vertex per vertex and one Face + three FaceVertex objects
+	 per triangle, the mesh data is stored in flat NumPy arrays:
+		positions		- (vert_count, 3) float32
+		weight_offsets	- (vert_count + 1,) int32 CSR row offsets into
+						  weight_bones / weight_values for each vertex
+		weight_bones	- (weight_count,) int32 bone indices
+		weight_values	- (weight_count,) float64 influences
+		indices			- (face_count, 3) int32 vertex indices
+		mesh_ids		- (face_count,) int32
+		material_ids	- (face_count,) int32
+		normals			- (face_count, 3, 3) float64 per-corner normals
+		colors			- (face_count, 3, 4) float64 per-corner colors
+		uvs				- (face_count, 3, 2) float32 per-corner uvs
+
+	NOTE: Weights, normals & colors are kept as float64 so they survive
+	 being written back out unchanged - the bin writer truncates normals &
+	 colors to shorts / bytes, so float32 values could drop to the next
+	 lowest step (ie. 254 instead of 255)
+	'''
+	__slots__ = ('name', 'positions',
+				 'weight_offsets', 'weight_bones', 'weight_values',
+				 'indices', 'mesh_ids', 'material_ids',
+				 'normals', 'colors', 'uvs')
+
+	def __init__(self, name, vert_count=0, face_count=0, weight_count=0):
+		self.name = name
+
+		self.positions = np.zeros((vert_count, 3), np.float32)
+		self.weight_offsets = np.zeros(vert_count + 1, np.int32)
+		self.weight_bones = np.zeros(weight_count, np.int32)
+		self.weight_values = np.zeros(weight_count, np.float64)
+
+		self.indices = np.zeros((face_count, 3), np.int32)
+		self.mesh_ids = np.zeros(face_count, np.int32)
+		self.material_ids = np.zeros(face_count, np.int32)
+		self.normals = np.zeros((face_count, 3, 3), np.float64)
+		self.colors = np.ones((face_count, 3, 4), np.float64)
+		self.uvs = np.zeros((face_count, 3, 2), np.float32)
+
+	@property
+	def vert_count(self):
+		return len(self.positions)
+
+	@property
+	def face_count(self):
+		return len(self.indices)
+
+	def weight_counts(self):
+		'''
+		Returns the number of weights for each vertex
+		'''
+		return np.diff(self.weight_offsets)
+
+	def weight_vertices(self):
+		'''
+		Returns the vertex index for each entry in weight_bones / weight_values
+		'''
+		return np.repeat(np.arange(self.vert_count, dtype=np.int32),
+						 self.weight_counts())
+
+	@staticmethod
+	def from_mesh(mesh, dtype=np.float32):
+		'''
+		Convert an (object based) Mesh into a MeshArrays
+		dtype is used for the positions & uvs
+		'''
+		verts = mesh.verts
+		faces = mesh.faces
+		vert_count = len(verts)
+		corner_count = len(faces) * 3
+		flatten = chain.from_iterable
+
+		arrays = MeshArrays(mesh.name)
+		arrays.positions = np.fromiter(
+			flatten(vert.offset for vert in verts), dtype,
+			vert_count * 3).reshape(-1, 3)
+
+		counts = np.fromiter((len(vert.weights) for vert in verts),
+							 np.int32, vert_count)
+		arrays.weight_offsets = np.zeros(vert_count + 1, np.int32)
+		np.cumsum(counts, out=arrays.weight_offsets[1:])
+		weight_count = int(arrays.weight_offsets[-1])
+		weights = np.fromiter(
+			flatten(flatten(vert.weights) for vert in verts), np.float64,
+			weight_count * 2).reshape(-1, 2)
+		arrays.weight_bones = weights[:, 0].astype(np.int32)
+		arrays.weight_values = weights[:, 1].copy()
+
+		arrays.mesh_ids = np.fromiter((face.mesh_id for face in faces),
+									  np.int32, len(faces))
+		arrays.material_ids = np.fromiter(
+			(face.material_id for face in faces), np.int32, len(faces))
+
+		corners = [ind for face in faces for ind in face.indices]
+		white = (1.0, 1.0, 1.0, 1.0)
+		arrays.indices = np.fromiter((ind.vertex for ind in corners),
+									 np.int32, corner_count).reshape(-1, 3)
+		arrays.normals = np.fromiter(
+			flatten(ind.normal for ind in corners), np.float64,
+			corner_count * 3).reshape(-1, 3, 3)
+		arrays.colors = np.fromiter(
+			flatten(ind.color if ind.color is not None else white
+					for ind in corners), np.float64,
+			corner_count * 4).reshape(-1, 3, 4)
+		arrays.uvs = np.fromiter(
+			flatten(ind.uv for ind in corners), dtype,
+			corner_count * 2).reshape(-1, 3, 2)
+		return arrays
+
+	def to_mesh(self):
+		'''
+		Convert this MeshArrays back into an (object based) Mesh
+		'''
+		mesh = Mesh(self.name)
+		mesh.verts = self.to_verts()
+		mesh.faces = self.to_faces()
+		return mesh
+
+	def to_verts(self):
+		'''
+		Returns a list of Vertex objects for the verts in this MeshArrays
+		'''
+		weights = list(zip(self.weight_bones.tolist(),
+						   self.weight_values.tolist()))
+		offsets = self.weight_offsets.tolist()
+		return [
+			Vertex(tuple(position), weights[offsets[i]:offsets[i + 1]])
+			for i, position in enumerate(self.positions.tolist())
+		]
+
+	def to_faces(self):
+		'''
+		Returns a list of Face objects for the faces in this MeshArrays
+		'''
+		# Build the per-corner tuples column by column (much faster than
+		#  converting the nested arrays)
+		def corner_tuples(values, size):
+			return zip(*values.reshape(-1, size).T.tolist())
+
+		corners = list(map(FaceVertex,
+						   self.indices.ravel().tolist(),
+						   corner_tuples(self.normals, 3),
+						   corner_tuples(self.colors, 4),
+						   corner_tuples(self.uvs, 2)))
+
+		faces = list(map(Face, self.mesh_ids.tolist(),
+						 self.material_ids.tolist()))
+		for i, face in enumerate(faces):
+			face.indices = corners[i * 3:i * 3 + 3]
+
+		return faces
+
+	@staticmethod
+	def concatenate(meshes, name="$default"):
+		'''
+		Merge the given MeshArrays into a single MeshArrays - the vertex
+		 indices of each mesh's faces are offset to match
+		'''
+		merged = MeshArrays(name)
+		if not meshes:
+			return merged
+
+		vert_offsets = np.cumsum([0] + [mesh.vert_count for mesh in meshes])
+		merged.positions = np.concatenate([mesh.positions for mesh in meshes])
+		merged.weight_offsets = np.zeros(vert_offsets[-1] + 1, np.int32)
+		np.cumsum(np.concatenate([mesh.weight_counts() for mesh in meshes]),
+				  out=merged.weight_offsets[1:])
+		merged.weight_bones = np.concatenate(
+			[mesh.weight_bones for mesh in meshes])
+		merged.weight_values = np.concatenate(
+			[mesh.weight_values for mesh in meshes])
+
+		merged.indices = np.concatenate(
+			[mesh.indices + offset
+			 for mesh, offset in zip(meshes, vert_offsets.tolist())])
+		for attr in ('mesh_ids', 'material_ids', 'normals', 'colors', 'uvs'):
+			setattr(merged, attr, np.concatenate(
+				[getattr(mesh, attr) for mesh in meshes]))
+
+		return merged
+
+	def take_verts(self, vert_indices):
+		'''
+		Returns the positions & CSR weights for the given vertex indices
+		(in that order) as (positions, weight_offsets,
+		 weight_bones, weight_values)
+		'''
+		starts = self.weight_offsets[vert_indices]
+		counts = self.weight_offsets[vert_indices + 1] - starts
+
+		offsets = np.zeros(len(vert_indices) + 1, np.int32)
+		np.cumsum(counts, out=offsets[1:])
+
+		# Index of every selected weight in the source arrays
+		src = np.arange(offsets[-1], dtype=np.int32)
+		src += np.repeat(starts - offsets[:-1], counts)
+
+		return (self.positions[vert_indices], offsets,
+				self.weight_bones[src], self.weight_values[src])
+
+	def save_verts(self, file, vert_tok_suffix="", chunk_size=0x4000):
+		'''
+		Write the verts in the same format as Vertex.save, building
+		 chunk_size verts at a time into one big string
+		'''
+		header = ("VERT" + vert_tok_suffix + " {}\n"
+				  "OFFSET {:.6f} {:.6f} {:.6f}\n"
+				  "BONES {}\n")
+		counts = self.weight_counts()
+		offsets = self.weight_offsets
+
+		for start in range(0, self.vert_count, chunk_size):
+			end = min(start + chunk_size, self.vert_count)
+			positions = self.positions[start:end]
+			headers = list(map(header.format, range(start, end),
+							   positions[:, 0].tolist(),
+							   positions[:, 1].tolist(),
+							   positions[:, 2].tolist(),
+							   counts[start:end].tolist()))
+
+			first, last = offsets[start], offsets[end]
+			weights = list(map("BONE {} {}\n".format,
+							   self.weight_bones[first:last].tolist(),
+							   self.weight_values[first:last].tolist()))
+
+			# Each vert takes up 2 + weight count slots - its header, its
+			#  weights & a blank line
+			local = offsets[start:end + 1] - first
+			verts = np.arange(end - start)
+			lines = np.empty(2 * len(verts) + len(weights), dtype=object)
+			lines[2 * verts + local[:-1]] = headers
+			lines[2 * np.repeat(verts, counts[start:end]) + 1 +
+				  np.arange(len(weights))] = weights
+			lines[2 * verts + local[1:] + 1] = "\n"
+			file.write("".join(lines.tolist()))
+
+	def save_faces(self, file, version, vert_tok_suffix="",
+				   chunk_size=0x4000):
+		'''
+		Write the faces in the same format as Face.save - the normals of
+		 all of the faces are processed at once
+		'''
+		normals = __process_normals__(self.normals).reshape(-1, 3, 3)
+
+		# Only use TRI16 if we're using version 7 or newer, etc.
+		tokens = np.full(self.face_count, "TRI", dtype=object)
+		if version >= 7:
+			tokens[(self.mesh_ids > 255) | (self.material_ids > 255)] = "TRI16"
+
+		columns = [tokens, self.mesh_ids, self.material_ids]
+		if version == 5:
+			corner = "VERT {} {:.6f} {:.6f} {:.6f} {} {}\n"
+			for i in range(3):
+				columns += [self.indices[:, i], normals[:, i, 0],
+							normals[:, i, 1], normals[:, i, 2],
+							self.uvs[:, i, 0], self.uvs[:, i, 1]]
+		else:
+			corner = ("VERT" + vert_tok_suffix + " {}\n"
+					  "NORMAL {:.6f} {:.6f} {:.6f}\n"
+					  "COLOR {} {} {} {}\n"
+					  "UV 1 {:.6f} {:.6f}\n\n")
+			for i in range(3):
+				columns += [self.indices[:, i], normals[:, i, 0],
+							normals[:, i, 1], normals[:, i, 2],
+							self.colors[:, i, 0], self.colors[:, i, 1],
+							self.colors[:, i, 2], self.colors[:, i, 3],
+							self.uvs[:, i, 0], self.uvs[:, i, 1]]
+
+		template = "{} {} {} 0 0\n" + corner * 3 + "\n"
+		__write_rows__(file, template, columns, chunk_size)
+
+	def __load_verts__(self, file, model):
+		lines_read = 0
+		vert_count = 0
+		vert_tok = 'VERT'
+
+		for line in file:
+			lines_read += 1
+
+			line_split = line.split()
+			if not line_split:
+				continue
+
+			if line_split[0] == 'NUMVERTS':
+				vert_tok = 'VERT'
+			elif line_split[0] == 'NUMVERTS32':
+				vert_tok = 'VERT32'
+			else:
+				continue
+
+			vert_count = int(line_split[1])
+			break
+
+		vert_order = array('i')
+		positions = array('f')
+		counts = array('i', [0]) * vert_count
+		bones = array('i')
+		values = array('d')
+
+		verts_read = 0
+		weights_left = 0
+		if vert_count:
+			for line in file:
+				lines_read += 1
+
+				line_split = line.replace(',', ' ').split()
+				if not line_split:
+					continue
+
+				token = line_split[0]
+				if token == "BONE":
+					bones.append(int(line_split[1]))
+					values.append(float(line_split[2]))
+					weights_left -= 1
+				elif token == "OFFSET":
+					positions.extend(
+						(float(line_split[1]), float(line_split[2]),
+						 float(line_split[3])))
+				elif token == vert_tok:
+					vert_index = int(line_split[1])
+					if vert_index >= vert_count:
+						raise ValueError(
+							f"vert_count does not index vert_index -- "
+							f"{vert_index} not in [0, {vert_count})"
+						)
+					vert_order.append(vert_index)
+					verts_read += 1
+					# Wait for the BONES line before checking if we're done
+					weights_left = -1
+					continue
+				elif token == "BONES":
+					weights_left = int(line_split[1])
+					counts[verts_read - 1] = weights_left
+				else:
+					continue
+
+				if verts_read == vert_count and weights_left == 0:
+					break
+
+		self.__set_verts__(vert_order, positions, counts, bones, values)
+
+		return lines_read
+
+	def __set_verts__(self, vert_order, positions, weight_counts,
+					  weight_bones, weight_values, dtype=np.float32):
+		'''
+		Fill the vertex arrays from the flat buffers built by the loaders
+		 (array.array, NumPy arrays or any other buffer)
+		The verts are stored in the order they were read (vert_order) - if
+		 that doesn't match the order of their indices, rearrange them
+		dtype is used for the positions
+		'''
+		self.positions = np.asarray(positions, dtype).reshape(-1, 3)
+		self.weight_offsets = np.zeros(len(weight_counts) + 1, np.int32)
+		np.cumsum(np.asarray(weight_counts, np.int32),
+				  out=self.weight_offsets[1:])
+		self.weight_bones = np.asarray(weight_bones, np.int32)
+		self.weight_values = np.asarray(weight_values, np.float64)
+
+		vert_order = np.asarray(vert_order, np.int32)
+		if np.array_equal(vert_order, np.arange(len(vert_order))):
+			return
+
+		order = np.argsort(vert_order, kind='stable')
+		(self.positions, self.weight_offsets,
+		 self.weight_bones, self.weight_values) = self.take_verts(order)
+
+	def __set_faces__(self, face_info, indices, normals, colors, uvs,
+					  dtype=np.float32):
+		'''
+		Fill the face arrays from the flat buffers built by the loaders
+		face_info contains (mesh_id, material_id) pairs for every face
+		colors may be None (version 5) in which case they're all white
+		dtype is used for the uvs
+		'''
+		face_info = np.asarray(face_info, np.int32).reshape(-1, 2)
+		self.mesh_ids = face_info[:, 0].copy()
+		self.material_ids = face_info[:, 1].copy()
+		self.indices = np.asarray(indices, np.int32).reshape(-1, 3)
+		self.normals = np.asarray(normals, np.float64).reshape(-1, 3, 3)
+		if colors is None:
+			self.colors = np.ones((len(self.indices), 3, 4), np.float64)
+		else:
+			self.colors = np.asarray(colors, np.float64).reshape(-1, 3, 4)
+		self.uvs = np.asarray(uvs, dtype).reshape(-1, 3, 2)
+
+	def __load_faces__(self, file, version):
+		lines_read = 0
+		face_count = 0
+
+		for line in file:
+			lines_read += 1
+
+			line_split = line.split()
+			if not line_split:
+				continue
+
+			if line_split[0] == "NUMFACES":
+				face_count = int(line_split[1].rstrip(","))
+				break
+
+		face_info = array('i')
+		indices = array('i')
+		normals = array('d')
+		colors = array('d')
+		uvs = array('f')
+
+		corners_read = 0
+		corner_count = face_count * 3
+		if corner_count:
+			for line in file:
+				lines_read += 1
+
+				line_split = line.replace(',', ' ').split()
+				if not line_split:
+					continue
+
+				token = line_split[0]
+				# Support both TRI & TRI16
+				if token.startswith("TRI"):
+					face_info.append(int(line_split[1]))
+					face_info.append(int(line_split[2]))
+				elif version == 5 and token == "VERT":
+					indices.append(int(line_split[1]))
+					normals.extend(
+						(float(line_split[2]), float(line_split[3]),
+						 float(line_split[4])))
+					colors.extend((1.0, 1.0, 1.0, 1.0))
+					uvs.extend((float(line_split[5]), float(line_split[6])))
+					corners_read += 1
+					if corners_read == corner_count:
+						break
+				elif token.startswith("VERT"):
+					indices.append(int(line_split[1]))
+				elif token == "NORMAL":
+					normals.extend(
+						(float(line_split[1]), float(line_split[2]),
+						 float(line_split[3])))
+				elif token == "COLOR":
+					colors.extend(
+						(float(line_split[1]), float(line_split[2]),
+						 float(line_split[3]), float(line_split[4])))
+				elif token == "UV":
+					uvs.extend((float(line_split[2]), float(line_split[3])))
+					corners_read += 1
+					if corners_read == corner_count:
+						break
+
+		self.__set_faces__(face_info, indices, normals, colors, uvs)
+
+		return lines_read
+
+	def __load_vert_section__(self, section, model):
+		'''
+		Load the vertex section (the NUMVERTS line & all of its verts) in
+		 bulk, falling back to __load_verts__ if it can't be
+		'''
+		verts = __parse_vert_section__(section)
+		if verts is None:
+			self.__load_verts__(StringIO(section), model)
+		else:
+			self.__set_verts__(*verts)
+
+	def __load_face_section__(self, section, version):
+		'''
+		Load the face section (the NUMFACES line & all of its faces) in
+		 bulk, falling back to __load_faces__ if it can't be
+		'''
+		faces = __parse_face_section__(section, version)
+		if faces is None:
+			self.__load_faces__(StringIO(section), version)
+		else:
+			self.__set_faces__(*faces)
+
+
+class ModelInfo(object):
+	'''
+	Header level summary of a model, as returned by Model.probe()
+	'''
+	__slots__ = ('version', 'bone_names', 'mesh_names', 'material_names',
+				 'vert_count', 'face_count')
+
+	def __init__(self, model, vert_count, face_count):
+		self.version = model.version
+		self.bone_names = [bone.name for bone in model.bones]
+		self.mesh_names = [mesh.name for mesh in model.meshes]
+		self.material_names = [material.name for material in model.materials]
+		self.vert_count = vert_count
+		self.face_count = face_count
+
+	@property
+	def mesh_count(self):
+		return len(self.mesh_names)
+
 
 class Model(XBinIO, object):
 	__slots__ = ('name', 'bones', 'meshes', 'materials')
@@ -582,39 +1421,170 @@ class Model(XBinIO, object):
 	def __generate_meshes__(self, default_mesh):
 		bone_count = len(self.bones)
 		mtl_count = len(self.materials)
+
+		# The faces are split up by mesh first, so the meshes can be
+		#  generated one at a time
 		for mesh in self.meshes:
-			mesh.bone_groups = [[] for i in range(bone_count)]
-			mesh.material_groups = [[] for i in range(mtl_count)]
+			mesh.faces = []
+		for face in default_mesh.faces:
+			self.meshes[face.mesh_id].faces.append(face)
 
-		# An array of vertex mappings for each mesh
-		# used in the format vertex_map[mesh][original_vertex]
-		# yields either None (unset) or the new vertex id
-		vertex_map = [[None] * len(default_mesh.verts)
-					  for i in range(len(self.meshes))]
+		# A single vertex mapping shared by all of the meshes
+		# used in the format vertex_map[original_vertex]
+		# yields either None (unset) or the new vertex id in the current
+		#  mesh - the entries are cleared again once each mesh is done
+		verts = default_mesh.verts
+		vertex_map = [None] * len(verts)
 
-		for face in default_mesh.faces:
-			mesh_id = face.mesh_id
-			mtl_id = face.material_id
-			mesh = self.meshes[mesh_id]
-			for ind in face.indices:
-				vert_id = vertex_map[mesh_id][ind.vertex]
-				if vert_id is None:
-					vert_id = len(mesh.verts)
-					vertex_map[mesh_id][ind.vertex] = vert_id
-					vert = default_mesh.verts[ind.vertex]
-					mesh.verts.append(vert)
-					for bone_id, weight in vert.weights:
-						mesh.bone_groups[bone_id].append((vert_id, weight))
-				ind.vertex = vert_id
-				mesh.material_groups[mtl_id].append(vert_id)
-			mesh.faces.append(face)
-
-		# Remove duplicates
 		for mesh in self.meshes:
+			mesh.bone_groups = [[] for i in range(bone_count)]
+			# Material groups get an entry for every face corner, so their
+			#  duplicates are removed as they're added
+			material_groups = [set() for i in range(mtl_count)]
+			used_verts = []
+
+			for face in mesh.faces:
+				material_group = material_groups[face.material_id]
+				for ind in face.indices:
+					vert_id = vertex_map[ind.vertex]
+					if vert_id is None:
+						vert_id = len(mesh.verts)
+						vertex_map[ind.vertex] = vert_id
+						used_verts.append(ind.vertex)
+						vert = verts[ind.vertex]
+						mesh.verts.append(vert)
+						for bone_id, weight in vert.weights:
+							mesh.bone_groups[bone_id].append((vert_id, weight))
+					ind.vertex = vert_id
+					material_group.add(vert_id)
+
+			for vert_index in used_verts:
+				vertex_map[vert_index] = None
+
+			# Remove duplicates
 			for group_index, group in enumerate(mesh.bone_groups):
 				mesh.bone_groups[group_index] = list(set(group))
-			for group_index, group in enumerate(mesh.material_groups):
-				mesh.material_groups[group_index] = list(set(group))
+			mesh.material_groups = [list(group) for group in material_groups]
+
+	# Generate actual submesh data from a MeshArrays default mesh
+	def __generate_mesh_arrays__(self, default_mesh):
+		'''
+		Array based counterpart to __generate_meshes__ - self.meshes is
+		 replaced with a MeshArrays for each object
+		Just like __generate_meshes__, the verts of each submesh are ordered
+		 by their first use in that submesh's faces
+		'''
+		mesh_count = len(self.meshes)
+		vert_count = max(default_mesh.vert_count, 1)
+
+		# Fail on out of range ids the way __generate_meshes__ does, rather
+		#  than dropping faces or mixing up the verts of different meshes
+		for name, ids, count in (
+				("mesh", default_mesh.mesh_ids, mesh_count),
+				("vertex", default_mesh.indices, default_mesh.vert_count),
+				("material", default_mesh.material_ids, len(self.materials))):
+			bad = ids[(ids < 0) | (ids >= count)]
+			if bad.size:
+				raise IndexError("Face %s index %d out of range (count %d)"
+								 % (name, bad[0], count))
+
+		# Every face corner gets a unique key for its (mesh, vertex) pair
+		mesh_ids = default_mesh.mesh_ids.astype(np.int64)
+		keys = (mesh_ids[:, None] * vert_count + default_mesh.indices).ravel()
+		keys, first_use, corner_keys = np.unique(
+			keys, return_index=True, return_inverse=True)
+		key_meshes = keys // vert_count
+
+		# Sort the keys by mesh, then by first use within that mesh
+		#  the position in that order gives the new vertex index
+		order = np.lexsort((first_use, key_meshes))
+		mesh_vert_counts = np.bincount(key_meshes, minlength=mesh_count)
+		mesh_vert_offsets = np.zeros(len(mesh_vert_counts) + 1, np.int64)
+		np.cumsum(mesh_vert_counts, out=mesh_vert_offsets[1:])
+
+		new_index = np.empty(len(keys), np.int32)
+		new_index[order] = (np.arange(len(keys))
+							- np.repeat(mesh_vert_offsets[:-1],
+										mesh_vert_counts))
+		indices = new_index[corner_keys].reshape(-1, 3)
+		src_verts = (keys % vert_count)[order]
+
+		# Group the faces by mesh (keeping their original order)
+		face_order = np.argsort(default_mesh.mesh_ids, kind='stable')
+		mesh_face_counts = np.bincount(default_mesh.mesh_ids,
+									   minlength=mesh_count)
+		mesh_face_offsets = np.zeros(len(mesh_face_counts) + 1, np.int64)
+		np.cumsum(mesh_face_counts, out=mesh_face_offsets[1:])
+
+		for mesh_index, mesh in enumerate(self.meshes):
+			arrays = MeshArrays(mesh.name)
+
+			start, end = mesh_vert_offsets[mesh_index:mesh_index + 2]
+			(arrays.positions, arrays.weight_offsets,
+			 arrays.weight_bones, arrays.weight_values) = \
+				default_mesh.take_verts(src_verts[start:end])
+
+			start, end = mesh_face_offsets[mesh_index:mesh_index + 2]
+			faces = face_order[start:end]
+			arrays.indices = indices[faces]
+			arrays.mesh_ids = default_mesh.mesh_ids[faces]
+			arrays.material_ids = default_mesh.material_ids[faces]
+			arrays.normals = default_mesh.normals[faces]
+			arrays.colors = default_mesh.colors[faces]
+			arrays.uvs = default_mesh.uvs[faces]
+
+			self.meshes[mesh_index] = arrays
+
+	def __sort_cosmetic_bones__(self):
+		'''
+		Cosmetic bones MUST be written AFTER the standard bones in the bone
+		 info list - reorder self.bones & remap the bone indices used by the
+		 parents and vertex weights (for both Mesh and MeshArrays)
+		'''
+		# Generate a sorted list of index/bone pairs
+		bone_enum = sorted(enumerate(self.bones),
+						   key=lambda kvp: kvp[1].cosmetic)
+
+		# Allocate space for the bone map before any
+		#  modifications to self.bones
+		bone_map = [None] * len(self.bones)
+
+		# Update the bone list & build old->new index map
+		index_map, self.bones = zip(*bone_enum)
+		for new, old in enumerate(index_map):
+			bone_map[old] = new
+
+		# Rebuild the parent indices for all non-root bones
+		for bone in self.bones:
+			if bone.parent != -1:
+				bone.parent = bone_map[bone.parent]
+
+		# Rebuild the weight tables for all vertices
+		array_map = np.array(bone_map, np.int32)
+		for mesh in self.meshes:
+			if isinstance(mesh, MeshArrays):
+				mesh.weight_bones = array_map[mesh.weight_bones]
+				continue
+			for vert in mesh.verts:
+				vert.weights = [(bone_map[old_index], weight)
+								for old_index, weight in vert.weights]
+
+	def __array_meshes__(self, dtype=np.float32):
+		'''
+		Returns self.meshes with any Mesh objects converted to MeshArrays
+		 (used by the writers)
+		dtype is used for the positions & uvs of the converted meshes
+		'''
+		return [mesh if isinstance(mesh, MeshArrays)
+				else MeshArrays.from_mesh(mesh, dtype) for mesh in self.meshes]
+
+	def __object_meshes__(self):
+		'''
+		Returns self.meshes with any MeshArrays converted to Mesh objects
+		 (used by the writers)
+		'''
+		return [mesh.to_mesh() if isinstance(mesh, MeshArrays) else mesh
+				for mesh in self.meshes]
 
 	def __load_materials__(self, file, version):
 		lines_read = 0
@@ -703,35 +1673,199 @@ class Model(XBinIO, object):
 
 		return lines_read
 
-	def normalize_weights( self ):
+	def normalize_weights( self, norm = 'l1' ):
 		"""
-		Normalize the bone weights for all verts (in all meshes)
+		Normalize the bone weights for all verts (in all meshes) so they
+		 add up to 1 (or have a length of 1 if norm is 'l2')
+		Returns the number of verts that were changed
 		"""
-		for mesh in self.meshes:
-			for vert in mesh.verts:
-				vert.weights = [ v * ( 1.0 / sqrt( sum( v * v for v in vert.weights ) ) ) for v in vert.weights ]
+		return self.process_weights( norm = norm, normalize_all = True )
 
-	def LoadFile_Raw( self, path, split_meshes = True ):
+	def process_weights( self, **kwargs ):
+		"""
+		Run process_weights() over the bone weights of every vert in the
+		 model at once (kwargs are passed through)
+		Returns the number of verts that were changed
+		"""
+		meshes = self.__array_meshes__( np.float64 )
+		if not meshes:
+			return 0
+
+		# Stack the CSR weights of every mesh
+		vert_counts = [ mesh.vert_count for mesh in meshes ]
+		weight_offsets = [ np.zeros( 1, np.int64 ) ]
+		weight_base = 0
+		for mesh in meshes:
+			weight_offsets.append( mesh.weight_offsets[ 1: ] + weight_base )
+			weight_base += int( mesh.weight_offsets[ -1 ] )
+
+		weight_offsets, weight_bones, weight_values, changed = process_weights(
+			np.concatenate( weight_offsets ),
+			np.concatenate( [ mesh.weight_bones for mesh in meshes ] ),
+			np.concatenate( [ mesh.weight_values for mesh in meshes ] ),
+			**kwargs
+		)
+
+		vert_start = 0
+		for mesh_index, mesh in enumerate( meshes ):
+			vert_end = vert_start + vert_counts[ mesh_index ]
+			offsets = weight_offsets[ vert_start:vert_end + 1 ]
+			start, end = offsets[ 0 ], offsets[ -1 ]
+			mesh.weight_offsets = offsets - start
+			mesh.weight_bones = weight_bones[ start:end ].astype( np.int32 )
+			mesh.weight_values = weight_values[ start:end ]
+			vert_start = vert_end
+
+			# Mesh objects get the new weights written back to their verts
+			target = self.meshes[ mesh_index ]
+			if not isinstance( target, MeshArrays ):
+				weights = list( zip( mesh.weight_bones.tolist(),
+									 mesh.weight_values.tolist() ) )
+				offsets = mesh.weight_offsets.tolist()
+				for i, vert in enumerate( target.verts ):
+					vert.weights = weights[ offsets[ i ]:offsets[ i + 1 ] ]
+
+		return changed
+
+	def LoadFile_Raw( self, path, split_meshes = True, use_arrays = False ):
+		'''
+		use_arrays - load the meshes as MeshArrays instead of Mesh objects
+		If the parse cache is enabled (see cache.py) the cached copy of the
+		 file is used instead of parsing it again whenever possible
+		'''
+		entry, default_mesh = self.__load_cached__(
+			path, 'xmodel_export', split_meshes, use_arrays)
+		if default_mesh is None:
+			default_mesh = self.__load_raw__(path, split_meshes, use_arrays)
+			self.__store_cached__(entry, default_mesh, split_meshes)
+
+		self.__split_default_mesh__(default_mesh, split_meshes, use_arrays)
+
+	def __load_raw__( self, path, split_meshes, use_arrays ):
+		'''
+		Parse an xmodel_export file - returns the default mesh
+		'''
 		with open( path ) as file:
 			# file automatically keeps track of what line its on across calls
 			self.__load_header__(file)
 			self.__load_bones__(file)
 
-			# A global mesh containing all of the vertex and face data for the
-			# entire model
+			# Read the rest in one go - the vertex & face sections are
+			#  tokenized in bulk instead of line by line
+			text = file.read()
+
+		vert_section, face_section, text = __split_raw_sections__(text)
+
+		# A global mesh containing all of the vertex and face data for the
+		# entire model
+		if use_arrays:
+			default_mesh = MeshArrays("$default")
+		else:
 			default_mesh = Mesh("$default")
 
-			default_mesh.__load_verts__(file, self)
-			default_mesh.__load_faces__(file, self.version)
+		default_mesh.__load_vert_section__(vert_section, self)
+		del vert_section
+		default_mesh.__load_face_section__(face_section, self.version)
+		del face_section
 
-			if split_meshes:
-				self.__load_meshes__(file)
-			self.__load_materials__(file, self.version)
+		file = StringIO(text)
+		if split_meshes:
+			self.__load_meshes__(file)
+		self.__load_materials__(file, self.version)
 
-			if split_meshes:
-				self.__generate_meshes__(default_mesh)
+		return default_mesh
+
+	def __split_default_mesh__( self, default_mesh, split_meshes, use_arrays ):
+		if split_meshes:
+			if use_arrays:
+				self.__generate_mesh_arrays__(default_mesh)
 			else:
-				self.meshes = [default_mesh]
+				self.__generate_meshes__(default_mesh)
+		else:
+			self.meshes = [default_mesh]
+
+	def __load_cached__( self, path, kind, split_meshes, use_arrays ):
+		'''
+		Load the model from the parse cache
+		Returns (entry, default_mesh) - default_mesh is None if the file has
+		 to be parsed, entry is passed to __store_cached__ afterwards
+		'''
+		parse_cache = cache.get()
+		if parse_cache is None:
+			return None, None
+
+		kind = "%s:%d%d" % (kind, split_meshes, use_arrays)
+		key, header, arrays = parse_cache.load(path, kind)
+		entry = (parse_cache, key)
+		if header is None:
+			return entry, None
+
+		self.version = header['version']
+		self.bones = []
+		for name, parent, cosmetic, offset, matrix, scale in header['bones']:
+			bone = Bone(name, parent, cosmetic)
+			bone.offset = tuple(offset) if offset is not None else None
+			bone.matrix = [tuple(row) if row is not None else None
+						   for row in matrix]
+			bone.scale = tuple(scale)
+			self.bones.append(bone)
+
+		self.materials = []
+		for values in header['materials']:
+			material = Material(values['name'], values['type'],
+								values['images'])
+			for attr, value in values.items():
+				setattr(material, attr,
+						tuple(value) if isinstance(value, list) else value)
+			self.materials.append(material)
+
+		self.meshes = [Mesh(name) for name in header['meshes']]
+
+		default_mesh = MeshArrays("$default")
+		for attr, value in arrays.items():
+			setattr(default_mesh, attr, value)
+
+		if not use_arrays:
+			default_mesh = default_mesh.to_mesh()
+			default_mesh.bone_groups = [[] for i in repeat(None, len(self.bones))]
+			if not header['colors']:
+				for face in default_mesh.faces:
+					for vert in face.indices:
+						vert.color = None
+
+		return entry, default_mesh
+
+	def __store_cached__( self, entry, default_mesh, split_meshes ):
+		'''
+		Store a freshly parsed model (& its default mesh) in the parse cache
+		'''
+		if entry is None:
+			return
+
+		colors = True
+		if isinstance(default_mesh, MeshArrays):
+			arrays = default_mesh
+		else:
+			# The Mesh objects keep their positions & uvs as float64
+			arrays = MeshArrays.from_mesh(default_mesh, np.float64)
+			faces = default_mesh.faces
+			colors = not faces or faces[0].indices[0].color is not None
+
+		header = {
+			'version': self.version,
+			'bones': [(bone.name, bone.parent, bone.cosmetic, bone.offset,
+					   bone.matrix, bone.scale) for bone in self.bones],
+			'materials': [{attr: getattr(material, attr)
+						   for attr in Material.__slots__}
+						  for material in self.materials],
+			'meshes': [mesh.name for mesh in self.meshes] if split_meshes else [],
+			'colors': colors,
+		}
+		parse_cache, key = entry
+		parse_cache.store(key, header, {
+			attr: getattr(arrays, attr)
+			for attr in MeshArrays.__slots__ if attr != 'name'
+		})
 
 	# Write an xmodel_export file, by default it uses the objects self.version
 	def WriteFile_Raw(
@@ -749,13 +1883,10 @@ class Model(XBinIO, object):
 			raise ValueError(
 				"Invalid model version: %d - must be one of %s" % vargs)
 
-		# Used to offset the vertex indices for each mesh
-		vert_offsets = [0]
-		for mesh in self.meshes:
-			prev_index = len(vert_offsets) - 1
-			vert_offsets.append(vert_offsets[prev_index] + len(mesh.verts))
-
-		vert_count = vert_offsets[len(vert_offsets) - 1]
+		# The vertex & face data of all of the meshes is written in bulk
+		#  (the positions & uvs of Mesh objects are kept as float64)
+		meshes = self.__array_meshes__(np.float64)
+		vert_count = sum(mesh.vert_count for mesh in meshes)
 
 		if strict:
 			# TODO: Add cosmetic hierarchy validation
@@ -781,34 +1912,9 @@ class Model(XBinIO, object):
 				cosmetics = len([bone for bone in self.bones if bone.cosmetic])
 				if cosmetics > 0:
 					file.write( f"NUMCOSMETICS {cosmetics}\n" )
-
-					# Cosmetic bones MUST be written AFTER the standard bones in
-					#  the bone info list, so we need to generate a sorted list
-					#  of index/bone pairs
-					bone_enum = sorted(
-						enumerate( self.bones ),
-						key = lambda kvp: kvp[ 1 ].cosmetic
-					)
-
-					# Allocate space for the bone map before any
-					#  modifications to self.bones
-					bone_map = [None] * len(self.bones)
-
-					# Update the bone list & build old->new index map
-					index_map, self.bones = zip(*bone_enum)
-					for new, old in enumerate(index_map):
-						bone_map[old] = new
-
-					# Rebuild the parent indices for all non-root bones
-					for bone in self.bones:
-						if bone.parent != -1:
-							bone.parent = bone_map[bone.parent]
-
-					# Rebuild the weight tables for all vertices
-					for mesh in self.meshes:
-						for vert in mesh.verts:
-							vert.weights = [(bone_map[old_index], weight)
-											for old_index, weight in vert.weights]
+					self.__sort_cosmetic_bones__()
+					# Pick up the remapped weights
+					meshes = self.__array_meshes__(np.float64)
 
 			# Write the actual bone info
 			for bone_index, bone in enumerate(self.bones):
@@ -833,22 +1939,17 @@ class Model(XBinIO, object):
 			vert_tok_suffix = "32" if version == 7 and vert_count > 0xFFFF else ""
 			file.write( f"NUMVERTS{vert_tok_suffix} {vert_count}\n" )
 
-			for mesh_index, mesh in enumerate(self.meshes):
-				vert_offset = vert_offsets[mesh_index]
-				for vert_index, vert in enumerate(mesh.verts):
-					vert.save(file, vert_index + vert_offset, vert_tok_suffix)
+			merged = MeshArrays.concatenate( meshes )
+			merged.save_verts( file, vert_tok_suffix )
 
 			# Faces
-			face_count = sum( len( mesh.faces ) for mesh in self.meshes )
-			file.write( f"NUMFACES {face_count}\n" )
-			for mesh_index, mesh in enumerate(self.meshes):
-				vert_offset = vert_offsets[mesh_index]
-				for face in mesh.faces:
-					face.save( file, version, vert_offset, vert_tok_suffix )
+			file.write( f"NUMFACES {merged.face_count}\n" )
+			merged.save_faces( file, version, vert_tok_suffix )
+			del merged
 
 			# Meshes
-			file.write( f"NUMOBJECTS {len( self.meshes )}\n" )
-			for mesh_index, mesh in enumerate( self.meshes ):
+			file.write( f"NUMOBJECTS {len( meshes )}\n" )
+			for mesh_index, mesh in enumerate( meshes ):
 				file.write( f"OBJECT {mesh_index} \"{mesh.name}\"\n" )
 			file.write( "\n" )
 
@@ -859,28 +1960,71 @@ class Model(XBinIO, object):
 							extended_features=extended_features)
 
 	@staticmethod
-	def FromFile_Raw( filepath, split_meshes = True ):
+	def FromFile_Raw( filepath, split_meshes = True, use_arrays = False ):
 		'''
 		Load from an xmodel_export file and return the resulting Model()
 		'''
 		model = Model()
-		model.LoadFile_Raw(filepath, split_meshes)
+		model.LoadFile_Raw(filepath, split_meshes, use_arrays)
 		return model
 
 	def LoadFile_Bin(
 			self, path, split_meshes = True,
-			is_compressed = True, dump = False
+			is_compressed = True, dump = False,
+			use_arrays = False
 		):
-		with open(path, "rb") as file:
-			if is_compressed:
-				file = XBinIO.__decompress_internal__(file, dump)
+		'''
+		use_arrays - load the meshes as MeshArrays instead of Mesh objects
+		If the parse cache is enabled (see cache.py) the cached copy of the
+		 file is used instead of parsing it again whenever possible
+		'''
+		entry = default_mesh = None
+		if not dump:
+			entry, default_mesh = self.__load_cached__(
+				path, 'xmodel_bin%d' % is_compressed, True, use_arrays)
 
-			default_mesh = self.__xbin_loadfile_internal__(file, 'MODEL')
+		if default_mesh is None:
+			data = XBinIO.__read_buffer__(path, is_compressed, dump)
+			default_mesh = self.__xbin_loadfile_internal__(
+				data, 'MODEL', use_arrays)
+			self.__store_cached__(entry, default_mesh, True)
 
-			if split_meshes:
-				self.__generate_meshes__(default_mesh)
-			else:
-				self.meshes = [default_mesh]
+		self.__split_default_mesh__(default_mesh, split_meshes, use_arrays)
+
+	def __probe_raw__(self, path):
+		with open(path) as file:
+			self.__load_header__(file)
+			self.__load_bones__(file)
+			text = file.read()
+
+		# Only the section headers are read - the vertex & face data is
+		#  skipped entirely
+		vert_section, face_section, text = __split_raw_sections__(text)
+		vert_count = __section_count__(vert_section)
+		face_count = __section_count__(face_section)
+
+		file = StringIO(text)
+		self.__load_meshes__(file)
+		self.__load_materials__(file, self.version)
+
+		return vert_count, face_count
+
+	@staticmethod
+	def probe(path, is_compressed=True):
+		'''
+		Read only the header, bone, object & material info of an
+		 xmodel_bin / xmodel_export file (the format is picked from the
+		 file extension) and return the resulting ModelInfo()
+		The vertex & face data is only counted - never loaded
+		'''
+		model = Model()
+		if os.path.splitext(path)[-1].lower() == '.xmodel_bin':
+			data = XBinIO.__read_buffer__(path, is_compressed)
+			counts = model.__xbin_loadfile_internal__(
+				data, 'MODEL', probe=True)
+		else:
+			counts = model.__probe_raw__(path)
+		return ModelInfo(model, *counts)
 
 	def WriteFile_Bin(
 			self, path,
@@ -897,31 +2041,7 @@ class Model(XBinIO, object):
 			
 			if cosmetics > 0:
 				print( "[ pv_blender_cod ]\tCosmetic bones detected - exporting..." )
-				# Cosmetic bones MUST be written AFTER the standard bones in
-				#  the bone info list, so we need to generate a sorted list
-				#  of index/bone pairs
-				bone_enum = sorted(enumerate(self.bones),
-								   key=lambda kvp: kvp[1].cosmetic)
-
-				# Allocate space for the bone map before any
-				#  modifications to self.bones
-				bone_map = [None] * len(self.bones)
-
-				# Update the bone list & build old->new index map
-				index_map, self.bones = zip(*bone_enum)
-				for new, old in enumerate(index_map):
-					bone_map[old] = new
-
-				# Rebuild the parent indices for all non-root bones
-				for bone in self.bones:
-					if bone.parent != -1:
-						bone.parent = bone_map[bone.parent]
-
-				# Rebuild the weight tables for all vertices
-				for mesh in self.meshes:
-					for vert in mesh.verts:
-						vert.weights = [(bone_map[old_index], weight)
-										for old_index, weight in vert.weights]
+				self.__sort_cosmetic_bones__()
 
 		# print( "FINAL MESH CHECK" )
 		# for _mesh in self.meshes:
@@ -939,10 +2059,11 @@ class Model(XBinIO, object):
 
 	@staticmethod
 	def FromFile_Bin(filepath, split_meshes=True,
-					 is_compressed=True, dump=False):
+					 is_compressed=True, dump=False, use_arrays=False):
 		'''
 		Load from an xmodel_bin file and return the resulting Model()
 		'''
 		model = Model()
-		model.LoadFile_Bin(filepath, split_meshes, is_compressed, dump)
+		model.LoadFile_Bin(filepath, split_meshes, is_compressed, dump,
+						   use_arrays)
 		return model
@@ -17,7 +17,7 @@
 # ##### END GPL LICENSE BLOCK #####
 
 
-import traceback, bpy, os, sys, cProfile, pstats
+import traceback, bpy, os, sys, shutil, tempfile, cProfile, pstats
 
 from bpy.types import Operator, AddonPreferences
 from bpy.props import ( BoolProperty, IntProperty, FloatProperty,
@@ -48,7 +48,7 @@ bl_info = {
 sys.path.insert( 0, os.path.join( os.path.dirname( __file__ ), "PyCoD" ) )
 
 from . import PyCoD, export_xmodel, export_xanim, import_xmodel, import_xanim, shared, updater
-from .PyCoD import sanim, xmodel, xanim, xbin, _lz4, lz4
+from .PyCoD import sanim, xmodel, xanim, xbin, cache, _lz4, lz4
 from .PyCoD.lz4 import block, frame, version
 
 
@@ -81,6 +81,8 @@ def register():
 	# Set the global 'plugin_preferences' variable for each module
 	shared.plugin_preferences = preferences
 
+	update_parse_cache( preferences, bpy.context )
+
 	# Check for update if auto-update is enabled.
 	if preferences.auto_update_enabled:
 		update_result = updater.check_for_update()
@@ -135,6 +137,17 @@ def update_scale_length(self, context):
 		self.scale_length = unit_map[self.unit_enum]
 
 
+def update_parse_cache(self, context):
+	if not self.use_parse_cache:
+		PyCoD.cache.disable()
+		return
+
+	PyCoD.cache.configure(
+		bpy.utils.user_resource( 'DATAFILES', path = "pv_blender_cod_cache" ),
+		self.parse_cache_size << 20
+	)
+
+
 class BlenderCoD_Preferences( AddonPreferences ):
 	bl_idname = __name__
 
@@ -183,12 +196,55 @@ class BlenderCoD_Preferences( AddonPreferences ):
 		default = true
 	) # type: ignore
 
+	use_parse_cache: BoolProperty(
+		name="Cache Imported Files",
+		description="Keep a copy of every parsed xmodel / xanim on disk so "
+					"importing the same file again skips parsing it",
+		default=true,
+		update=update_parse_cache
+	) # type: ignore
+
+	use_image_search_cache: BoolProperty(
+		name="Cache Image Search",
+		description="Remember where the images found by \"Image Search\" "
+					"are, so folders that haven't changed aren't searched "
+					"again on the next import",
+		default=true
+	) # type: ignore
+
+	use_parallel_import: BoolProperty(
+		name="Parse in Parallel",
+		description="When importing multiple xmodels at once, parse them "
+					"in separate processes (using every CPU) before "
+					"adding them to the scene",
+		default=true
+	) # type: ignore
+
+	parse_cache_size: IntProperty(
+		name="Cache Size (MiB)",
+		description="Once the cache grows past this size, the least "
+					"recently imported files are removed from it",
+		min=16,
+		default=512,
+		update=update_parse_cache
+	) # type: ignore
+
 	def draw(self, context):
 		layout = self.layout
 
 		row = layout.row()
 		row.prop(self, "use_submenu")
 
+		cache_row = layout.row( align = true )
+		cache_row.prop( self, "use_parse_cache" )
+		sub = cache_row.row( align = true )
+		sub.enabled = self.use_parse_cache
+		sub.prop( self, "parse_cache_size" )
+
+		row = layout.row()
+		row.prop( self, "use_parallel_import" )
+		row.prop( self, "use_image_search_cache" )
+
 		col1 = layout.row( align = true )
 		# Auto-update toggle
 		col1.prop( self, "auto_update_enabled" )
@@ -230,6 +286,7 @@ if "bpy" in locals():
 		"xanim": xanim,
 		"xmodel": xmodel,
 		"xbin": xbin,
+		"cache": cache,
 		"_lz4": _lz4,
 		# LZ4
 		"lz4": lz4,
@@ -252,7 +309,7 @@ else:
 	from . import import_xmodel, export_xmodel, import_xanim, export_xanim
 	from . import shared
 	from . import PyCoD
-	from .PyCoD import sanim, xanim, xbin, xmodel, _lz4, lz4
+	from .PyCoD import sanim, xanim, xbin, xmodel, cache, _lz4, lz4
 	from .PyCoD.lz4 import block, frame, version
 	from . import pv_py_utils
 	from .pv_py_utils import console, log, pathlib, stdlib, sysframe
@@ -369,16 +426,66 @@ class COD_MT_import_xmodel( bpy.types.Operator, ImportHelper ): # type: ignore
 			)
 		) # type: ignore
 
-		errors = []
-		for file in self.files:
-			_result = import_xmodel.load(
-				self, context,
-				filepath = os.path.join( os.path.dirname( self.filepath ), file.name ),
-				**keywords
+		# One image index for the whole batch, so each folder is only
+		#  searched once no matter how many models use it
+		image_index_path = None
+		if shared.plugin_preferences.use_image_search_cache:
+			image_index_path = os.path.join(
+				bpy.utils.user_resource( 'DATAFILES', path = "pv_blender_cod_cache" ),
+				"image_index.json"
 			)
+		image_index = import_xmodel.ImageSearchIndex( image_index_path )
+
+		filepaths = [
+			os.path.join( os.path.dirname( self.filepath ), file.name )
+			for file in self.files
+		]
+
+		# Parse every file up front in a process pool - the parsed arrays
+		#  come back through the parse cache (a temporary one if it's off).
+		#  Nothing parsed for this batch may be evicted before it's loaded,
+		#  so the temporary cache has no size limit & the persistent one
+		#  keeps this batch's entries until it's done
+		parse_cache = None
+		temp_cache_dir = None
+		if filepaths.__len__() > 1 and shared.plugin_preferences.use_parallel_import:
+			parse_cache = PyCoD.cache.get()
+			if parse_cache is None:
+				temp_cache_dir = tempfile.mkdtemp( prefix = "pv_blender_cod_" )
+				parse_cache = PyCoD.cache.configure( temp_cache_dir, None )
+			else:
+				parse_cache.begin_batch()
+
+			if not import_xmodel.parse_in_parallel( filepaths, not self.use_single_mesh, parse_cache ):
+				print( "[ pv_blender_cod ]\tParallel parsing failed, the files will be parsed one by one" )
+
+		errors = []
+		try:
+			for filepath in filepaths:
+				misses = parse_cache.misses if parse_cache else 0
+
+				_result = import_xmodel.load(
+					self, context,
+					filepath = filepath,
+					image_index = image_index,
+					**keywords
+				)
+
+				if parse_cache and parse_cache.misses != misses:
+					print( f"[ pv_blender_cod ]\t'{filepath}' wasn't in the parse cache, it was parsed again on the main thread" )
+
+				if _result:
+					errors.append( _result )
+		finally:
+			if temp_cache_dir is not None:
+				PyCoD.cache.disable()
+				shutil.rmtree( temp_cache_dir, ignore_errors = True )
+			elif parse_cache is not None:
+				parse_cache.end_batch()
 
-			if _result:
-				errors.append( _result )
+		if self.use_image_search:
+			image_index.save()
+			image_index.report()
 
 
 		if not errors.__len__():
@@ -517,6 +624,25 @@ class COD_MT_import_xanim( bpy.types.Operator, ImportHelper ):
 		default=1.0,
 	)
 
+	use_keyframe_thinning: BoolProperty(
+		name="Thin Keyframes",
+		description=("Leave out the keyframes that can be linearly "
+					 "interpolated from the others (e.g. bones that don't "
+					 "move) - the remaining keys use linear interpolation"),
+		default=false
+	)
+
+	keyframe_thinning_tolerance: FloatProperty(
+		name="Tolerance",
+		description=("How far a left out keyframe's value may be from the "
+					 "interpolated curve"),
+		default=1e-5,
+		min=0.0,
+		max=0.1,
+		precision=6,
+		step=0.001
+	)
+
 	def execute(self, context):
 		self.report( { 'INFO' }, "Importing XAnim..." )
 
@@ -574,6 +700,11 @@ class COD_MT_import_xanim( bpy.types.Operator, ImportHelper ):
 			sub.prop(self, 'fps_scale_target_fps')
 		layout.prop(self, 'anim_offset')
 
+		layout.prop(self, 'use_keyframe_thinning')
+		sub = layout.split()
+		sub.enabled = self.use_keyframe_thinning
+		sub.prop(self, 'keyframe_thinning_tolerance')
+
 
 class COD_MT_export_xmodel( bpy.types.Operator, ExportHelper ):
 	bl_idname = "export_scene.xmodel"
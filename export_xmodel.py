@@ -21,8 +21,8 @@
 import bpy
 import bmesh # type: ignore
 import os
-from itertools import repeat
-from mathutils import Vector
+from itertools import chain
+import numpy as np
 
 from .pv_py_utils import console
 
@@ -221,13 +221,19 @@ class ExportMesh(object):
 	Internal class used for handling the conversion of mesh data into
 	a PyCoD compatible format
 	'''
-	__slots__ = ( 'mesh', 'object', 'matrix', 'weights', 'materials' )
+	__slots__ = ( 'mesh', 'object', 'matrix', 'materials',
+				  'weight_offsets', 'weight_bones', 'weight_values' )
 
 	def __init__( self, obj, mesh, global_materials ):
 		self.mesh = mesh
 		self.object = obj
 		self.matrix = obj.matrix_world
-		self.weights = [ [] for _ in repeat( None, len( mesh.vertices ) ) ]
+
+		# The weights of each vert, laid out the same way as they are in
+		# XModel.MeshArrays (see add_weights())
+		self.weight_offsets = np.zeros( len( mesh.vertices ) + 1, np.int32 )
+		self.weight_bones = np.zeros( 0, np.int32 )
+		self.weight_values = np.zeros( 0, np.float64 )
 
 		self.materials = []
 
@@ -242,63 +248,80 @@ class ExportMesh(object):
 
 
 	def fix_too_many_weights( self ):
-		"""Find places where we have too many weights and remove the lowest weights, then renormalize the total"""
-
-		b_any_bad = false
-
-		for v in range( 0, len( self.weights ) ):
-
-			if len( self.weights[v] ) <= 15: # Even though ape says we can have 16, we cant. we can only have 15.
-				continue
+		"""Find places where we have too many weights and remove the lowest weights, then renormalize the total
+		Returns the number of verts that had too many weights"""
 
-			b_any_bad = true
+		# Even though ape says we can have 16, we cant. we can only have 15.
+		max_influences = 15
 
-			self.weights[v].sort( key= lambda x: x[1], reverse=true ) # sort by the weight amount, descending order
-			while len(self.weights[v]) > 15:
-				self.weights[v].pop() # get rid of lowest
+		if not ( np.diff( self.weight_offsets ) > max_influences ).any():
+			return 0
 
-			length = sum( [ x[ 1 ] ** 2 for x in self.weights[ v ] ] ) ** 0.5 # calc the vector length
-			self.weights[ v ] = [ ( x[ 0 ], x[ 1 ] / length ) for x in self.weights[ v ] ] # divide the entire array by the length (normalize it)
+		# All of the weights are limited in one go
+		self.weight_offsets, self.weight_bones, self.weight_values, changed = XModel.process_weights(
+			self.weight_offsets, self.weight_bones, self.weight_values,
+			max_influences = max_influences, norm = 'l2'
+		)
 
-		return b_any_bad
+		return changed
 
 
 	def add_weights( self, bone_table, weight_min_threshold = 0.0 ):
 		ob = self.object
+		num_verts = len( self.mesh.vertices )
+
 		if ob.vertex_groups is None:
-			for i in range( len( self.weights ) ):
-				self.weights[i] = [ ( 0, 1.0 ) ]
+			verts = np.zeros( 0, np.int32 )
+			bones = np.zeros( 0, np.int32 )
+			values = np.zeros( 0, np.float64 )
 		else:
-			# group_map[group_index] yields bone index or None
-			group_map = [ None ] * len( ob.vertex_groups )
-			for group_index, group in enumerate( ob.vertex_groups ):
-				if group.name in bone_table:
-					group_map[group_index] = bone_table.index( group.name )
+			# group_map[group_index] yields bone index or -1
+			bone_indices = {}
+			for bone_index, bone_name in enumerate( bone_table ):
+				bone_indices.setdefault( bone_name, bone_index )
+
+			group_map = np.fromiter(
+				( bone_indices.get( group.name, -1 ) for group in ob.vertex_groups ),
+				np.int32, len( ob.vertex_groups )
+			)
 
 			# For debugging blender's cleanup thing deleting the mesh b4 we're done w/ it
 			# print( self.mesh.name, 'in bpy.data.meshes?', self.mesh.name in bpy.data.meshes )
 
-			for vert_index, vert in enumerate( self.mesh.vertices ):
-				for group in vert.groups:
-					bone_index = group_map[ group.group ]
-					if bone_index is not None:
-						if group.weight < weight_min_threshold:
-							continue  # Skip weights below the weight threshold
-
-						self.weights[vert_index].append(
-							( bone_index, group.weight )
-						)
-
-			# Any verts without weights will get a 1.0 weight to the root bone
-			for weights in self.weights:
-				if len(weights) == 0:
-					weights.append( ( 0, 1.0 ) )
-			
-			b_any_bad = self.fix_too_many_weights()
-			
-			if b_any_bad:
-				print("WARNING: Model had some verticies with too many weights."
-				"Removed the lowest until restrictions of 16 weights or less were met")
+			# Vertex group memberships can't be read with foreach_get, so
+			# they're gathered into flat arrays in a single pass instead
+			vertices = self.mesh.vertices
+			counts = np.fromiter( ( len( vert.groups ) for vert in vertices ), np.int32, num_verts )
+			elements = list( chain.from_iterable( vert.groups for vert in vertices ) )
+
+			groups = np.fromiter( ( elem.group for elem in elements ), np.int32, len( elements ) )
+			values = np.fromiter( ( elem.weight for elem in elements ), np.float64, len( elements ) )
+			verts = np.repeat( np.arange( num_verts, dtype = np.int32 ), counts )
+			bones = group_map[ groups ]
+
+			# Drop groups that aren't bones & weights below the weight threshold
+			keep = ( bones != -1 ) & ( values >= weight_min_threshold )
+			verts, bones, values = verts[ keep ], bones[ keep ], values[ keep ]
+
+		# Any verts without weights will get a 1.0 weight to the root bone
+		counts = np.bincount( verts, minlength = num_verts )
+		unweighted = np.flatnonzero( counts == 0 ).astype( np.int32 )
+		if len( unweighted ):
+			order = np.argsort( np.concatenate( ( verts, unweighted ) ), kind = 'stable' )
+			bones = np.concatenate( ( bones, np.zeros( len( unweighted ), np.int32 ) ) )[ order ]
+			values = np.concatenate( ( values, np.ones( len( unweighted ) ) ) )[ order ]
+			counts[ unweighted ] = 1
+
+		self.weight_offsets = np.zeros( num_verts + 1, np.int32 )
+		np.cumsum( counts, out = self.weight_offsets[ 1: ] )
+		self.weight_bones = bones.astype( np.int32 )
+		self.weight_values = values
+
+		num_bad = self.fix_too_many_weights()
+
+		if num_bad:
+			print(f"WARNING: Model had {num_bad} verticies with too many weights. "
+			"Removed the lowest until restrictions of 16 weights or less were met")
 
 
 	def recalc_mtl_indices( self ):		
@@ -374,7 +397,7 @@ class ExportMesh(object):
 			global_scale = 1.0
 		):
 
-		mesh = XModel.Mesh( self.mesh.name )
+		mesh = XModel.MeshArrays( self.mesh.name )
 
 		# calc_normals functions do not exist in blender 4.0/4.1+
 		# because they re-calculate it when needed automatically.
@@ -402,90 +425,70 @@ class ExportMesh(object):
 						break # Only need the first one we find
 
 
+		# Everything is converted as whole arrays, straight into a MeshArrays
+		# (positions, uvs, normals & colors are kept as float64, just like the
+		# writers do for Mesh objects)
+		matrix = np.array( self.matrix, np.float64 )
+
 		# Apply transformation matrix to vertices
 		num_verts = self.mesh.vertices.__len__()
-		vert_coords = [ .0 ] * ( num_verts * 3 )
+		vert_coords = np.empty( num_verts * 3, np.float32 )
 		self.mesh.vertices.foreach_get( "co", vert_coords )
 
-		mesh.verts = [ None ] * num_verts
-		vec = Vector()
+		positions = vert_coords.reshape( -1, 3 ) @ matrix[ :3, :3 ].T
+		positions += matrix[ :3, 3 ]
+		positions *= global_scale
+		mesh.positions = positions
+
+		mesh.weight_offsets = self.weight_offsets
+		mesh.weight_bones = self.weight_bones
+		mesh.weight_values = self.weight_values
 
-		for vert_idx in range( num_verts ):
-			mesh_vert = XModel.Vertex()
 
-			coord_idx = vert_idx * 3
-			vec.x, vec.y, vec.z = vert_coords[ coord_idx ], vert_coords[ coord_idx + 1 ], vert_coords[ coord_idx + 2 ]
-			transformed_pos = self.matrix @ vec # Apply matrix transform
-			mesh_vert.offset = tuple( transformed_pos * global_scale )
-			mesh_vert.weights = self.weights[ vert_idx ]
-			mesh.verts[ vert_idx ] = mesh_vert
+		# Polys with an invalid material index are skipped
+		num_polys = self.mesh.polygons.__len__()
+		poly_materials = np.empty( num_polys, np.int32 )
+		self.mesh.polygons.foreach_get( "material_index", poly_materials )
+		loop_starts = np.empty( num_polys, np.int32 )
+		self.mesh.polygons.foreach_get( "loop_start", loop_starts )
 
+		material_map = np.array( self.materials, np.int32 )
+		valid = poly_materials < material_map.__len__()
+		invalid_mtl_idxs_encountered = not valid.all()
+
+		# The loop of each face corner - the winding order is fixed by
+		# swapping the 2nd & 3rd corners of every (triangulated) poly
+		corners = loop_starts[ valid ][ :, None ] + np.array( [ 0, 2, 1 ], np.int32 )
+		num_faces = corners.__len__()
 
-		# Extract 3x3 rotation matrix from transformation matrix (ignoring translation)
-		num_materials = self.materials.__len__()
 		num_loops = self.mesh.loops.__len__()
-		loop_vert_indices = [ 0 ] * num_loops
+		loop_vert_indices = np.empty( num_loops, np.int32 )
 		self.mesh.loops.foreach_get( "vertex_index", loop_vert_indices )
 
-		loop_normals = [ .0 ] * ( num_loops * 3 )
+		mesh.indices = loop_vert_indices[ corners ]
+		mesh.mesh_ids = np.zeros( num_faces, np.int32 )
+		mesh.material_ids = material_map[ poly_materials[ valid ] ]
+
+		# Apply the object's rotation & scale to the normals
+		# (ignoring translation) & make sure they stay unit-length
+		loop_normals = np.empty( num_loops * 3, np.float32 )
 		self.mesh.loops.foreach_get( "normal", loop_normals )
+		normals = loop_normals.reshape( -1, 3 )[ corners ] @ matrix[ :3, :3 ].T
+		lengths = np.linalg.norm( normals, axis = -1, keepdims = True )
+		np.divide( normals, lengths, out = normals, where = lengths != 0.0 )
+		mesh.normals = normals
 
-		uvs = [ .0 ] * ( num_loops * 2 )
+		uvs = np.zeros( num_loops * 2, np.float32 )
 		if uv_layer: uv_layer.data.foreach_get( "uv", uvs )
+		uvs = uvs.reshape( -1, 2 )[ corners ].astype( np.float64 )
+		uvs[ ..., 1 ] = 1.0 - uvs[ ..., 1 ]
+		mesh.uvs = uvs
 
-		color_data = [ 1.0 ] * ( num_loops * 4 )
+		color_data = np.ones( num_loops * 4, np.float32 )
 		# Only populate if we have a valid vertex colour layer - pv
 		if vca_layer: vca_layer.data.foreach_get( "color", color_data )
 		elif vc_layer: vc_layer.data.foreach_get( "color", color_data )
-
-
-		normal_transform = self.matrix.to_3x3()
-		invalid_mtl_idxs_encountered = false
-
-		for polygon in self.mesh.polygons:
-			if polygon.material_index >= num_materials:
-				invalid_mtl_idxs_encountered = true
-				"""
-				shared.raise_error(
-					f"Material index for a polygon of '{ self.mesh.name }' is "
-					"greater than the total count of all materials being exported.\n"
-					f"( { polygon.material_index  } >= { self.materials.__len__() } )\n"
-					f"Please fix/redo your materials!"
-				)
-				"""
-				continue
-
-			face = XModel.Face( 0, 0 )
-
-			face.material_id = self.materials[ polygon.material_index ]
-
-			for i, loop_idx in enumerate( polygon.loop_indices ):
-				# Get vertex colours from pre-filled color_data list
-				col_idx = loop_idx * 4
-				rgba = tuple( color_data[ col_idx : col_idx + 4 ] )
-
-				# Apply transformation to normal
-				norm_idx = loop_idx * 3
-				vec.x, vec.y, vec.z = loop_normals[ norm_idx ], loop_normals[ norm_idx + 1 ], loop_normals[ norm_idx + 2 ], 
-				transformed_normal = normal_transform @ vec
-				transformed_normal.normalize() # Ensure normal stays unit-length
-
-				# Get UV coordinates
-				uv_idx = loop_idx * 2
-
-				vert = XModel.FaceVertex(
-					loop_vert_indices[ loop_idx ],
-					transformed_normal, # Use transformed normal
-					rgba,
-					( uvs[ uv_idx ], 1.0 - uvs[ uv_idx + 1 ] )
-				)
-
-				face.indices[ i ] = vert
-
-			# Fix winding order
-			face.indices[ 1 ], face.indices[ 2 ] = face.indices[ 2 ], face.indices[ 1 ]
-
-			mesh.faces.append( face )
+		mesh.colors = color_data.reshape( -1, 4 )[ corners ].astype( np.float64 )
 
 
 		if invalid_mtl_idxs_encountered:
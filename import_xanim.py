@@ -20,11 +20,19 @@
 
 import os
 import bpy
+import numpy as np
 from mathutils import *
 
 from . import shared as shared
 from .PyCoD import xanim as XAnim
 
+# Value of Keyframe.interpolation's 'LINEAR' item (for foreach_set)
+INTERPOLATION_LINEAR = 1
+
+# Keys closer together than this are on the same frame (Blender's
+#  BEZT_BINARYSEARCH_THRESH, used by keyframe_insert())
+KEYFRAME_THRESHOLD = 0.01
+
 
 def get_mat_offs(bone):
 	# Based on the following: http://blender.stackexchange.com/a/44980
@@ -94,6 +102,349 @@ def calc_basis(pose_bone, matrix, parent_mtx, parent_mtx_local):
 	return basis
 
 
+class PoseRest(object):
+	'''
+	The rest pose data calc_bases() needs for each bone in a bone map
+	 (as NumPy arrays, in bone map order):
+		parents			- (bones,) index of each bone's mapped parent,
+						  -1 if it doesn't have one
+		offsets			- (bones, 4, 4) get_mat_offs() of each bone
+		parent_locals	- (bones, 4, 4) matrix_local of the mapped parent
+		matrix_locals	- (bones, 4, 4) matrix_local of each bone
+		has_parent, inherit_rotation, inherit_scale, local_location
+						- (bones,) the bone's flags (has_parent is whether
+						  the bone itself has a parent in the armature)
+	'''
+	__slots__ = ('parents', 'offsets', 'parent_locals', 'matrix_locals',
+				 'has_parent', 'inherit_rotation', 'inherit_scale',
+				 'local_location')
+
+	def __init__(self, bone_map):
+		bone_count = len(bone_map)
+		indices = {mapped_bone: i for i, mapped_bone in enumerate(bone_map)}
+
+		self.parents = np.full(bone_count, -1, dtype=np.intp)
+		self.offsets = np.empty((bone_count, 4, 4))
+		self.offsets[:] = np.identity(4)
+		self.parent_locals = self.offsets.copy()
+		self.matrix_locals = np.empty((bone_count, 4, 4))
+
+		bones = [mapped_bone.bone.bone for mapped_bone in bone_map]
+		for i, (mapped_bone, bone) in enumerate(zip(bone_map, bones)):
+			if mapped_bone.parent is not None:
+				self.parents[i] = indices[mapped_bone.parent]
+				self.parent_locals[i] = mapped_bone.parent.matrix_local
+			if bone.parent is not None:
+				self.offsets[i] = get_mat_offs(bone)
+			self.matrix_locals[i] = mapped_bone.matrix_local
+
+		def flags(attr):
+			return np.array([bool(getattr(bone, attr)) for bone in bones],
+							dtype=bool)
+
+		self.has_parent = np.array([bone.parent is not None
+									for bone in bones], dtype=bool)
+		self.inherit_rotation = flags('use_inherit_rotation')
+		self.inherit_scale = flags('use_inherit_scale')
+		self.local_location = flags('use_local_location')
+
+
+def matrix_to_quaternion(matrices):
+	'''
+	Convert (..., 3, 3) rotation matrices to (..., 4) WXYZ quaternions
+	Picks the same branches as mathutils' Matrix.to_quaternion(), so the
+	 results match it (normalized, with W >= 0) even for matrices that
+	 aren't quite orthogonal
+	'''
+	m = matrices
+	m00, m11, m22 = m[..., 0, 0], m[..., 1, 1], m[..., 2, 2]
+
+	# (W, X, Y, Z) numerators for each of the 4 branches - the component
+	#  the branch is named after is 0.25 * s, the others are divided by s
+	diff_x = m[..., 2, 1] - m[..., 1, 2]
+	diff_y = m[..., 0, 2] - m[..., 2, 0]
+	diff_z = m[..., 1, 0] - m[..., 0, 1]
+	sum_xy = m[..., 1, 0] + m[..., 0, 1]
+	sum_xz = m[..., 0, 2] + m[..., 2, 0]
+	sum_yz = m[..., 2, 1] + m[..., 1, 2]
+	branches = (
+		(0, 1.0 + m00 + m11 + m22, (diff_x, diff_y, diff_z)),
+		(1, 1.0 + m00 - m11 - m22, (diff_x, sum_xy, sum_xz)),
+		(2, 1.0 - m00 + m11 - m22, (diff_y, sum_xy, sum_yz)),
+		(3, 1.0 - m00 - m11 + m22, (diff_z, sum_xz, sum_yz)),
+	)
+
+	# W is used when the trace is positive, otherwise the axis with the
+	#  largest diagonal
+	choice = np.where(m00 > m11, np.where(m00 > m22, 1, 3),
+					  np.where(m11 > m22, 2, 3))
+	choice[m00 + m11 + m22 > 0.0] = 0
+
+	quats = np.empty(m.shape[:-2] + (4,))
+	for index, trace, numerators in branches:
+		select = choice == index
+		s = 2.0 * np.sqrt(np.maximum(trace[select], 0.0))
+
+		others = [i for i in range(4) if i != index]
+		quats[select, index] = 0.25 * s
+		for i, numerator in zip(others, numerators):
+			quats[select, i] = numerator[select] / s
+
+	quats /= np.linalg.norm(quats, axis=-1, keepdims=True)
+	quats[quats[..., 0] < 0.0] *= -1.0
+	return quats
+
+
+def calc_bases(matrices, rest):
+	'''
+	Batched version of calc_basis() - the basis of every bone in every
+	 frame at once
+	matrices is the (frames, bones, 4, 4) armature space matrix of each
+	 bone (in bone map order), rest is the PoseRest for the bone map
+	Returns the (frames, bones, 3) locations & (frames, bones, 4) rotation
+	 quaternions of the bases (matrix_basis.decompose())
+	'''
+	frame_count, bone_count = matrices.shape[:2]
+
+	# A bone's parent always comes before it in the bone map - bones
+	#  without a mapped parent use the identity as their parent's matrix
+	identity = np.broadcast_to(np.identity(4), (frame_count, 1, 4, 4))
+	parent_matrices = np.concatenate((matrices, identity), axis=1)
+	parent_matrices = parent_matrices[:, rest.parents]
+
+	# get_mat_rest() - most bones inherit everything, in which case both
+	#  matrices are just the parent's matrix @ the bone's offset
+	offsets = rest.offsets
+	mat_rotscale = parent_matrices @ offsets
+	mat_loc = mat_rotscale.copy()
+
+	has_parent = rest.has_parent
+	inherit_rotation = rest.inherit_rotation
+	inherit_scale = rest.inherit_scale
+
+	select = has_parent & ~inherit_rotation & ~inherit_scale
+	if select.any():
+		mat_rotscale[:, select] = rest.parent_locals[select] @ offsets[select]
+
+	select = has_parent & ~inherit_rotation & inherit_scale
+	if select.any():
+		# The scale of the parent's matrix @ the parent's rest matrix
+		sizes = np.ones((frame_count, select.sum(), 4))
+		sizes[..., :3] = np.linalg.norm(
+			parent_matrices[:, select, :3, :3], axis=-2)
+		local = rest.parent_locals[select] @ offsets[select]
+		mat_rotscale[:, select] = sizes[..., :, None] * local
+
+	select = has_parent & inherit_rotation & ~inherit_scale
+	if select.any():
+		normalized = parent_matrices[:, select].copy()
+		normalized[..., :3, :3] /= np.linalg.norm(
+			normalized[..., :3, :3], axis=-2)[..., None, :]
+		mat_rotscale[:, select] = normalized @ offsets[select]
+
+	select = has_parent & ~rest.local_location
+	if select.any():
+		# The parent's rotation & scale, at the bone's offset
+		mat_loc[:, select, :3, :3] = parent_matrices[:, select, :3, :3]
+
+	select = ~has_parent
+	if select.any():
+		mat_rotscale[:, select] = rest.matrix_locals[select]
+		mat_loc[:, select] = rest.matrix_locals[select]
+
+		select &= ~rest.local_location
+		mat_loc[:, select, :3, :3] = np.identity(3)
+
+	# calc_basis()
+	basis = np.linalg.solve(matrices[..., :3, :3], mat_rotscale[..., :3, :3])
+	basis = basis.swapaxes(-1, -2)
+
+	points = matrices[..., :, 3:]
+	locations = np.linalg.solve(mat_loc, points)[..., :3, 0]
+
+	# Remove the scale of each basis before converting it to a quaternion
+	basis = basis / np.linalg.norm(basis, axis=-2)[..., None, :]
+	basis[np.linalg.det(basis) < 0.0] *= -1.0
+
+	return locations, matrix_to_quaternion(basis)
+
+
+def thin_keyframes(frames, values, tolerance):
+	'''
+	Returns the indices of the keys that have to be kept so that linearly
+	 interpolating between them gives every one of values (to within
+	 tolerance) - constant & linear runs are reduced to their end points
+	 & a channel that never changes is reduced to a single key
+	'''
+	count = len(values)
+	if count and np.all(np.abs(values - values[0]) <= tolerance):
+		return np.zeros(1, dtype=np.intp)
+	if count <= 2:
+		return np.arange(count)
+
+	def deviation(start, end, inner):
+		t = (frames[inner] - frames[start]) / (frames[end] - frames[start])
+		line = values[start] + (values[end] - values[start]) * t
+		return np.abs(values[inner] - line)
+
+	# Keys that don't lie on the line between their neighbours are needed
+	keep = np.ones(count, dtype=bool)
+	inner = np.arange(1, count - 1)
+	keep[inner] = deviation(inner - 1, inner + 1, inner) > tolerance
+
+	# Every other key only lies on a line locally, so check that each run
+	#  between the kept keys really is linear (as the error can add up
+	#  along the run) & split the runs that aren't where they deviate most
+	kept = np.flatnonzero(keep)
+	runs = [(start, end) for start, end in zip(kept[:-1], kept[1:])
+			if end - start > 1]
+	while runs:
+		start, end = runs.pop()
+		error = deviation(start, end, np.arange(start + 1, end))
+		split = int(np.argmax(error))
+		if error[split] > tolerance:
+			split += start + 1
+			keep[split] = True
+			if split - start > 1:
+				runs.append((start, split))
+			if end - split > 1:
+				runs.append((split, end))
+
+	return np.flatnonzero(keep)
+
+
+def add_keyframes(action, data_path, index, group, frames, values,
+				  tolerance=None):
+	'''
+	Add a keyframe for each (frame, value) pair to the FCurve for
+	 data_path[index] in one go (the FCurve is created if needed) - keys
+	 already on one of those frames are replaced
+	If tolerance is given, the keys that can be linearly interpolated from
+	 the others are left out (see thin_keyframes()) - the keys that are
+	 added then use linear interpolation so the curve still evaluates to
+	 the same values
+	'''
+	fcurve = action.fcurves.find(data_path, index=index)
+	if fcurve is None:
+		fcurve = action.fcurves.new(data_path, index=index,
+									action_group=group)
+
+	if tolerance is not None:
+		keys = thin_keyframes(frames, values, tolerance)
+		frames = frames[keys]
+		values = values[keys]
+
+	keyframe_points = fcurve.keyframe_points
+	count = len(keyframe_points)
+
+	# New keys replace any existing key on the same frame, the way
+	#  keyframe_insert() does (within the same threshold)
+	if count and len(frames):
+		existing = np.empty(count * 2, dtype=np.float32)
+		keyframe_points.foreach_get("co", existing)
+		existing = existing[0::2]
+
+		new_frames = np.sort(frames)
+		nearest = np.searchsorted(new_frames, existing)
+		below = new_frames[np.maximum(nearest - 1, 0)]
+		above = new_frames[np.minimum(nearest, len(new_frames) - 1)]
+		replaced = np.minimum(np.abs(existing - below),
+							  np.abs(existing - above)) < KEYFRAME_THRESHOLD
+
+		for i in reversed(np.flatnonzero(replaced).tolist()):
+			keyframe_points.remove(keyframe_points[i], fast=True)
+		count = len(keyframe_points)
+
+	co = np.empty((count + len(frames), 2), dtype=np.float32)
+	if count:
+		keyframe_points.foreach_get("co", co[:count].ravel())
+	co[count:, 0] = frames
+	co[count:, 1] = values
+
+	keyframe_points.add(len(frames))
+	keyframe_points.foreach_set("co", co.ravel())
+
+	if tolerance is not None:
+		interpolation = np.empty(count + len(frames), dtype=np.int32)
+		if count:
+			keyframe_points.foreach_get("interpolation", interpolation[:count])
+		interpolation[count:] = INTERPOLATION_LINEAR
+		keyframe_points.foreach_set("interpolation", interpolation)
+
+	# Sorts the keys (if there were any already) & calculates the handles
+	fcurve.update()
+
+
+class MappedBone(object):
+	'''
+	Used to store bone metadata & matrix info for each animated bone
+	'''
+	__slots__ = ('bone', 'part_index', 'matrix_local', 'parent')
+
+	def __init__(self, pose_bone, part_index):
+		self.bone = pose_bone
+		self.part_index = part_index
+		self.matrix_local = pose_bone.bone.matrix_local.copy()
+		self.parent = None
+
+
+class BoneMapCache(object):
+	'''
+	The bone maps of an armature - one per distinct list of anim parts
+	Shared by every anim in an import batch, so importing lots of anims
+	 onto the same rig only maps its bones once
+	'''
+	__slots__ = ('armature', 'pose_bones', 'bone_maps')
+
+	def __init__(self, armature):
+		self.armature = armature
+		self.pose_bones = list(armature.pose.bones)
+		self.bone_maps = {}
+
+	def get(self, part_names):
+		'''
+		Returns (bone_map, rest) - the MappedBones for the pose bones that
+		 have a matching part in part_names & their PoseRest
+		The order of MappedBones matches ob.pose.bones - which stores them
+		 in hierarchical order, meaning a bone's parent will always be
+		 *earlier* in the list than the child
+		'''
+		key = tuple(part_names)
+		cached = self.bone_maps.get(key)
+		if cached is not None:
+			return cached
+
+		# The first part with a given name is used
+		part_indices = {}
+		for part_index, name in enumerate(part_names):
+			part_indices.setdefault(name, part_index)
+
+		bone_map = []
+		mapped_bones = {}
+		for bone in self.pose_bones:
+			# Don't add bones that don't have a matching part in the anim
+			part_index = part_indices.get(bone.name)
+			if part_index is None:
+				continue
+
+			mapped_bone = MappedBone(bone, part_index)
+
+			# The parent is the closest ancestor that's in the anim
+			#  (or None if there isn't one)
+			parent = bone.parent
+			while parent is not None and parent.name not in mapped_bones:
+				parent = parent.parent
+			if parent is not None:
+				mapped_bone.parent = mapped_bones[parent.name]
+
+			mapped_bones[bone.name] = mapped_bone
+			bone_map.append(mapped_bone)
+
+		cached = (bone_map, PoseRest(bone_map))
+		self.bone_maps[key] = cached
+		return cached
+
+
 def find_active_armature(context):
 	ob = bpy.context.active_object
 	if ob is None:
@@ -127,9 +478,12 @@ def load( self, context, **keywords ):
 	if armature.animation_data is None:
 		armature.animation_data_create()
 
+	# The bones only need to be mapped once for the whole batch
+	bone_maps = BoneMapCache( armature )
+
 	for i, f in enumerate(self.files):
 		keywords['filepath'] = os.path.join( path, f.name )
-		anim = load_anim( self, context, armature, **keywords )
+		anim = load_anim( self, context, armature, bone_maps=bone_maps, **keywords )
 
 		if type(anim) is XAnim.Anim:
 			# All animations after the first one will have their framerate
@@ -153,10 +507,16 @@ def load_anim(
 		fps_scale_type='DISABLED',
 		fps_scale_target_fps=30,
 		update_scene_fps=False,
-		anim_offset=0
+		anim_offset=0,
+		use_keyframe_thinning=False,
+		keyframe_thinning_tolerance=1e-5,
+		bone_maps=None
 	):
 	'''
 	Load a specific XAnim file
+	bone_maps is the BoneMapCache for armature (one is made if it's None)
+	use_keyframe_thinning leaves out the keys that can be linearly
+	 interpolated from the others (see thin_keyframes())
 	returns the XAnim() on success or an error message / None on failure
 	'''
 
@@ -166,10 +526,11 @@ def load_anim(
 	# Load the anim
 	anim = XAnim.Anim()
 	ext = os.path.splitext(filepath)[-1].lower()
+	# The frames are loaded as arrays so the poses can be solved in bulk
 	if ext == '.xanim_bin':
-		anim.LoadFile_Bin(filepath)
+		anim.LoadFile_Bin(filepath, use_arrays=True)
 	else:
-		anim.LoadFile_Raw(filepath, use_notetrack_file)
+		anim.LoadFile_Raw(filepath, use_notetrack_file, use_arrays=True)
 
 	scene = context.scene
 	ob = armature
@@ -187,6 +548,13 @@ def load_anim(
 		action = bpy.data.actions.new(actionName)
 		ob.animation_data.action = action
 		ob.animation_data.action.use_fake_user = True
+	else:
+		# The keyframes are written to the FCurves directly, so make sure
+		#  there's an action for them (like keyframe_insert() would)
+		action = ob.animation_data.action
+		if action is None:
+			action = bpy.data.actions.new(ob.name + "Action")
+			ob.animation_data.action = action
 
 	if update_scene_fps:
 		scene.render.fps = anim.framerate
@@ -200,7 +568,7 @@ def load_anim(
 		frame_scale = fps_scale_target_fps / anim.framerate
 
 	if update_scene_range:
-		frames = [frame.frame for frame in anim.frames]
+		frames = anim.frames.frame_numbers.tolist()
 		scene.frame_start = min(frames) * frame_scale
 		scene.frame_end = max(frames) * frame_scale
 
@@ -212,85 +580,46 @@ def load_anim(
 	else:
 		frame_shift = anim_offset
 
-	# Used to store bone metadata & matrix info for each animated bone
-	class MappedBone(object):
-		__slots__ = ('bone', 'part_index', 'matrix', 'matrix_local', 'parent')
-
-		def __init__(self, pose_bone, part_index):
-			self.bone = pose_bone
-			self.part_index = part_index
-			self.matrix = Matrix()
-			self.matrix_local = pose_bone.bone.matrix_local
-			self.parent = None
-
-		def map_parent(self, bone_map):
-			# Traverses the parents of the current bone recursively until -
-			# one that is present in the anim is found
-			# If none can be found, self.parent is set to None
-			bone_names = [mapped_bone.bone.name for mapped_bone in bone_map]
-
-			bone = self.bone
-			while bone is not None:
-				if bone.name in bone_names:
-					parent_index = bone_names.index(bone.name)
-					self.parent = bone_map[parent_index]
-					return
-				bone = bone.parent
-			self.parent = None
-			return
-
 	# Map the PoseBones to their corresponding part numbers, parents, etc.
-	# The order of PoseBones in bone_map should match ob.pose.bones -
-	# which stores them in hierarchical order, meaning a bone's parent -
-	# will always be *earlier* in the list than the child
-	bone_map = []
-	part_names = [part.name.lower() for part in anim.parts]
-	for bone_index, bone in enumerate(ob.pose.bones):
-		if bone.name in part_names:
-			part_index = part_names.index(bone.name)
-			# Don't add bones that didn't have a matching part in the anim
-			if part_index is not None:
-				mapped_bone = MappedBone(bone, part_index)
-				mapped_bone.map_parent(bone_map)
-
-				bone_map.append(mapped_bone)
-			else:
-				# If the bone isn't used in the anim
-				#  simply reset it to its rest pose
-				bone.matrix_basis.identity()
-
-	# Load the keyframes
-	for frame in anim.frames:
-		f = frame.frame * frame_scale + frame_shift
-
-		for mapped_bone in bone_map:
-			# Because a bone's parent is always *before* the child in bone_map
-			#  it should always have an valid parent matrix
-			#  (unless there is no parent)
-			mapped_bone_parent = mapped_bone.parent
-			if mapped_bone_parent is not None:
-				parent_matrix = mapped_bone_parent.matrix
-				parent_local_matrix = mapped_bone_parent.matrix_local
-			else:
-				parent_matrix = Matrix()
-				parent_local_matrix = parent_matrix
-
-			part = frame.parts[mapped_bone.part_index]
-			mtx = Matrix(part.matrix).transposed().to_4x4()
-			mtx.translation = Vector(part.offset) * global_scale
-
-			# Store this bone's current matrix for its children to access
-			mapped_bone.matrix = mtx.copy()
-
-			bone = mapped_bone.bone
-			matrix_basis = calc_basis(bone,
-									  mtx,
-									  parent_matrix,
-									  parent_local_matrix)
-			bone.matrix_basis = matrix_basis.copy()
-
-			bone.keyframe_insert("location", index=-1, frame=f)
-			bone.keyframe_insert("rotation_quaternion", index=-1, frame=f)
+	if bone_maps is None or bone_maps.armature != ob:
+		bone_maps = BoneMapCache(ob)
+	bone_map, rest = bone_maps.get([part.name.lower() for part in anim.parts])
+
+	# Calculate the pose of every bone for every frame first - the
+	#  armature space matrix of each mapped bone is the part's rotation
+	#  (its rows are the X, Y & Z axes) & offset
+	arrays = anim.frames
+	part_indices = [mapped_bone.part_index for mapped_bone in bone_map]
+	matrices = np.zeros((arrays.frame_count, len(bone_map), 4, 4))
+	matrices[..., :3, :3] = arrays.rotations[:, part_indices].swapaxes(-1, -2)
+	matrices[..., :3, 3] = arrays.offsets[:, part_indices] * global_scale
+	matrices[..., 3, 3] = 1.0
+
+	frames = arrays.frame_numbers * frame_scale + frame_shift
+	locations, rotations = calc_bases(matrices, rest)
+
+	# Then write the keyframes straight to the action's FCurves - one
+	#  foreach_set() per curve instead of a keyframe_insert() per bone per
+	#  frame
+	tolerance = None
+	if use_keyframe_thinning:
+		tolerance = keyframe_thinning_tolerance
+
+	for bone_index, mapped_bone in enumerate(bone_map):
+		if not len(frames):
+			break
+
+		bone = mapped_bone.bone
+
+		data_path = bone.path_from_id("location")
+		for i in range(3):
+			add_keyframes(action, data_path, i, bone.name,
+						  frames, locations[:, bone_index, i], tolerance)
+
+		data_path = bone.path_from_id("rotation_quaternion")
+		for i in range(4):
+			add_keyframes(action, data_path, i, bone.name,
+						  frames, rotations[:, bone_index, i], tolerance)
 
 	# Load the notes
 	if use_notetracks:
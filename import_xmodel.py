@@ -18,7 +18,8 @@
 
 # <pep8 compliant>
 
-import os, bpy, bmesh, array, math
+import os, sys, subprocess, bpy, array, math, json
+import numpy as np
 from mathutils import *
 from bpy_extras.image_utils import load_image
 from .pv_py_utils.stdlib import *
@@ -114,6 +115,263 @@ def join_armatures(skel1_ob, skel2_ob, skel2_mesh_obs):
 			mod.use_vertex_groups = True
 
 
+class ImageSearchIndex(object):
+	'''
+	Index of the images under the directories that get searched for a
+	 model's textures - maps the lowercase basename of every file to its
+	 path, so each directory tree is only walked once per import batch
+	 rather than once per image
+	If cache_path is given, the indices are also kept in that file &
+	 reused as long as the mtimes of all of the indexed directories match
+	'''
+	__slots__ = ('cache_path', 'roots', 'walks', 'walks_saved', 'dirty')
+
+	def __init__(self, cache_path=None):
+		self.cache_path = cache_path
+
+		# root directory -> {'mtimes': {dir: mtime_ns}, 'files': {name: path}}
+		self.roots = {}
+		self.walks = 0
+		self.walks_saved = 0
+		self.dirty = False
+
+		if cache_path and os.path.isfile(cache_path):
+			try:
+				with open(cache_path, 'r') as file:
+					self.roots = json.load(file)
+			except (OSError, ValueError):
+				self.roots = {}
+
+	@staticmethod
+	def __is_valid__(index):
+		for dirpath, mtime_ns in index['mtimes'].items():
+			try:
+				if os.stat(dirpath).st_mtime_ns != mtime_ns:
+					return False
+			except OSError:
+				return False
+		return True
+
+	def __index__(self, root):
+		index = self.roots.get(root)
+		if index is not None:
+			if index.get('valid') or self.__is_valid__(index):
+				# Checked once per batch
+				index['valid'] = True
+				self.walks_saved += 1
+				return index
+
+		# Walk the tree - the first file found with a given name wins,
+		#  just like load_image()'s own recursive search
+		mtimes = {}
+		files = {}
+		for dirpath, dirnames, filenames in os.walk(root):
+			try:
+				mtimes[dirpath] = os.stat(dirpath).st_mtime_ns
+			except OSError:
+				continue
+			for filename in filenames:
+				files.setdefault(filename.lower(), os.path.join(dirpath, filename))
+
+		index = {'mtimes': mtimes, 'files': files, 'valid': True}
+		self.roots[root] = index
+		self.walks += 1
+		self.dirty = True
+		return index
+
+	def find(self, dirname, image_name):
+		'''
+		Returns the path of the image file for image_name under dirname
+		 (or None if there isn't one)
+		'''
+		if not dirname or not os.path.isdir(dirname):
+			return None
+
+		index = self.__index__(os.path.normpath(dirname))
+		name = os.path.basename(image_name.replace('\\', '/')).lower()
+		return index['files'].get(name)
+
+	def save(self):
+		'''
+		Write the indices to cache_path (if there is one)
+		'''
+		if not self.cache_path or not self.dirty:
+			return
+
+		roots = {
+			root: {'mtimes': index['mtimes'], 'files': index['files']}
+			for root, index in self.roots.items()
+		}
+		try:
+			os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+			temp_path = self.cache_path + ".tmp"
+			with open(temp_path, 'w') as file:
+				json.dump(roots, file)
+			os.replace(temp_path, self.cache_path)
+			self.dirty = False
+		except OSError as e:
+			print("[ pv_blender_cod ]\tCouldn't save the image search cache: %s" % e)
+
+	def report(self):
+		if self.walks or self.walks_saved:
+			print("[ pv_blender_cod ]\tImage search: %d directory walk(s), %d saved by the index" %
+				  (self.walks, self.walks_saved))
+
+
+def sort_tris(tris):
+	'''
+	Sort a mesh's (face_count, 3) tris into the ones that can be added as
+	 they are & the duplicates of those (tris that use the same 3 verts,
+	 usually caused by `double sided` tris)
+	A tri that's used more than twice only gets a single duplicate
+	Returns (faces, dup_faces, invalid_faces) as arrays of face indices
+	'''
+	tris = np.asarray(tris, np.int64)
+	face_indices = np.arange(len(tris))
+
+	# Tris are compared by their sorted vertex indices
+	keys = np.sort(tris, axis=1)
+	invalid = (keys[:, 0] == keys[:, 1]) | (keys[:, 1] == keys[:, 2])
+
+	valid_faces = face_indices[~invalid]
+	keys = keys[valid_faces]
+
+	# Pack each (sorted) tri into a single integer when it fits, so they
+	#  can be hashed with a plain sort
+	base = int(keys.max()) + 1 if len(keys) else 1
+	if base ** 3 < 2 ** 63:
+		keys = (keys[:, 0] * base + keys[:, 1]) * base + keys[:, 2]
+		_, tri_ids = np.unique(keys, return_inverse=True)
+	else:
+		_, tri_ids = np.unique(keys, axis=0, return_inverse=True)
+	tri_ids = tri_ids.ravel()
+
+	# How many times each tri has been used before (in face order)
+	order = np.argsort(tri_ids, kind='stable')
+	sorted_ids = tri_ids[order]
+	group_start = np.flatnonzero(np.concatenate((
+		[True], sorted_ids[1:] != sorted_ids[:-1])))
+	occurrence = np.empty(len(order), np.int64)
+	occurrence[order] = (np.arange(len(order))
+						 - np.repeat(group_start,
+									 np.diff(np.append(group_start,
+													   len(order)))))
+
+	return (valid_faces[occurrence == 0], valid_faces[occurrence == 1],
+			face_indices[invalid])
+
+
+def build_mesh_arrays(sub_mesh, use_dup_tris=True):
+	'''
+	Work out the vertex, loop & polygon data of the Blender mesh for the
+	 given XModel.MeshArrays
+	Duplicate tris can't share verts with the tris they duplicate, so they
+	 get their own copies of their verts (appended after the mesh's verts)
+	Returns (vert_src, tris, face_src):
+		vert_src - the sub_mesh vertex for each Blender vertex
+		tris	 - the (face_count, 3) Blender vertex indices of each tri
+		face_src - the sub_mesh face for each Blender polygon
+	'''
+	vert_count = sub_mesh.vert_count
+
+	# Fix the winding order
+	tris = sub_mesh.indices[:, (0, 2, 1)]
+
+	face_src, dup_faces, invalid_faces = sort_tris(tris)
+	for face_index in invalid_faces.tolist():
+		print("TRI %d is invalid! %s" % (face_index, tris[face_index].tolist()))
+
+	vert_src = np.arange(vert_count)
+	if not use_dup_tris or not len(dup_faces):
+		return vert_src, tris[face_src], face_src
+
+	# The dup verts are ordered by their first use in the dup tris
+	dup_tris = tris[dup_faces]
+	used_verts = dup_tris.ravel()
+	_, first_use = np.unique(used_verts, return_index=True)
+	dup_verts = used_verts[np.sort(first_use)]
+
+	dup_verts_mapping = np.full(vert_count, -1, np.int64)
+	dup_verts_mapping[dup_verts] = np.arange(len(dup_verts)) + vert_count
+
+	vert_src = np.concatenate((vert_src, dup_verts))
+	tris = np.concatenate((tris[face_src], dup_verts_mapping[dup_tris]))
+	face_src = np.concatenate((face_src, dup_faces))
+	return vert_src, tris, face_src
+
+
+def group_weights(weight_offsets, weight_bones, weight_values):
+	'''
+	Group CSR vertex weights by (bone, weight) so each group can be given
+	 to VertexGroup.add() in one call
+	If a vert has more than one weight for the same bone, the last one is
+	 used (just like assigning them one at a time)
+	Returns a list of (bone, weight, vert_indices)
+	'''
+	verts = np.repeat(np.arange(len(weight_offsets) - 1),
+					  np.diff(weight_offsets))
+	bones = np.asarray(weight_bones, np.int64)
+	values = np.asarray(weight_values, np.float64)
+
+	# Keep the last weight of each (vert, bone) pair
+	order = np.lexsort((-np.arange(len(verts)), bones, verts))
+	pairs = np.stack((verts[order], bones[order]), axis=1)
+	last = np.ones(len(order), bool)
+	last[1:] = (pairs[1:] != pairs[:-1]).any(axis=1)
+	order = order[last]
+	if not len(order):
+		return []
+
+	# Sort by (bone, weight, vert) & split wherever the bone or weight changes
+	order = order[np.lexsort((verts[order], values[order], bones[order]))]
+	verts, bones, values = verts[order], bones[order], values[order]
+	starts = np.flatnonzero(np.concatenate((
+		[True], (bones[1:] != bones[:-1]) | (values[1:] != values[:-1]))))
+	ends = np.append(starts[1:], len(order))
+
+	return [(bone, weight, verts[start:end].tolist())
+			for bone, weight, start, end in zip(
+				bones[starts].tolist(), values[starts].tolist(),
+				starts.tolist(), ends.tolist())]
+
+
+def parse_in_parallel(filepaths, split_meshes, parse_cache):
+	'''
+	Parse the given files in a pool of worker processes (PyCoD doesn't need
+	 bpy, so they run in Blender's bundled Python) & store the results in
+	 parse_cache - load() then picks the parsed arrays up from the cache,
+	 leaving only the datablock creation on Blender's main thread
+	parse_cache should be in a batch (see ParseCache.begin_batch()), or
+	 have no size limit, so none of the parsed files are evicted before
+	 load() gets to them
+	Returns False if the files couldn't be parsed this way (load() then just
+	 parses them itself)
+	'''
+	cache_size = 0
+	if parse_cache.max_size is not None:
+		cache_size = max(parse_cache.max_size >> 20, 1)
+
+	args = [
+		sys.executable, "-m", "PyCoD", "parse",
+		"--cache-dir", parse_cache.directory,
+		"--cache-size", str(cache_size),
+	]
+	if parse_cache.keep_since is not None:
+		args.extend(("--keep-since", str(parse_cache.keep_since)))
+	if not split_meshes:
+		args.append("--no-split")
+	args.extend(filepaths)
+
+	try:
+		# PyCoD is imported from the addon's directory as a top level package
+		result = subprocess.run(args, cwd=os.path.dirname(__file__))
+	except OSError as e:
+		print("[ pv_blender_cod ]\tCouldn't start the parse workers: %s" % e)
+		return False
+
+	return result.returncode == 0
+
+
 def load(
 		self,
 		context,
@@ -127,7 +385,8 @@ def load(
 		use_parents = True,
 		attach_model = False,
 		merge_skeleton = False,
-		use_image_search = True
+		use_image_search = True,
+		image_index = None
 	):
 
 	global_scale *= shared.calculate_unit_scale_factor( context.scene )
@@ -160,7 +419,14 @@ def load(
 	else:
 		LoadModelFile = model.LoadFile_Raw
 
-	LoadModelFile(filepath, split_meshes=split_meshes)
+	# The meshes are loaded as arrays so they can be handed to Blender in bulk
+	LoadModelFile(filepath, split_meshes=split_meshes, use_arrays=True)
+
+	# Image search results are shared by every file in the import batch
+	#  (when an index isn't given, it's only shared by this model's images)
+	owns_image_index = image_index is None
+	if owns_image_index and use_image_search:
+		image_index = ImageSearchIndex()
 
 	# Materials
 	# List of the materials that Blender has loaded
@@ -194,9 +460,19 @@ def load(
 					image = load_image(
 						image_name,
 						dirname=search_dir,
-						recursive=use_image_search,
+						recursive=False,
 						check_existing=True
 					)
+					if image is None and use_image_search:
+						# Search the subdirs through the index instead of
+						#  letting load_image() walk them for every image
+						image_path = image_index.find(search_dir, image_name)
+						if image_path is not None:
+							image = load_image(
+								image_path,
+								recursive=False,
+								check_existing=True
+							)
 					if image is None:
 						print("Failed to load image: '%s'" % image_name)
 						# Create a placeholder image for the one that
@@ -216,6 +492,9 @@ def load(
 		
 		materials.append(mat)
 
+	if owns_image_index and image_index is not None:
+		image_index.report()
+
 	# Meshes
 	mesh_objs = []  # Mesh objects that we're going to link the skeleton to
 	for sub_mesh in model.meshes:
@@ -223,127 +502,68 @@ def load(
 			sub_mesh.name = "%s_mesh" % model.name
 		#print("Creating mesh: '%s'" % sub_mesh.name)
 		mesh = bpy.data.meshes.new(sub_mesh.name)
-		bm = bmesh.new()
-
-		# Add UV Layers
-		uv_layer = bm.loops.layers.uv.new("UVMap")
 
-		# Add Vertex Color Layer
-		if use_vertex_colors:
-			vert_color_layer = bm.loops.layers.color.new("Color")
+		vert_src, tris, face_src = build_mesh_arrays(sub_mesh, use_dup_tris)
+		positions, weight_offsets, weight_bones, weight_values = \
+			sub_mesh.take_verts(vert_src)
 
 		# Add Verts
-		for vert in sub_mesh.verts:
-			bm.verts.new(Vector(vert.offset) * target_scale)
-		bm.verts.ensure_lookup_table()
-
-		# Contains data for faces that use the same 3 verts as an existing face
-		#  (usually caused by `double sided` tris)
-		dup_faces = []
-		dup_verts = []
+		mesh.vertices.add(len(vert_src))
+		mesh.vertices.foreach_set(
+			"co", (positions * target_scale).astype(np.float32).ravel())
+
+		# Add Tris
+		face_count = len(face_src)
+		mesh.loops.add(face_count * 3)
+		mesh.loops.foreach_set("vertex_index", tris.astype(np.int32).ravel())
+
+		mesh.polygons.add(face_count)
+		mesh.polygons.foreach_set(
+			"loop_start", np.arange(0, face_count * 3, 3, dtype=np.int32))
+		if bpy.app.version < (4, 0, 0):
+			mesh.polygons.foreach_set(
+				"loop_total", np.full(face_count, 3, np.int32))
+
+		material_ids = sub_mesh.material_ids[face_src]
+		mesh.polygons.foreach_set(
+			"material_index", material_ids.astype(np.int32))
 
-		# Contains vertex mapping data for all verts that the dup faces use
-		dup_verts_mapping = [None] * len(sub_mesh.verts)
+		# Tracks how many faces in the current mesh use a given material
+		material_usage_counts = np.bincount(
+			material_ids, minlength=len(materials)).tolist()
 
-		used_faces = []  # List of all faces that were used in the model
+		mesh.update(calc_edges=True)
 
-		loop_normals = []  # List of normals for every added loop (face vertex)
+		# The per-corner data follows the winding order fix
+		def loop_data(values):
+			return values[face_src][:, (0, 2, 1)]
 
-		# Tracks how many faces in the current mesh use a given material
-		material_usage_counts = [0] * len(materials)
-
-		# Inner function used set up a bmesh tri's normals (into loop_normals),
-		#  uv, materials, etc.
-		def setup_tri(f):
-			# Assign the face's material & increment the material usage counter
-			material_index = face.material_id
-			f.material_index = material_index
-
-			material_usage_counts[material_index] += 1
-
-			# Assign the face's UV layer
-			for loop_index, loop in enumerate(f.loops):
-				face_index_loop = face.indices[loop_index]
-				# Normal
-				loop_normals.append(face_index_loop.normal)
-				# UV Coordinate Correction
-				uv = Vector(face_index_loop.uv)
-				uv.y = 1.0 - uv.y
-				loop[uv_layer].uv = uv
-				# Vertex Colors
-				if use_vertex_colors:
-					loop[vert_color_layer] = face_index_loop.color
-
-			used_faces.append(face)
-
-		unused_faces = []
-
-		vert_count = len(sub_mesh.verts)
-		for face_index, face in enumerate(sub_mesh.faces):
-			# Fix the winding order
-			tmp = face.indices[2]
-			face.indices[2] = face.indices[1]
-			face.indices[1] = tmp
-
-			indices = [bm.verts[index.vertex] for index in face.indices]
+		# Add UV Layers (with the UV Coordinate Correction)
+		uvs = loop_data(sub_mesh.uvs).astype(np.float64)
+		uvs[..., 1] = 1.0 - uvs[..., 1]
+		uv_layer = mesh.uv_layers.new(name="UVMap")
+		uv_layer.data.foreach_set("uv", uvs.astype(np.float32).ravel())
 
-			try:
-				f = bm.faces.new(indices)
-			except ValueError:
-				# Mark the face as unused
-				unused_faces.append(face)
-
-				if not face.isValid():
-					print("TRI %d is invalid! %s" %
-						  (face_index, [index.vertex for index in face.indices]))
-					continue
-
-				for index in face.indices:
-					vert = index.vertex
-					if dup_verts_mapping[vert] is None:
-						dup_verts_mapping[vert] = len(dup_verts) + vert_count
-						dup_verts.append(sub_mesh.verts[vert])
-					index.vertex = dup_verts_mapping[vert]
-				dup_faces.append(face)
+		# Add Vertex Color Layer
+		if use_vertex_colors:
+			if bpy.app.version >= (3, 4, 0):
+				vert_color_layer = mesh.color_attributes.new(
+					"Color", 'BYTE_COLOR', 'CORNER')
+				color_prop = "color_srgb"
 			else:
-				setup_tri(f)
-
-		# Remove the unused tris so they aren't accidentally used later
-		for face in unused_faces:
-			sub_mesh.faces.remove(face)
-
-		if use_dup_tris:
-			for vert in dup_verts:
-				bm.verts.new(Vector(vert.offset) * target_scale)
-			bm.verts.ensure_lookup_table()
-
-			for face in dup_faces:
-				indices = [bm.verts[index.vertex] for index in face.indices]
-				try:
-					f = bm.faces.new(indices)
-				except ValueError:
-					pass  # Skip dups of dups
-				else:
-					setup_tri(f)
-
-		# Vertex Weights
-		deform_layer = bm.verts.layers.deform.new()
-		for vert_index, vert in enumerate(sub_mesh.verts):
-			for bone, weight in vert.weights:
-				bm.verts[vert_index][deform_layer][bone] = weight
+				vert_color_layer = mesh.vertex_colors.new(name="Color")
+				color_prop = "color"
+			vert_color_layer.data.foreach_set(
+				color_prop,
+				loop_data(sub_mesh.colors).astype(np.float32).ravel())
 
-		if use_dup_tris:
-			offset = len(sub_mesh.verts)
-			for vert_index, vert in enumerate(dup_verts):
-				for bone, weight in vert.weights:
-					bm.verts[vert_index + offset][deform_layer][bone] = weight
+		# List of normals for every added loop (face vertex)
+		loop_normals = loop_data(sub_mesh.normals).reshape(-1, 3)
 
 		# Assign Materials
 		for mat in materials:
 			mesh.materials.append(mat)
 
-		bm.to_mesh(mesh)
-
 		# For this mesh remove all materials that aren't used by its faces
 		# material_index, material_usage_index must be tracked manually because
 		# enumerate() doesn't compensate for the removed materials properly
@@ -391,13 +611,8 @@ def load(
 			# ( even though it doesn't seem to do anything ) - pv
 			mesh.polygons.foreach_set( "use_smooth", [ True ] * len( mesh.polygons ) )
 
-			clnors = array.array( 'f', [ .0 ] * ( len( loop_normals ) * 3 ) )
-			for i, normal in enumerate( loop_normals ):
-				clnors[ i * 3 + 0 ] = normal[ 0 ]
-				clnors[ i * 3 + 1 ] = normal[ 1 ]
-				clnors[ i * 3 + 2 ] = normal[ 2 ]
-
-			mesh.normals_split_custom_set( tuple( zip( *( iter( clnors ), ) * 3 ) ) )
+			clnors = loop_normals.astype( np.float32 )
+			mesh.normals_split_custom_set( clnors.tolist() )
 		else:
 			mesh.validate()
 
@@ -421,9 +636,16 @@ def load(
 		view_layer.objects.active = obj
 
 		# Create Vertex Groups
-		# These automatically weight the verts based on the deform groups
-		for bone in model.bones:
+		vertex_groups = [
 			obj.vertex_groups.new( name=bone.name.lower() )
+			for bone in model.bones
+		]
+
+		# Vertex Weights (including the dup verts)
+		# Every vert with the same weight for a bone is added in one go
+		for bone, weight, vert_indices in group_weights(
+				weight_offsets, weight_bones, weight_values ):
+			vertex_groups[ bone ].add( vert_indices, weight, 'REPLACE' )
 
 		# Assign the texture images to the current mesh (for Texture view)
 		if load_images: